@@ -1,10 +1,31 @@
-"""Agents package - 3 LLM agents for MealMind ADK."""
-from .recipe_generator_adk import create_recipe_generator_agent
-from .nutrition_validator_adk import create_nutrition_validator_agent
-from .schedule_optimizer_adk import create_schedule_optimizer_agent
-
-__all__ = [
-    'create_recipe_generator_agent',
-    'create_nutrition_validator_agent',
-    'create_schedule_optimizer_agent'
-]
+"""Agents package - 3 LLM agents (plus JSON repair) for MealMind ADK.
+
+Exports are loaded on first access, so importing the package does not
+pull in google.adk until an agent factory is actually used.
+"""
+import importlib
+
+_EXPORTS = {
+    'create_recipe_generator_agent': '.recipe_generator_adk',
+    'create_nutrition_validator_agent': '.nutrition_validator_adk',
+    'create_schedule_optimizer_agent': '.schedule_optimizer_adk',
+    'create_json_repair_agent': '.json_repair_adk',
+    'OfflineGemini': '.offline_model',
+    'RateLimitedModel': '.rate_limited_model'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """Import an exported name on first access."""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """List module attributes including lazy exports."""
+    return sorted(list(globals()) + __all__)
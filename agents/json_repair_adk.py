@@ -0,0 +1,33 @@
+"""JSON Repair Agent - fixes individual fields of a stage's output."""
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.google_llm import Gemini
+from google.genai import types
+from .rate_limited_model import RateLimitedModel
+
+
+def create_json_repair_agent(
+    api_key: str,
+    retry_config: types.HttpRetryOptions,
+    model: BaseLlm = None
+) -> LlmAgent:
+    """Create JSON Repair Agent.
+    
+    Used by the orchestrator when a stage's output fails schema
+    validation: it gets only the offending fields and returns a patch,
+    so the stage itself does not have to run again.
+    """
+    return LlmAgent(
+        name="json_repair",
+        model=RateLimitedModel.wrap(
+            model or Gemini(model="gemini-2.5-flash-lite", api_key=api_key, retry_options=retry_config)
+        ),
+        instruction="""You are the JSON Repair step for MealMind.
+
+You receive validation errors for a JSON document, each with its path
+(dot-separated keys and list indices) and the current value there.
+Fix ONLY those fields, keeping the meaning of the original content.
+Output a single JSON object mapping each path to its corrected value.
+No explanations.""",
+        tools=[]
+    )
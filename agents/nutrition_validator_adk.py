@@ -1,19 +1,31 @@
 """Nutrition Compliance Agent - ADK implementation."""
 from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
 from google.adk.models.google_llm import Gemini
 from google.genai import types
+from .rate_limited_model import RateLimitedModel
 
-def create_nutrition_validator_agent(api_key: str, retry_config: types.RetryOptions) -> LlmAgent:
+def create_nutrition_validator_agent(
+    api_key: str,
+    retry_config: types.HttpRetryOptions,
+    model: BaseLlm = None
+) -> LlmAgent:
     """Create Nutrition Compliance Agent."""
     from tools import calculate_recipe_nutrition, check_allergens_in_recipe, get_health_guidelines
+    from utils import CONSTRAINT_LEGEND
     
     return LlmAgent(
         name="nutrition_validator",
-        model=Gemini(model="gemini-2.5-flash-lite", api_key=api_key, retry_options=retry_config),
-        instruction="""You are the Nutrition Compliance Validator.
+        model=RateLimitedModel.wrap(
+            model or Gemini(model="gemini-2.5-flash-lite", api_key=api_key, retry_options=retry_config)
+        ),
+        instruction=f"""You are the Nutrition Compliance Validator.
 
-Validate recipes for safety and nutrition.
+Validate recipes for safety and nutrition against the household constraints in the request.
+{CONSTRAINT_LEGEND}
 Check allergens (CRITICAL). Calculate nutrition.
-Approve/reject each recipe. Pass only APPROVED recipes forward.""",
+Approve/reject each recipe.
+Output one verdict per recipe as a JSON array:
+[{{"index": <position in the given list, from 0>, "approved": true|false, "reasons": [str]}}]""",
         tools=[calculate_recipe_nutrition, check_allergens_in_recipe, get_health_guidelines]
     )
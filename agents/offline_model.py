@@ -0,0 +1,171 @@
+"""Offline stand-in for Gemini - deterministic responses, no API calls."""
+import asyncio
+import collections
+import json
+import random
+import re
+import time
+import zlib
+from typing import AsyncGenerator, Dict
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import Field, PrivateAttr
+from utils import parse_recipes
+
+
+MAIN_INGREDIENTS = ["chicken breast", "salmon", "tofu", "eggs", "quinoa", "sweet potato"]
+SIDE_INGREDIENTS = ["brown rice", "broccoli", "spinach", "olive oil"]
+STYLES = ["Grilled", "Roasted", "Steamed", "Baked", "Stir-Fried", "Herbed", "Spiced", "Lemon"]
+
+
+class QuotaExceededError(Exception):
+    """Simulated 429 RESOURCE_EXHAUSTED."""
+    
+    code = 429
+
+
+class OfflineGemini(BaseLlm):
+    """Deterministic local model that plugs into the agents' Gemini slot.
+
+    Replies are templated from the request: the recipe generator gets
+    recipes for the requested days and meals, the validator approves the
+    recipes it is given, the schedule optimizer groups recipes by day,
+    and JSON repair returns an empty patch.
+    Any agent can be given a canned reply instead via `responses`, keyed
+    by a substring of its instruction. A request quota can be simulated
+    with `quota_requests` per `quota_window` seconds.
+    """
+
+    model: str = "offline-gemini"
+    latency: float = 0.0  # seconds per call
+    latency_per_token: float = 0.0  # seconds per output token (~4 chars)
+    tool_calls: bool = True  # call get_compact_constraints when the request lacks constraints
+    responses: Dict[str, str] = Field(default_factory=dict)
+    seed: int = 0
+    quota_requests: int = 0  # 0 = no quota
+    quota_window: float = 60.0
+    call_count: int = 0
+    rejected_count: int = 0
+    _call_times: collections.deque = PrivateAttr(default_factory=collections.deque)
+
+    @classmethod
+    def supported_models(cls) -> list:
+        """Model names this class serves."""
+        return [r"offline-.*"]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        """Produce one templated response (text or a tool call)."""
+        self.call_count += 1
+        if self.quota_requests:
+            now = time.monotonic()
+            while self._call_times and now - self._call_times[0] >= self.quota_window:
+                self._call_times.popleft()
+            if len(self._call_times) >= self.quota_requests:
+                self.rejected_count += 1
+                raise QuotaExceededError("429 RESOURCE_EXHAUSTED (simulated quota)")
+            self._call_times.append(now)
+        instruction = str(llm_request.config.system_instruction or "") if llm_request.config else ""
+        user_text = _latest_user_text(llm_request)
+        prompt_tokens = sum(len(_content_text(c)) for c in llm_request.contents) // 4
+
+        household_match = re.search(r"household[:\s]+([\w-]+)", user_text)
+        called_tool = any(
+            part.function_response
+            for content in llm_request.contents
+            for part in (content.parts or [])
+        )
+        if (self.tool_calls and not called_tool and household_match
+                and "Household constraints:" not in user_text
+                and "get_compact_constraints" in (llm_request.tools_dict or {})):
+            await asyncio.sleep(self.latency)
+            yield LlmResponse(
+                content=types.Content(role="model", parts=[types.Part(
+                    function_call=types.FunctionCall(
+                        name="get_compact_constraints",
+                        args={"household_id": household_match.group(1)}
+                    )
+                )]),
+                usage_metadata=types.GenerateContentResponseUsageMetadata(
+                    prompt_token_count=prompt_tokens, candidates_token_count=10
+                )
+            )
+            return
+
+        text = self._respond(instruction, user_text)
+        output_tokens = len(text) // 4
+        await asyncio.sleep(self.latency + self.latency_per_token * output_tokens)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens, candidates_token_count=output_tokens
+            )
+        )
+
+    def _respond(self, instruction: str, user_text: str) -> str:
+        """Build the reply text for an agent."""
+        for key, response in self.responses.items():
+            if key in instruction:
+                return response
+
+        rng = random.Random(zlib.crc32(user_text.encode()) ^ self.seed)
+        if "Recipe Generator" in instruction:
+            return json.dumps(_generate_recipes(user_text, rng))
+        if "JSON Repair" in instruction:
+            return "{}"
+        recipes = parse_recipes(user_text)
+        if "Nutrition" in instruction:
+            return json.dumps([{"index": i, "approved": True, "reasons": []} for i in range(len(recipes))])
+
+        days = {}
+        for recipe in recipes:
+            days.setdefault(recipe.get("day", 1), []).append(recipe)
+        return json.dumps({"days": [{"day": d, "meals": meals} for d, meals in sorted(days.items())]})
+
+
+def _content_text(content: types.Content) -> str:
+    """Concatenate text parts of a content."""
+    return "".join(part.text or "" for part in (content.parts or []))
+
+
+def _latest_user_text(llm_request: LlmRequest) -> str:
+    """Text of the most recent user message."""
+    for content in reversed(llm_request.contents):
+        text = _content_text(content)
+        if content.role == "user" and text:
+            return text
+    return ""
+
+
+def _generate_recipes(user_text: str, rng: random.Random) -> list:
+    """Templated recipes for the days or slots requested in a prompt."""
+    slots = [(int(d), m) for d, m in re.findall(r"day (\d+) (breakfast|lunch|dinner)", user_text)]
+    if not slots:
+        match = re.search(r"day (\d+)(?: to day (\d+))?", user_text)
+        if match:
+            first, last = int(match.group(1)), int(match.group(2) or match.group(1))
+        else:
+            days_match = re.search(r"(\d+)-day", user_text)
+            first, last = 1, int(days_match.group(1)) if days_match else 1
+        slots = [(day, meal) for day in range(first, last + 1) for meal in ("breakfast", "lunch", "dinner")]
+
+    recipes = []
+    for day, meal_type in slots:
+        main = rng.choice(MAIN_INGREDIENTS)
+        side = rng.choice(SIDE_INGREDIENTS)
+        recipes.append({
+            "day": day,
+            "meal_type": meal_type,
+            "name": f"{rng.choice(STYLES)} {main.title()} with {side.title()}",
+            "ingredients": [
+                {"name": main, "amount": rng.choice([120, 150, 200]), "unit": "grams"},
+                {"name": side, "amount": rng.choice([50, 80, 100]), "unit": "grams"}
+            ],
+            "cooking_time_minutes": rng.choice([10, 15, 20, 25, 30]),
+            "servings": 4
+        })
+    return recipes
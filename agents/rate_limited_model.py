@@ -0,0 +1,59 @@
+"""Model wrapper that routes every call through the shared rate limiter."""
+from typing import AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from utils.rate_limiter import get_rate_limiter
+
+
+class RateLimitedModel(BaseLlm):
+    """Wraps a model (Gemini or OfflineGemini) with its process-wide limiter.
+
+    All agents using the same underlying model name share one limiter, so
+    concurrent workflows draw from a single request/token budget.
+    """
+
+    inner: BaseLlm
+
+    @classmethod
+    def wrap(cls, inner: BaseLlm) -> "RateLimitedModel":
+        """Wrap a model unless it is already wrapped."""
+        if isinstance(inner, cls):
+            return inner
+        return cls(model=inner.model, inner=inner)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        """Call the inner model under the limiter (with jittered retries)."""
+        limiter = get_rate_limiter(self.inner.model)
+        estimate = _estimate_tokens(llm_request)
+
+        async def request() -> list:
+            return [r async for r in self.inner.generate_content_async(llm_request, stream)]
+
+        for response in await limiter.call(request, tokens=estimate, usage=_used_tokens):
+            yield response
+
+
+def _used_tokens(responses: list) -> int:
+    """Total tokens reported by the responses' usage metadata."""
+    total = 0
+    for response in responses:
+        usage = response.usage_metadata
+        if usage:
+            total += (usage.prompt_token_count or 0) + (usage.candidates_token_count or 0)
+    return total
+
+
+def _estimate_tokens(llm_request: LlmRequest) -> int:
+    """Rough prompt size (~4 characters per token)."""
+    chars = len(str(llm_request.config.system_instruction or "")) if llm_request.config else 0
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            chars += len(part.text or "")
+            if part.function_response:
+                chars += len(str(part.function_response.response))
+    return chars // 4
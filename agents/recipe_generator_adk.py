@@ -1,19 +1,30 @@
 """Recipe Generator Agent - ADK implementation."""
 from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
 from google.adk.models.google_llm import Gemini
 from google.genai import types
+from .rate_limited_model import RateLimitedModel
 
-def create_recipe_generator_agent(api_key: str, retry_config: types.RetryOptions) -> LlmAgent:
+def create_recipe_generator_agent(
+    api_key: str,
+    retry_config: types.HttpRetryOptions,
+    model: BaseLlm = None
+) -> LlmAgent:
     """Create Recipe Generator Agent."""
-    from tools import get_household_constraints, nutrition_lookup, get_health_guidelines
+    from tools import get_compact_constraints, nutrition_lookup, get_health_guidelines
+    from utils import CONSTRAINT_LEGEND
     
     return LlmAgent(
         name="recipe_generator",
-        model=Gemini(model="gemini-2.5-flash-lite", api_key=api_key, retry_options=retry_config),
-        instruction="""You are the Recipe Generator for MealMind.
+        model=RateLimitedModel.wrap(
+            model or Gemini(model="gemini-2.5-flash-lite", api_key=api_key, retry_options=retry_config)
+        ),
+        instruction=f"""You are the Recipe Generator for MealMind.
 
 Generate meal recipes that satisfy all household constraints.
-Check constraints FIRST. NO allergens. Respect dietary restrictions.
+Constraints are given in the request; call get_compact_constraints only if they are missing.
+NO allergens. Respect dietary restrictions.
+{CONSTRAINT_LEGEND}
 Output recipes as JSON array.""",
-        tools=[get_household_constraints, nutrition_lookup, get_health_guidelines]
+        tools=[get_compact_constraints, nutrition_lookup, get_health_guidelines]
     )
@@ -1,46 +1,46 @@
 """Meal Coordinator Agent - Orchestrates final steps using Python utilities."""
 from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
 from google.adk.models.google_llm import Gemini
 from google.genai import types
+from .rate_limited_model import RateLimitedModel
 
 
-def create_meal_coordinator_agent(api_key: str, retry_config: types.RetryOptions) -> LlmAgent:
+def create_schedule_optimizer_agent(
+    api_key: str,
+    retry_config: types.HttpRetryOptions,
+    model: BaseLlm = None
+) -> LlmAgent:
     """Create Meal Coordinator Agent.
     
-    This agent coordinates the final steps by calling Python utilities
-    for schedule optimization and grocery list generation.
+    This agent arranges the validated recipes into the final plan;
+    the orchestrator then runs the Python utilities for schedule
+    optimization and grocery list generation.
     """
     return LlmAgent(
         name="meal_coordinator",
-        model=Gemini(model="gemini-2.5-flash-lite", api_key=api_key, retry_options=retry_config),
+        model=RateLimitedModel.wrap(
+            model or Gemini(model="gemini-2.5-flash-lite", api_key=api_key, retry_options=retry_config)
+        ),
         instruction="""You are the Meal Coordinator for MealMind.
 
-Your role: Finalize the meal plan using Python utilities.
+Your role: Arrange the validated recipes into the final meal plan.
 
 WORKFLOW:
 1. Receive validated recipes from previous agent
-2. Call Python utilities (NOT tools, just explain you'll use them):
-   - optimize_schedule() for cooking time analysis
-   - generate_grocery_list() for shopping list
-3. Format the final comprehensive output
+2. Group them by day, breakfast, lunch then dinner
+3. Keep every recipe unchanged (schedule optimization and the grocery
+   list are computed afterwards by Python utilities)
 
-OUTPUT FORMAT:
+OUTPUT FORMAT (JSON only):
 {
-  "meal_plan": {
-    "days": [...validated recipes...],
-    "optimization": {
-      "cooking_stats": {...},
-      "score": X.X,
-      "suggestions": [...]
-    },
-    "grocery_list": {
-      "items": [...],
-      "total_cost": $X.XX,
-      "tips": [...]
-    }
-  }
-}
-
-Provide a complete, user-friendly meal planning summary.""",
+  "days": [
+    {"day": 1, "meals": [...validated recipes for day 1...]}
+  ]
+}""",
         tools=[]  # No tools - uses Python utilities
     )
+
+
+# Backwards-compatible name
+create_meal_coordinator_agent = create_schedule_optimizer_agent
@@ -0,0 +1 @@
+"""Benchmarks and stress tests for MealMind."""
@@ -0,0 +1,121 @@
+"""Columnar history export benchmark.
+
+Fills a MemoryBank with seeded synthetic plans (10 per household, the
+most it keeps), exports them with HistoryExporter in memory, as .npz
+batches and as Parquet, loads the files back and times the fleet-wide
+queries against walking the nested history dicts. Needs numpy; Parquet
+also needs pyarrow (skipped without it).
+
+Usage:
+    python -m benchmarks.bench_history_export [--households 5000] [--days 7]
+        [--batch-size 65536] [--out /tmp/mealmind-history]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+
+from memory import MemoryBank
+from memory.history_export import HistoryExporter, load_history
+from tools import HOUSEHOLD_PROFILES, get_household_constraints, estimate_ingredient_cost
+
+from .synthetic import make_households, make_plan
+
+PLANS_PER_HOUSEHOLD = 10
+
+
+def make_bank(households: dict, days: int, seed: int = 0) -> MemoryBank:
+    """Memory bank with PLANS_PER_HOUSEHOLD plans per household.
+
+    History entries are written directly in store_meal_plan's format;
+    store_meal_plan would also index every recipe for variety checks,
+    which is not what this benchmark measures.
+    """
+    rng = random.Random(seed)
+    bank = MemoryBank()
+    created_at = datetime.now().isoformat()
+    for hid in households:
+        bank.meal_history[hid] = [
+            {"plan": {"days": make_plan(rng, days)}, "plan_id": uuid.uuid4().hex, "created_at": created_at}
+            for _ in range(PLANS_PER_HOUSEHOLD)
+        ]
+    return bank
+
+
+def walk_cost_per_day_by_condition(bank: MemoryBank) -> dict:
+    """The same query done plan by plan on the nested dicts."""
+    totals = defaultdict(lambda: [0.0, 0])
+    for hid, history in bank.meal_history.items():
+        conditions = sorted({c.lower() for c in get_household_constraints(hid).get("health_conditions", [])})
+        for entry in history:
+            days = entry["plan"]["days"]
+            cost = sum(
+                estimate_ingredient_cost(i["name"], i["amount"])["total_cost"]
+                for day in days for meal in day["meals"] for i in meal["ingredients"]
+            )
+            for condition in conditions or ["none"]:
+                totals[condition][0] += cost / len(days)
+                totals[condition][1] += 1
+    return {condition: round(total / count, 2) for condition, (total, count) in sorted(totals.items())}
+
+
+def timed(label: str, fn):
+    """Run fn, print its duration and return its result."""
+    started = time.perf_counter()
+    result = fn()
+    print(f"{label:<40} {time.perf_counter() - started:>8.2f} s")
+    return result
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--households", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--batch-size", type=int, default=65536)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=os.path.join(tempfile.gettempdir(), "mealmind-history"))
+    args = parser.parse_args()
+
+    households = make_households(args.households, args.seed)
+    HOUSEHOLD_PROFILES.update(households)
+    try:
+        bank = timed("build synthetic history", lambda: make_bank(households, args.days, args.seed))
+        tables = timed("export to numpy", lambda: HistoryExporter(bank, args.batch_size).to_numpy())
+        print("rows:", ", ".join(f"{table}={count:,}" for table, count in tables.rows().items()))
+
+        by_condition = timed("query: cost per day by condition", tables.cost_per_day_by_condition)
+        reused = timed("query: most reused ingredients", lambda: tables.most_reused_ingredients(5))
+        timed("query: mean meal cost by meal type", lambda: tables.group_by("meals", "meal_type", "cost"))
+        walked = timed("walk dicts: cost per day by condition", lambda: walk_cost_per_day_by_condition(bank))
+        for condition, row in by_condition.items():
+            print(f"  {condition:<20} {row['plans']:>8,} plans  ${row['cost_per_day']:.2f}/day "
+                  f"(walk: ${walked.get(condition, 0):.2f})")
+        for row in reused:
+            print(f"  {row['ingredient']:<20} {row['plans']:>8,} plans {row['meals']:>10,} meals")
+        del tables  # the synthetic history already takes most of the memory
+
+        writers = {"npz": "write_npz", "parquet": "write_parquet"}
+        for fmt, method in writers.items():
+            directory = os.path.join(args.out, fmt)
+            shutil.rmtree(directory, ignore_errors=True)
+            try:
+                timed(f"export to {fmt} (streaming)", lambda: getattr(HistoryExporter(bank, args.batch_size), method)(directory))
+            except ImportError as e:
+                print(f"{fmt}: skipped ({e})")
+                continue
+            loaded = timed(f"load {fmt}", lambda: load_history(directory))
+            timed(f"query {fmt}: cost per day by condition", loaded.cost_per_day_by_condition)
+            del loaded
+    finally:
+        for hid in households:
+            HOUSEHOLD_PROFILES.pop(hid, None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Import-time benchmark for cold starts.
+
+Imports each module in a fresh interpreter and reports the median import
+time and whether google.adk / google.genai got loaded along the way.
+
+Usage:
+    python -m benchmarks.bench_import [--runs 5] [--modules tools utils orchestrator]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = ["tools", "utils", "memory", "agents", "orchestrator"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "adk_loaded": any(m.startswith(("google.adk", "google.genai")) for m in sys.modules)
+}}))
+"""
+
+
+def time_import(module: str, runs: int = 5) -> dict:
+    """Median cold import time of a module over fresh interpreters."""
+    samples = []
+    adk_loaded = False
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result["seconds"])
+        adk_loaded = adk_loaded or result["adk_loaded"]
+    return {"module": module, "median_ms": round(statistics.median(samples) * 1000, 2), "adk_loaded": adk_loaded}
+
+
+def main():
+    """Time each module's import."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        result = time_import(module, args.runs)
+        print(f"{module:<15} {result['median_ms']:>9.2f} ms   "
+              f"ADK loaded: {'yes' if result['adk_loaded'] else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""End-to-end orchestrator benchmark on the offline model.
+
+Drives MealPlanOrchestrator.generate_meal_plan with OfflineGemini (no API
+quota, no network) and reports throughput, p50/p95 latency and mean time
+per stage. With --latency 0 the numbers are pure orchestration overhead.
+With --library, plans are retrieval-first from a recipe library that
+fills up with the validated recipes of earlier (generated) plans.
+
+Usage:
+    python -m benchmarks.bench_orchestrator [--days 1 7 30] [--households 1 16]
+        [--latency 0.05] [--latency-per-token 0.0005] [--library] [--json results.json]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from agents import OfflineGemini
+from memory import InMemorySessionStore, RecipeLibrary
+from orchestrator import MealPlanOrchestrator
+from tools import create_household_profile, add_family_member
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_scenario(
+    days: int, households: int, rounds: int, model: OfflineGemini, library: RecipeLibrary = None
+) -> dict:
+    """Plan `households` plans concurrently, `rounds` times.
+
+    Args:
+        days: Plan length
+        households: Concurrent plan requests per round
+        rounds: Number of rounds
+        model: Offline model instance
+        library: Recipe library for retrieval-first planning
+
+    Returns:
+        Scenario metrics
+    """
+    orchestrator = MealPlanOrchestrator(session_store=InMemorySessionStore(), recipe_library=library, model=model)
+    household_ids = [f"bench_{i}" for i in range(households)]
+    # A distinct budget per household, so plans do not coalesce into one
+    for i, hid in enumerate(household_ids):
+        create_household_profile(hid, hid, 45, 150.0 + i)
+        add_family_member(hid, "Alex", 35, "", "nuts", "diabetes")
+
+    latencies = []
+    stage_totals = {}
+    library_recipes = []
+    calls_before = model.call_count
+    started = time.perf_counter()
+    for _ in range(rounds):
+        async def timed(hid: str):
+            t0 = time.perf_counter()
+            result = await orchestrator.generate_meal_plan(hid, days=days)
+            latencies.append(time.perf_counter() - t0)
+            if isinstance(result, dict):
+                for stage, seconds in result.get("stage_timings", {}).items():
+                    stage_totals.setdefault(stage, []).append(seconds)
+                library_recipes.append(result.get("library_recipes", 0))
+
+        await asyncio.gather(*(timed(hid) for hid in household_ids))
+    wall = time.perf_counter() - started
+
+    plans = households * rounds
+    return {
+        "days": days,
+        "households": households,
+        "plans": plans,
+        "throughput_plans_per_s": round(plans / wall, 2),
+        "p50_s": round(statistics.median(latencies), 4),
+        "p95_s": round(percentile(latencies, 95), 4),
+        "stage_mean_s": {k: round(statistics.mean(v), 4) for k, v in stage_totals.items()},
+        "model_calls_per_plan": round((model.call_count - calls_before) / plans, 1),
+        "library_recipes_per_plan": round(statistics.mean(library_recipes), 1) if library_recipes else 0
+    }
+
+
+async def main_async(args) -> list:
+    """Run all scenarios."""
+    model = OfflineGemini(latency=args.latency, latency_per_token=args.latency_per_token)
+    library = RecipeLibrary() if args.library else None
+    results = []
+    for days in args.days:
+        for households in args.households:
+            result = await run_scenario(days, households, args.rounds, model, library)
+            results.append(result)
+            stages = ", ".join(f"{k}={v * 1000:.1f}ms" for k, v in result["stage_mean_s"].items())
+            print(f"days={days:>3} households={households:>4} | "
+                  f"{result['throughput_plans_per_s']:>8} plans/s | "
+                  f"p50={result['p50_s'] * 1000:.1f}ms p95={result['p95_s'] * 1000:.1f}ms | "
+                  f"{result['model_calls_per_plan']} calls/plan | "
+                  f"{result['library_recipes_per_plan']} library recipes/plan | {stages}")
+    return results
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 7, 30])
+    parser.add_argument("--households", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per model call")
+    parser.add_argument("--latency-per-token", type=float, default=0.0, help="Seconds per output token")
+    parser.add_argument("--library", action="store_true", help="Plan retrieval-first from a recipe library")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
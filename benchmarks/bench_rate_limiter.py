@@ -0,0 +1,125 @@
+"""Throughput under quota pressure: static retries vs the adaptive limiter.
+
+Simulates a model API with a sliding-window request quota (429 beyond
+it) and many concurrent workflows each making sequential calls. The
+static strategy mirrors the old fixed retry config (5 attempts, initial
+delay 1, exponential base 7, no jitter). The adaptive strategies use
+utils.rate_limiter.AdaptiveRateLimiter, with and without knowing the
+quota up front. Delays are scaled by --time-scale to keep runs short.
+
+Usage:
+    python -m benchmarks.bench_rate_limiter [--workflows 40] [--calls 6]
+        [--quota 60] [--window 1.0] [--time-scale 0.1]
+"""
+import argparse
+import asyncio
+import collections
+import time
+
+from utils.rate_limiter import AdaptiveRateLimiter
+
+
+class QuotaError(Exception):
+    """Simulated 429."""
+
+    code = 429
+
+
+class SimulatedApi:
+    """Model endpoint with a sliding-window request quota."""
+
+    def __init__(self, quota: int, window: float, latency: float):
+        """Initialize simulated API."""
+        self.quota = quota
+        self.window = window
+        self.latency = latency
+        self.accepted = collections.deque()
+        self.rejected = 0
+
+    async def generate(self):
+        """One model request."""
+        now = time.monotonic()
+        while self.accepted and now - self.accepted[0] >= self.window:
+            self.accepted.popleft()
+        if len(self.accepted) >= self.quota:
+            self.rejected += 1
+            raise QuotaError("429 RESOURCE_EXHAUSTED")
+        self.accepted.append(now)
+        await asyncio.sleep(self.latency)
+
+
+async def static_call(api: SimulatedApi, scale: float, attempts: int = 5, initial: float = 1.0, base: float = 7.0):
+    """Old behaviour: fixed exponential backoff, identical for every caller."""
+    for attempt in range(attempts):
+        try:
+            return await api.generate()
+        except QuotaError:
+            if attempt == attempts - 1:
+                raise
+            await asyncio.sleep(initial * (base ** attempt) * scale)
+
+
+async def run(strategy: str, args) -> dict:
+    """Run all workflows with one strategy."""
+    api = SimulatedApi(args.quota, args.window, args.latency)
+    limiter = None
+    if strategy == "adaptive":
+        limiter = AdaptiveRateLimiter(max_concurrency=args.workflows, base_delay=args.time_scale,
+                                      max_delay=args.window * 4, cooldown=args.window,
+                                      rate_window=args.window, seed=0)
+    elif strategy == "adaptive+budget":
+        limiter = AdaptiveRateLimiter(rpm=args.quota * 60.0 / args.window, max_concurrency=args.workflows,
+                                      base_delay=args.time_scale, max_delay=args.window * 4,
+                                      cooldown=args.window, rate_window=args.window, seed=0)
+
+    completed, failed = 0, 0
+
+    async def workflow():
+        nonlocal completed, failed
+        for _ in range(args.calls):
+            try:
+                if limiter:
+                    await limiter.call(api.generate)
+                else:
+                    await static_call(api, args.time_scale)
+                completed += 1
+            except QuotaError:
+                failed += 1
+                return
+
+    started = time.monotonic()
+    await asyncio.gather(*(workflow() for _ in range(args.workflows)))
+    elapsed = time.monotonic() - started
+    return {
+        "strategy": strategy,
+        "seconds": round(elapsed, 2),
+        "completed_calls": completed,
+        "failed_workflows": failed,
+        "rejected_429": api.rejected,
+        "calls_per_s": round(completed / elapsed, 1)
+    }
+
+
+def main():
+    """Compare strategies."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workflows", type=int, default=40)
+    parser.add_argument("--calls", type=int, default=6, help="Sequential model calls per workflow")
+    parser.add_argument("--quota", type=int, default=60, help="Requests per window")
+    parser.add_argument("--window", type=float, default=1.0, help="Quota window in seconds")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--time-scale", type=float, default=0.1, help="Multiplier for retry delays")
+    args = parser.parse_args()
+
+    ideal = args.workflows * args.calls / args.quota * args.window
+    print(f"{args.workflows} workflows x {args.calls} calls, quota {args.quota}/{args.window}s "
+          f"(ideal ≈ {ideal:.1f}s)")
+    for strategy in ("static", "adaptive", "adaptive+budget"):
+        result = asyncio.run(run(strategy, args))
+        print(f"{result['strategy']:<16} {result['seconds']:>7.2f}s  {result['calls_per_s']:>7.1f} calls/s  "
+              f"completed={result['completed_calls']:<5} failed_workflows={result['failed_workflows']:<4} "
+              f"429s={result['rejected_429']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Prompt and tool-result token benchmark for the constraint encoding.
+
+Compares the size of household constraints as JSON (what prompts and the
+constraints tool used to carry) with encode_constraints, on seeded
+synthetic households, in estimated tokens (~4 characters per token, the
+same estimate the rate limiter uses). With --e2e it also runs offline
+plans and prints input/output tokens per stage from the responses' usage
+metadata, once with the compact encoding and once with JSON constraints
+in the prompts.
+
+Usage:
+    python -m benchmarks.bench_tokens [--households 1000] [--e2e] [--days 3]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+
+from tools import HOUSEHOLD_PROFILES, get_household_constraints, get_compact_constraints
+from utils import encode_constraints
+
+from .synthetic import make_households
+
+
+def tokens(text: str) -> int:
+    """Estimated token count of a text."""
+    return len(text) // 4
+
+
+def constraint_sizes(count: int, seed: int = 0) -> dict:
+    """Mean estimated tokens per encoding, by number of household members."""
+    households = make_households(count, seed)
+    HOUSEHOLD_PROFILES.update(households)
+    sizes = {}
+    try:
+        for hid, household in households.items():
+            constraints = get_household_constraints(hid)
+            row = sizes.setdefault(len(household["members"]), {"json": [], "compact": [], "tool_result": []})
+            row["json"].append(tokens(json.dumps(constraints)))
+            row["compact"].append(tokens(encode_constraints(constraints)))
+            row["tool_result"].append(tokens(json.dumps(get_compact_constraints(hid))))
+    finally:
+        for hid in households:
+            HOUSEHOLD_PROFILES.pop(hid, None)
+    return {
+        members: {name: round(statistics.mean(values), 1) for name, values in row.items()}
+        for members, row in sorted(sizes.items())
+    }
+
+
+async def stage_usage(days: int, compact: bool) -> dict:
+    """Token usage per stage for one offline plan."""
+    import orchestrator
+    from agents import OfflineGemini
+    from memory import InMemorySessionStore
+    from tools import create_household_profile, add_family_member
+
+    hid = "bench_tokens"
+    create_household_profile(hid, "Token Bench", 45, 150.0, "italian, mexican")
+    add_family_member(hid, "Sarah", 38, "vegetarian", "nuts", "diabetes")
+    add_family_member(hid, "Tom", 40, "vegetarian", "", "high blood pressure")
+    add_family_member(hid, "Emma", 8, "vegetarian", "nuts, shellfish", "")
+
+    encode = orchestrator.encode_constraints
+    if not compact:
+        # The previous prompt format: constraints as a JSON dump
+        orchestrator.encode_constraints = json.dumps
+    try:
+        planner = orchestrator.MealPlanOrchestrator(
+            session_store=InMemorySessionStore(), coalesce=False, model=OfflineGemini()
+        )
+        result = await planner.generate_meal_plan(hid, days=days)
+    finally:
+        orchestrator.encode_constraints = encode
+        HOUSEHOLD_PROFILES.pop(hid, None)
+    return result.get("token_usage", {})
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--households", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--e2e", action="store_true", help="Also run offline plans (needs google-adk)")
+    parser.add_argument("--days", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'members':>7} | {'json':>6} | {'compact':>7} | {'tool result':>11} | saved")
+    for members, row in constraint_sizes(args.households, args.seed).items():
+        saved = 1 - row["compact"] / row["json"]
+        print(f"{members:>7} | {row['json']:>6} | {row['compact']:>7} | {row['tool_result']:>11} | {saved:.0%}")
+
+    if args.e2e:
+        for compact in (False, True):
+            usage = asyncio.run(stage_usage(args.days, compact))
+            print(f"\n{'compact' if compact else 'json'} constraints, {args.days}-day plan:")
+            for stage, totals in usage.items():
+                print(f"  {stage:<20} {totals['calls']:>3} calls | "
+                      f"{totals['prompt_tokens']:>7} in | {totals['output_tokens']:>6} out")
+            print(f"  {'total':<20} {sum(t['calls'] for t in usage.values()):>3} calls | "
+                  f"{sum(t['prompt_tokens'] for t in usage.values()):>7} in")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Micro-benchmarks for the pure-Python tools and utilities.
+
+Times the hot paths on seeded synthetic data, from 3- to 365-day plans
+and from 10 to 100k households. Results can be saved as a JSON baseline
+and compared against a previous one; the run fails when any benchmark
+is slower than the baseline by more than the threshold.
+
+Usage:
+    python -m benchmarks.bench_tools [--quick] [--save baseline.json]
+        [--compare baseline.json] [--threshold 0.25]
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+from typing import Callable, Dict
+
+from memory import MemoryBank
+from tools import (
+    HOUSEHOLD_PROFILES,
+    aggregate_ingredients_for_shopping,
+    calculate_meal_plan_cost,
+    calculate_recipe_nutrition,
+    check_allergens_in_recipe,
+    get_household_constraints
+)
+from utils import PlanAggregates, generate_grocery_list, optimize_schedule
+
+from .synthetic import make_households, make_plan, make_recipe
+
+PLAN_DAYS = [3, 7, 30, 90, 365]
+HOUSEHOLD_COUNTS = [10, 1000, 10000, 100000]
+QUICK_PLAN_DAYS = [3, 30]
+QUICK_HOUSEHOLD_COUNTS = [10, 1000]
+
+
+def measure(fn: Callable, repeat: int = 5, min_time: float = 0.05) -> float:
+    """Best seconds per call over `repeat` auto-sized runs (least noisy)."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    return min(t / number for t in timer.repeat(repeat=repeat, number=number))
+
+
+def plan_benchmarks(days: int, seed: int) -> Dict[str, Callable]:
+    """Benchmarks whose cost scales with plan length."""
+    rng = random.Random(seed)
+    plan = make_plan(rng, days)
+    plan_json = json.dumps(plan)
+    recipe_json = json.dumps(make_recipe(rng))
+    aggregates = PlanAggregates.from_plan(plan)
+    old_meal, new_meal = plan[days // 2]["meals"][0], make_recipe(rng)
+
+    def swap_meal():
+        # Two swaps per call keep the plan unchanged across calls
+        aggregates.replace_meal(days // 2, old_meal, new_meal)
+        aggregates.replace_meal(days // 2, new_meal, old_meal)
+
+    return {
+        "calculate_recipe_nutrition": lambda: calculate_recipe_nutrition(recipe_json),
+        "check_allergens_in_recipe": lambda: check_allergens_in_recipe(recipe_json, "nuts, dairy, eggs"),
+        "aggregate_ingredients_for_shopping": lambda: aggregate_ingredients_for_shopping(plan_json),
+        "optimize_schedule": lambda: optimize_schedule(plan, 45),
+        "generate_grocery_list": lambda: generate_grocery_list(plan, 150.0),
+        "calculate_meal_plan_cost": lambda: calculate_meal_plan_cost(plan_json),
+        "plan_aggregates.replace_meal_x2": swap_meal,
+        "plan_aggregates.total_cost": lambda: aggregates.within_budget,
+    }
+
+
+def household_benchmarks(count: int, seed: int) -> Dict[str, Callable]:
+    """Benchmarks whose cost may scale with the number of households."""
+    rng = random.Random(seed)
+    households = make_households(count, seed)
+    HOUSEHOLD_PROFILES.update(households)
+
+    bank = MemoryBank()
+    recipe = make_recipe(rng)
+    for hid in households:
+        bank.add_member_favorite(hid, "Member0", recipe)
+        bank.add_member_dislike(hid, "Member0", "mushrooms")
+    ids = list(households)
+    small_plan = make_plan(rng, 3)
+    # Bounded name pools keep per-household state from growing across calls
+    recipes = [{"name": f"recipe_{i}"} for i in range(20)]
+
+    def pick() -> str:
+        return ids[rng.randrange(count)]
+
+    return {
+        "get_household_constraints": lambda: get_household_constraints(pick()),
+        "memory_bank.add_member_favorite": lambda: bank.add_member_favorite(
+            pick(), f"Member{rng.randrange(5)}", rng.choice(recipes)
+        ),
+        "memory_bank.add_member_dislike": lambda: bank.add_member_dislike(pick(), "Member1", "celery"),
+        "memory_bank.store_meal_plan": lambda: bank.store_meal_plan(pick(), {"days": small_plan}),
+        "memory_bank.get_memory_context": lambda: bank.get_memory_context(pick()),
+    }
+
+
+def run(quick: bool = False, seed: int = 0) -> Dict[str, Dict]:
+    """Run every benchmark at every scale.
+
+    Returns:
+        Benchmark key "name[scale]" -> {"seconds_per_call", "calls_per_second"}
+    """
+    results = {}
+    for days in QUICK_PLAN_DAYS if quick else PLAN_DAYS:
+        for name, fn in plan_benchmarks(days, seed).items():
+            results[f"{name}[days={days}]"] = measure(fn)
+    for count in QUICK_HOUSEHOLD_COUNTS if quick else HOUSEHOLD_COUNTS:
+        for name, fn in household_benchmarks(count, seed).items():
+            results[f"{name}[households={count}]"] = measure(fn)
+        for hid in make_households(count, seed):
+            HOUSEHOLD_PROFILES.pop(hid, None)
+
+    return {
+        key: {"seconds_per_call": seconds, "calls_per_second": round(1 / seconds, 1)}
+        for key, seconds in results.items()
+    }
+
+
+def compare(current: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> list:
+    """Benchmarks slower than baseline by more than threshold (a ratio)."""
+    regressions = []
+    for key, result in current.items():
+        if key not in baseline:
+            continue
+        ratio = result["seconds_per_call"] / baseline[key]["seconds_per_call"]
+        if ratio > 1 + threshold:
+            regressions.append((key, ratio))
+    return regressions
+
+
+def main():
+    """Run the suite, print results, optionally save and compare."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="Small scales only")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="Write results as a JSON baseline")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown ratio")
+    args = parser.parse_args()
+
+    results = run(quick=args.quick, seed=args.seed)
+    for key, result in results.items():
+        print(f"{key:<60} {result['seconds_per_call'] * 1e6:>12.2f} µs/call")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "seed": args.seed,
+                "results": results
+            }, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for key, ratio in regressions:
+            print(f"⚠️ REGRESSION {key}: {ratio:.2f}x baseline")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
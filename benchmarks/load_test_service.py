@@ -0,0 +1,136 @@
+"""Load test for the async HTTP service.
+
+Starts service.MealPlanService in-process on the offline model (or
+targets a running service with --url-port) and runs closed-loop
+clients that submit plans, honour 429 Retry-After, and poll until the
+job finishes. Reports sustained requests per second and latency.
+
+Usage:
+    python -m benchmarks.load_test_service [--clients 32] [--duration 10]
+        [--workers 4] [--queue-size 64] [--latency 0.05] [--days 3]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, Tuple
+
+
+async def http_request(host: str, port: int, method: str, path: str, payload: Dict = None) -> Tuple[int, Dict, Dict]:
+    """Send one HTTP/1.1 request and return (status, headers, json body)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+
+    head, _, content = raw.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return int(status_line.split(" ")[1]), headers, json.loads(content or b"{}")
+
+
+async def client(host: str, port: int, household_id: str, days: int, deadline: float, results: Dict):
+    """Submit plans back to back until the deadline."""
+    while time.monotonic() < deadline:
+        started = time.monotonic()
+        status, headers, body = await http_request(host, port, "POST", "/plans",
+                                                   {"household_id": household_id, "days": days})
+        results["requests"] += 1
+        if status == 429:
+            results["rejected"] += 1
+            await asyncio.sleep(min(float(headers.get("retry-after", 1)), max(0.0, deadline - time.monotonic())))
+            continue
+        if status != 202:
+            results["errors"] += 1
+            continue
+
+        job_id = body["job_id"]
+        while True:
+            await asyncio.sleep(0.02)
+            status, _, job = await http_request(host, port, "GET", f"/plans/{job_id}")
+            results["requests"] += 1
+            if status != 200 or job["status"] in ("complete", "failed"):
+                break
+        if status == 200 and job["status"] == "complete":
+            results["completed"] += 1
+            results["latencies"].append(time.monotonic() - started)
+        else:
+            results["errors"] += 1
+
+
+async def run_load_test(args) -> Dict:
+    """Start the service if needed, run clients, and collect metrics."""
+    service = None
+    host, port = args.host, args.url_port
+    if not port:
+        from agents import OfflineGemini
+        from memory import InMemorySessionStore
+        from orchestrator import MealPlanOrchestrator
+        from service import MealPlanService
+
+        orchestrator = MealPlanOrchestrator(
+            session_store=InMemorySessionStore(),
+            model=OfflineGemini(latency=args.latency)
+        )
+        service = MealPlanService(orchestrator, args.workers, args.queue_size)
+        await service.start(host, 0)
+        port = service.port
+
+    households = [f"load_{i}" for i in range(args.households)]
+    for hid in households:
+        await http_request(host, port, "POST", "/households", {
+            "household_id": hid,
+            "members": [{"name": "Sam", "age": 40, "allergies": ["nuts"]}]
+        })
+
+    results = {"requests": 0, "rejected": 0, "completed": 0, "errors": 0, "latencies": []}
+    started = time.monotonic()
+    deadline = started + args.duration
+    await asyncio.gather(*(
+        client(host, port, households[i % len(households)], args.days, deadline, results)
+        for i in range(args.clients)
+    ))
+    elapsed = time.monotonic() - started
+    if service:
+        await service.stop()
+
+    latencies = sorted(results.pop("latencies")) or [0.0]
+    return {
+        **results,
+        "seconds": round(elapsed, 2),
+        "requests_per_s": round(results["requests"] / elapsed, 1),
+        "plans_per_s": round(results["completed"] / elapsed, 2),
+        "p50_s": round(statistics.median(latencies), 3),
+        "p95_s": round(latencies[int(0.95 * (len(latencies) - 1))], 3)
+    }
+
+
+def main():
+    """Parse arguments and run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--url-port", type=int, default=0, help="Target a running service instead")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--households", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.05, help="Offline model seconds per call")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_load_test(args))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Stress test for the shared stores under threads and asyncio.
+
+Runs thousands of concurrent mutations against HOUSEHOLD_PROFILES,
+memory_bank (including meal history and its variety index) and
+session_manager while readers snapshot and query them, then checks that
+no update was lost and the variety index matches the kept history.
+
+Usage:
+    python -m benchmarks.stress_concurrent_stores [--ops 5000] [--workers 32]
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from memory import MemoryBank, SessionManager
+from tools import (
+    create_household_profile,
+    add_family_member,
+    get_household_constraints,
+    HOUSEHOLD_PROFILES
+)
+from utils.variety import recipe_shingles
+
+from .synthetic import make_plan
+
+PLAN_EVERY = 4  # one op in PLAN_EVERY per household also stores a meal plan
+
+
+def run_stress(ops: int = 5000, workers: int = 32, households: int = 4) -> dict:
+    """Run concurrent mutations and return expected vs actual counts.
+
+    Args:
+        ops: Mutations per store
+        workers: Thread pool size
+        households: Number of households sharing the load (high contention)
+
+    Returns:
+        Dict of check name -> (expected, actual)
+    """
+    bank = MemoryBank()
+    sessions = SessionManager()
+    household_ids = [f"stress_{i}" for i in range(households)]
+    for hid in household_ids:
+        create_household_profile(hid, hid)
+        sessions.create_session(hid, hid)
+
+    def stores_plan(i: int) -> bool:
+        return i // households % PLAN_EVERY == 0
+
+    def mutate(i: int):
+        hid = household_ids[i % households]
+        add_family_member(hid, f"member_{i}", 30, allergies="nuts" if i % 2 else "")
+        bank.add_member_favorite(hid, f"m{i % 3}", {"name": f"recipe_{i}"})
+        bank.add_member_dislike(hid, f"m{i % 3}", f"ingredient_{i}")
+        bank.update_member_preferences(hid, f"m{i % 3}", {f"pref_{i}": i})
+        sessions.add_message(hid, "user", f"message {i}")
+        if stores_plan(i):
+            bank.store_meal_plan(hid, {"days": make_plan(random.Random(i), 1)})
+
+    def read(i: int):
+        hid = household_ids[i % households]
+        constraints = get_household_constraints(hid)
+        context = bank.get_memory_context(hid)
+        # Snapshots must be internally consistent while writers run
+        assert constraints["member_count"] == len(constraints["members"])
+        assert isinstance(context["all_dislikes"], list)
+        assert len(bank.get_meal_history(hid, limit=10)) <= 10
+        bank.variety_index(hid).query(recipe_shingles(make_plan(random.Random(i), 1)[0]["meals"][0]), 0.5)
+
+    async def drive():
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            tasks = []
+            for i in range(ops):
+                tasks.append(loop.run_in_executor(pool, mutate, i))
+                tasks.append(loop.run_in_executor(pool, read, i))
+            await asyncio.gather(*tasks)
+
+    asyncio.run(drive())
+
+    plans = [sum(stores_plan(i) for i in range(h, ops, households)) for h in range(households)]
+    # Exactly the recipes of the kept plans are indexed
+    kept = [
+        (h, (entry["plan_id"], str(recipe["name"])))
+        for h in household_ids for entry in bank.meal_history.get(h, []) for recipe in bank._plan_recipes(entry)
+    ]
+    checks = {
+        "members": (ops, sum(len(HOUSEHOLD_PROFILES[h]["members"]) for h in household_ids)),
+        "favorites": (ops, sum(len(v) for h in household_ids
+                               for v in bank.get_all_member_favorites(h).values())),
+        "dislikes": (ops, sum(len(v) for h in household_ids
+                              for v in bank.get_all_member_dislikes(h).values())),
+        "preferences": (ops, sum(len(v) for h in household_ids
+                                 for v in bank.get_all_member_preferences(h).values())),
+        "messages": (ops, sum(len(sessions.get_messages(h, limit=ops)) for h in household_ids)),
+        "kept plans": (sum(min(10, n) for n in plans), sum(len(bank.meal_history.get(h, [])) for h in household_ids)),
+        "indexed recipes": (len(kept), sum(len(bank.variety_index(h)) for h in household_ids)),
+        "kept recipes indexed": (len(kept), sum(key in bank.variety_index(h) for h, key in kept)),
+    }
+
+    for hid in household_ids:
+        HOUSEHOLD_PROFILES.pop(hid, None)
+    return checks
+
+
+def main():
+    """Run the stress test and exit non-zero on lost updates."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--households", type=int, default=4)
+    args = parser.parse_args()
+
+    # Switch threads aggressively to expose races
+    sys.setswitchinterval(1e-6)
+    start = time.perf_counter()
+    checks = run_stress(args.ops, args.workers, args.households)
+    elapsed = time.perf_counter() - start
+
+    failed = False
+    for name, (expected, actual) in checks.items():
+        ok = expected == actual
+        failed |= not ok
+        print(f"{'✅' if ok else '❌'} {name}: expected {expected}, got {actual}")
+    print(f"{args.ops * 2} concurrent operations in {elapsed:.2f}s")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
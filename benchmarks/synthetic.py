@@ -0,0 +1,86 @@
+"""Seeded synthetic households, recipes and plans for benchmarks."""
+import csv
+import random
+from typing import Dict, List
+
+from utils import MEAL_SLOTS
+from utils.ingredient_catalog import DEFAULT_CSV
+
+EXTRA_INGREDIENTS = [
+    "black beans", "lentils", "chickpeas", "oats", "greek yogurt", "bell pepper",
+    "onion", "garlic", "tomato", "carrot", "zucchini", "mushrooms", "peanuts",
+    "almonds", "whole wheat bread", "pasta", "cheese", "milk", "banana", "apple"
+]
+# Foods of the bundled catalog (fixed, so seeded data does not depend on
+# which catalog is configured)
+with open(DEFAULT_CSV, newline="", encoding="utf-8") as _f:
+    INGREDIENTS = sorted(row["name"] for row in csv.DictReader(_f)) + EXTRA_INGREDIENTS
+RESTRICTIONS = ["vegetarian", "vegan", "gluten-free", "dairy-free", "low-sodium"]
+ALLERGIES = ["nuts", "peanuts", "dairy", "eggs", "shellfish", "soy", "gluten"]
+CONDITIONS = ["diabetes", "pcos", "high blood pressure"]
+STYLES = ["Grilled", "Roasted", "Steamed", "Baked", "Stir-Fried", "Herbed", "Spiced", "Lemon"]
+
+
+def make_member(rng: random.Random, index: int) -> Dict:
+    """Random household member."""
+    return {
+        "name": f"Member{index}",
+        "age": rng.randint(3, 80),
+        "dietary_restrictions": rng.sample(RESTRICTIONS, rng.randint(0, 1)),
+        "allergies": rng.sample(ALLERGIES, rng.randint(0, 2)),
+        "health_conditions": rng.sample(CONDITIONS, rng.randint(0, 1))
+    }
+
+
+def make_household(rng: random.Random, index: int) -> Dict:
+    """Random household profile in HOUSEHOLD_PROFILES format."""
+    return {
+        "household_id": f"hh_{index}",
+        "household_name": f"Household {index}",
+        "cooking_time_max": rng.choice([30, 45, 60]),
+        "budget_weekly": rng.choice([100.0, 150.0, 200.0]),
+        "cuisine_preferences": [],
+        "members": [make_member(rng, i) for i in range(rng.randint(1, 5))]
+    }
+
+
+def make_recipe(rng: random.Random, day: int = 1, meal_type: str = "dinner") -> Dict:
+    """Random recipe with 3-8 ingredients."""
+    ingredients = rng.sample(INGREDIENTS, rng.randint(3, 8))
+    return {
+        "day": day,
+        "meal_type": meal_type,
+        "name": f"{rng.choice(STYLES)} {ingredients[0].title()} with {ingredients[1].title()}",
+        "ingredients": [
+            {"name": name, "amount": rng.choice([30, 50, 80, 100, 150, 200]), "unit": "grams"}
+            for name in ingredients
+        ],
+        "cooking_time_minutes": rng.choice([5, 10, 15, 20, 30, 45]),
+        "servings": rng.choice([2, 4, 6])
+    }
+
+
+def fixed_recipe(name: str, ingredients: List[str], day: int = 1, meal_type: str = "dinner", minutes: int = 20) -> Dict:
+    """Recipe with the given ingredients, 100g each (for tests)."""
+    return {
+        "day": day,
+        "meal_type": meal_type,
+        "name": name,
+        "ingredients": [{"name": ingredient, "amount": 100, "unit": "grams"} for ingredient in ingredients],
+        "cooking_time_minutes": minutes,
+        "servings": 2
+    }
+
+
+def make_plan(rng: random.Random, days: int) -> List[Dict]:
+    """Random plan: list of {"day", "meals"} with three meals per day."""
+    return [
+        {"day": day, "meals": [make_recipe(rng, day, meal) for meal in MEAL_SLOTS]}
+        for day in range(1, days + 1)
+    ]
+
+
+def make_households(count: int, seed: int = 0) -> Dict[str, Dict]:
+    """Many random households keyed by ID."""
+    rng = random.Random(seed)
+    return {f"hh_{i}": make_household(rng, i) for i in range(count)}
@@ -0,0 +1,104 @@
+"""Tests for resuming a failed meal planning run from its stage checkpoints.
+
+The agents are stubbed out (no ADK or API key needed). Checkpoints live in
+a SQLite session store, so a second orchestrator opened on the same file
+stands in for a restarted process.
+
+Usage:
+    python -m unittest benchmarks.test_checkpoints
+"""
+import asyncio
+import json
+import os
+import re
+import tempfile
+import types
+import unittest
+from collections import Counter
+from unittest import mock
+
+import orchestrator
+from memory import SQLiteSessionStore
+from tools import create_household_profile, add_family_member, HOUSEHOLD_PROFILES
+
+from .synthetic import fixed_recipe
+
+AGENTS = [
+    types.SimpleNamespace(name=name)
+    for name in ("recipe_generator", "nutrition_validator", "meal_coordinator", "json_repair")
+]
+
+
+class CheckpointResumeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = Counter()  # model calls per agent
+        self.crashes = {"meal_coordinator"}  # agents that fail their next call
+
+        async def run_stage(orch, agent, message, household_id, session_id):
+            self.calls[agent.name] += 1
+            if agent.name in self.crashes:
+                self.crashes.discard(agent.name)
+                raise ConnectionError(f"{agent.name} unavailable")
+            if agent.name == "recipe_generator":
+                slots = re.findall(r"day (\d+) (breakfast|lunch|dinner)", message)
+                return json.dumps([
+                    fixed_recipe(f"{meal_type} {day}", [f"x{day}{meal_type}"], int(day), meal_type)
+                    for day, meal_type in slots
+                ])
+            if agent.name == "nutrition_validator":
+                recipes = json.loads(message[message.rindex("\n") + 1:])
+                return json.dumps([{"index": i, "approved": True} for i in range(len(recipes))])
+            return "{}"  # the coordinator's plan is rebuilt from the approved recipes
+
+        patches = [
+            mock.patch.object(orchestrator, "get_shared_agents", lambda api_key=None, model=None: AGENTS),
+            mock.patch.object(orchestrator.MealPlanOrchestrator, "_run_stage", run_stage)
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        create_household_profile("resume_h", "Resume")
+        add_family_member("resume_h", "A", 30)
+        self.addCleanup(HOUSEHOLD_PROFILES.pop, "resume_h", None)
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "sessions.db")
+
+    def orchestrator(self) -> orchestrator.MealPlanOrchestrator:
+        store = SQLiteSessionStore(self.path)
+        self.addCleanup(store.close)
+        return orchestrator.MealPlanOrchestrator(session_store=store, coalesce=False)
+
+    def test_rerun_resumes_after_the_completed_stages(self):
+        first = self.orchestrator()
+        with self.assertRaises(ConnectionError):
+            asyncio.run(first.generate_meal_plan("resume_h", days=2, request_id="r1"))
+        stages = first.checkpoints.completed_stages("resume_h", "r1")
+        self.assertIn("recipe_generator", stages)
+        self.assertIn("nutrition_validator", stages)
+        self.assertNotIn("meal_coordinator", stages)
+        first.session_store.close()
+
+        self.calls.clear()
+        second = self.orchestrator()
+        result = asyncio.run(second.generate_meal_plan("resume_h", days=2, request_id="r1"))
+        self.assertEqual(set(self.calls), {"meal_coordinator"})
+        self.assertEqual(set(result["stage_timings"]), {"meal_coordinator"})
+        self.assertEqual(sum(len(day["meals"]) for day in result["meal_plan"]), 6)
+        self.assertEqual(second.checkpoints.completed_stages("resume_h", "r1"), [])
+
+    def test_other_request_ids_start_over(self):
+        orch = self.orchestrator()
+        with self.assertRaises(ConnectionError):
+            asyncio.run(orch.generate_meal_plan("resume_h", days=2, request_id="r1"))
+        self.calls.clear()
+        asyncio.run(orch.generate_meal_plan("resume_h", days=2, request_id="r2"))
+        self.assertEqual(self.calls["recipe_generator"], 2)
+        self.assertGreater(self.calls["nutrition_validator"], 0)
+        self.assertNotEqual(orch.checkpoints.completed_stages("resume_h", "r1"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
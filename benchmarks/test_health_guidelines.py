@@ -0,0 +1,75 @@
+"""Tests for constraint term tables and the allergen tool.
+
+Usage:
+    python -m unittest benchmarks.test_health_guidelines
+"""
+import json
+import unittest
+
+from tools import check_allergens_in_recipe
+from tools.health_guidelines import ALLERGEN_TERMS, RESTRICTION_EXCLUDES, excluded_terms, has_term
+
+from .synthetic import fixed_recipe
+
+
+class ExcludedTermsTest(unittest.TestCase):
+
+    def test_allergies_expand_to_ingredient_terms(self):
+        excluded, unknown = excluded_terms({"allergies": ["Nuts", "dairy"]})
+        self.assertEqual(unknown, [])
+        self.assertIn("almond", excluded["allergen Nuts"])
+        self.assertIn("cheese", excluded["allergen dairy"])
+
+    def test_health_avoid_entries_map_to_ingredients(self):
+        excluded, unknown = excluded_terms({"health_conditions": ["High Blood Pressure"]})
+        self.assertEqual(unknown, [])
+        self.assertIn("bacon", excluded["processed meats should be avoided for High Blood Pressure"])
+
+    def test_unknown_constraints_are_reported(self):
+        excluded, unknown = excluded_terms({
+            "allergies": ["kiwi"],
+            "dietary_restrictions": ["keto"],
+            "health_conditions": ["celiac", "Type 2 Diabetes"]
+        })
+        self.assertEqual(unknown, ["allergy: kiwi", "diet: keto", "health: celiac", "health: Type 2 Diabetes"])
+        self.assertEqual(excluded, {"allergen kiwi": ["kiwi"]})  # the allergy's own name is still excluded
+
+
+class HasTermTest(unittest.TestCase):
+
+    def test_terms_match_at_word_starts(self):
+        self.assertTrue(has_term("whole milk", ALLERGEN_TERMS["dairy"]))
+        self.assertTrue(has_term("buttermilk", ALLERGEN_TERMS["dairy"]))
+        self.assertTrue(has_term("free-range eggs", ALLERGEN_TERMS["egg"]))
+        self.assertTrue(has_term("panko breadcrumbs", RESTRICTION_EXCLUDES["glutenfree"]))
+        self.assertFalse(has_term("graham crackers", RESTRICTION_EXCLUDES["vegetarian"]))
+
+    def test_plant_substitutes_are_not_dairy_or_egg(self):
+        for name in ("almond milk", "coconut milk", "oat milk", "peanut butter", "cocoa butter", "butternut squash"):
+            self.assertFalse(has_term(name, ALLERGEN_TERMS["dairy"]), name)
+            self.assertFalse(has_term(name, RESTRICTION_EXCLUDES["vegan"]), name)
+        self.assertFalse(has_term("eggplant", ALLERGEN_TERMS["egg"]))
+
+    def test_exceptions_only_mask_their_own_term(self):
+        self.assertTrue(has_term("almond milk", ALLERGEN_TERMS["nut"]))
+        self.assertTrue(has_term("peanut butter", ALLERGEN_TERMS["peanut"]))
+        self.assertTrue(has_term("almond milk, whole milk", ALLERGEN_TERMS["dairy"]))
+
+
+class AllergenToolTest(unittest.TestCase):
+
+    def check(self, ingredients: list, allergies: str) -> list:
+        return check_allergens_in_recipe(json.dumps(fixed_recipe("Dish", ingredients)), allergies)["found_allergens"]
+
+    def test_group_allergy_finds_members(self):
+        self.assertEqual(self.check(["Almond Butter", "oats"], "nuts"), ["nuts in Almond Butter"])
+
+    def test_plant_milk_is_not_dairy(self):
+        self.assertEqual(self.check(["Almond milk", "Butternut squash"], "dairy"), [])
+
+    def test_unknown_allergy_matches_its_name(self):
+        self.assertEqual(self.check(["kiwi slices"], "kiwi"), ["kiwi in kiwi slices"])
+
+
+if __name__ == "__main__":
+    unittest.main()
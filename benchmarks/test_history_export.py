@@ -0,0 +1,64 @@
+"""Tests for the columnar meal-history export (needs numpy, skipped without it).
+
+Usage:
+    python -m unittest benchmarks.test_history_export
+"""
+import random
+import tempfile
+import unittest
+
+from memory import MemoryBank
+from utils import PlanAggregates
+
+from .synthetic import make_plan
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "needs numpy")
+class HistoryExportTest(unittest.TestCase):
+
+    def bank(self, history: dict) -> MemoryBank:
+        bank = MemoryBank()
+        bank.meal_history.update(history)
+        return bank
+
+    def entry(self, plan, plan_id: str) -> dict:
+        return {"plan": plan, "plan_id": plan_id, "created_at": "2026-01-01T00:00:00"}
+
+    def test_batch_with_plans_but_no_meals(self):
+        from memory.history_export import HistoryExporter
+        bank = self.bank({"h1": [self.entry({"status": "invalid"}, "p1")]})
+        tables = HistoryExporter(bank).to_numpy()
+        self.assertEqual(tables.rows(), {"plans": 1, "meals": 0, "ingredients": 0, "nutrition": 0})
+
+    def test_costs_match_plan_aggregates(self):
+        from memory.history_export import HistoryExporter
+        plan = make_plan(random.Random(5), 3)
+        bank = self.bank({"h1": [self.entry({"days": plan}, "p1")]})
+        tables = HistoryExporter(bank, batch_size=4).to_numpy()
+        cost = float(tables["plans"]["cost"].sum())
+        self.assertAlmostEqual(cost, PlanAggregates.from_plan(plan).total_cost, places=6)
+
+    def test_npz_round_trip(self):
+        from memory.history_export import HistoryExporter, load_history
+        rng = random.Random(9)
+        bank = self.bank({
+            "h1": [self.entry({"days": make_plan(rng, 2)}, "p1")],
+            "h2": [self.entry({"days": make_plan(rng, 1)}, "p2"), self.entry({"status": "invalid"}, "p3")]
+        })
+        exporter = HistoryExporter(bank, batch_size=2)
+        expected = exporter.to_numpy()
+        with tempfile.TemporaryDirectory() as directory:
+            rows = HistoryExporter(bank, batch_size=2).write_npz(directory)
+            loaded = load_history(directory)
+        self.assertEqual(rows, expected.rows())
+        self.assertEqual(loaded.rows(), expected.rows())
+        numpy.testing.assert_allclose(loaded["plans"]["cost"], expected["plans"]["cost"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Tests for the memory-mapped ingredient catalog.
+
+Usage:
+    python -m unittest benchmarks.test_ingredient_catalog
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from utils import ingredient_catalog
+from utils.ingredient_catalog import IngredientCatalog, build_catalog
+
+
+class IngredientCatalogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.directory.name, "foods.csv")
+        with open(self.csv_path, "w", encoding="utf-8") as f:
+            f.write("name,calories,cost_per_100g,cost_per_100g_uk\n")
+            f.write("Brown  Rice,112,0.15,\n")
+            f.write("salmon,208,2.50,2.10\n")
+        self.path = os.path.join(self.directory.name, "foods.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def corrupted_copies(self, data: bytes) -> dict:
+        """Truncated and padded variants of a catalog file, by label."""
+        copies = {"empty": b"", "text": b"not a catalog", "padded": data + b"\0" * 8}
+        for size in (8, 58, 150, 300, len(data) - 1):
+            if size < len(data):
+                copies[f"first {size} bytes"] = data[:size]
+        return copies
+
+    def test_lookups(self):
+        self.assertEqual(build_catalog(self.csv_path, self.path), 2)
+        catalog = IngredientCatalog(self.path)
+        try:
+            self.assertEqual(len(catalog), 2)
+            self.assertIn("brown rice", catalog)
+            self.assertEqual(catalog.get("BROWN RICE"), {"calories": 112.0, "cost_per_100g": 0.15})
+            self.assertIsNone(catalog.value("tofu", "calories"))
+            self.assertEqual(catalog.prices("uk")["salmon"], 2.10)
+            self.assertEqual(catalog.prices("uk")["brown rice"], 0.15)  # falls back to the default column
+        finally:
+            catalog.close()
+
+    def test_damaged_files_raise_value_error(self):
+        build_catalog(self.csv_path, self.path)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        for label, damaged in self.corrupted_copies(data).items():
+            with self.subTest(label):
+                with open(self.path, "wb") as f:
+                    f.write(damaged)
+                with self.assertRaises(ValueError):
+                    IngredientCatalog(self.path)
+
+    def test_corrupt_cached_catalog_is_rebuilt(self):
+        cache = os.path.join(self.directory.name, "cache")
+        with mock.patch.dict(os.environ, {"XDG_CACHE_HOME": cache}), \
+                mock.patch.object(ingredient_catalog, "_catalog", None):
+            os.environ.pop("MEALMIND_CATALOG", None)
+            path = ingredient_catalog.get_catalog().path
+            ingredient_catalog.get_catalog().close()
+            with open(path, "rb") as f:
+                data = f.read()
+            for label, damaged in self.corrupted_copies(data).items():
+                with self.subTest(label):
+                    with open(path, "wb") as f:
+                        f.write(damaged)
+                    ingredient_catalog._catalog = None
+                    catalog = ingredient_catalog.get_catalog()
+                    self.assertIn("chicken breast", catalog)
+                    catalog.close()
+            self.assertEqual(os.stat(os.path.dirname(path)).st_mode & 0o777, 0o700)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""Tests for the delta-maintained plan aggregates.
+
+Usage:
+    python -m unittest benchmarks.test_plan_aggregates
+"""
+import random
+import unittest
+
+from utils import PlanAggregates, optimize_schedule
+
+from .synthetic import make_plan
+
+
+class PlanAggregatesTest(unittest.TestCase):
+
+    def test_replacements_match_recompute(self):
+        rng = random.Random(7)
+        plan = make_plan(rng, 7)
+        aggregates = PlanAggregates.from_plan(plan)
+        for _ in range(200):
+            day_index = rng.randrange(len(plan))
+            meals = plan[day_index]["meals"]
+            meal_index = rng.randrange(len(meals))
+            new_meal = rng.choice(make_plan(rng, 1)[0]["meals"])
+            aggregates.replace_meal(day_index, meals[meal_index], new_meal)
+            meals[meal_index] = new_meal
+
+        fresh = PlanAggregates.from_plan(plan)
+        self.assertEqual(aggregates.total_cost, fresh.total_cost)
+        self.assertEqual(aggregates.grocery_list(), fresh.grocery_list())
+        self.assertEqual(aggregates.schedule()["cooking_stats"], fresh.schedule()["cooking_stats"])
+        self.assertEqual(aggregates.meal_plan_cost(), fresh.meal_plan_cost())
+
+    def test_schedule_matches_optimize_schedule(self):
+        plan = make_plan(random.Random(11), 5)
+        self.assertEqual(PlanAggregates.from_plan(plan, cooking_time_max=30).schedule(), optimize_schedule(plan, 30))
+
+    def test_removing_every_meal_empties_totals(self):
+        plan = make_plan(random.Random(3), 3)
+        aggregates = PlanAggregates.from_plan(plan)
+        for day_index, day in enumerate(plan):
+            for meal in day["meals"]:
+                aggregates.remove_meal(day_index, meal)
+        self.assertEqual(aggregates.items, {})
+        self.assertEqual(aggregates.total_cost, 0)
+        self.assertEqual(aggregates.reuse_count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
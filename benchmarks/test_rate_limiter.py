@@ -0,0 +1,124 @@
+"""Tests for the adaptive per-model rate limiter.
+
+Usage:
+    python -m unittest benchmarks.test_rate_limiter
+"""
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+from utils import rate_limiter
+from utils.rate_limiter import AdaptiveRateLimiter, configure_rate_limiter, get_rate_limiter, model_budget
+
+
+class ModelError(Exception):
+
+    def __init__(self, code: int):
+        super().__init__(f"model error {code}")
+        self.code = code
+
+
+def failing(*codes):
+    """Coroutine function raising ModelError for each code, then returning "ok"."""
+    codes = list(codes)
+
+    async def fn():
+        if codes:
+            raise ModelError(codes.pop(0))
+        return "ok"
+    return fn
+
+
+class AdaptiveRateLimiterTest(unittest.TestCase):
+
+    def test_concurrency_stays_within_the_limit(self):
+        limiter = AdaptiveRateLimiter(max_concurrency=3)
+        peak = 0
+
+        async def fn():
+            nonlocal peak
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.001)
+
+        async def main():
+            await asyncio.gather(*(limiter.call(fn) for _ in range(20)))
+        asyncio.run(main())
+        self.assertEqual(peak, 3)
+        self.assertEqual(limiter.in_flight, 0)
+        self.assertEqual(limiter.stats["calls"], 20)
+
+    def test_rate_limited_calls_are_retried_and_halve_the_limit(self):
+        # A short quota window, so the rate learned from one success is high
+        limiter = AdaptiveRateLimiter(max_concurrency=8, base_delay=0.001, rate_window=0.06, seed=1)
+        asyncio.run(limiter.call(failing()))
+        self.assertEqual(asyncio.run(limiter.call(failing(429, 503))), "ok")
+        self.assertEqual(limiter.stats["rate_limited"], 1)
+        self.assertEqual(limiter.stats["retries"], 2)
+        # Halved by the 429 and the learned rate set to the one success
+        # per window seen before it; then only the final success counts
+        self.assertEqual(limiter.limit, 4.25)
+        self.assertAlmostEqual(limiter.rate, 1100.0)
+
+    def test_other_errors_and_exhausted_attempts_raise(self):
+        limiter = AdaptiveRateLimiter(max_attempts=2, base_delay=0.001)
+        with self.assertRaises(ModelError):
+            asyncio.run(limiter.call(failing(400)))
+        self.assertEqual(limiter.stats["retries"], 0)
+        with self.assertRaises(ModelError):
+            asyncio.run(limiter.call(failing(500, 500, 500)))
+        self.assertEqual(limiter.stats["retries"], 1)
+        self.assertEqual(limiter.stats["failures"], 2)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_cancelled_calls_release_their_slot(self):
+        limiter = AdaptiveRateLimiter(max_concurrency=2)
+
+        async def main():
+            tasks = [asyncio.create_task(limiter.call(lambda: asyncio.sleep(10))) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            return await asyncio.wait_for(limiter.call(failing()), 1)
+        self.assertEqual(asyncio.run(main()), "ok")
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_request_budget_allows_a_burst_of_half_a_window(self):
+        limiter = AdaptiveRateLimiter(rpm=60)
+
+        async def main():
+            for _ in range(30):
+                await asyncio.wait_for(limiter.acquire(), 0.1)
+                limiter.release()
+            await asyncio.wait_for(limiter.acquire(), 0.1)
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(main())
+
+
+class ModelBudgetTest(unittest.TestCase):
+
+    def setUp(self):
+        patch = mock.patch.object(rate_limiter, "_limiters", {})
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_tiers(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop("MEALMIND_RATE_TIER", None)
+            self.assertEqual(model_budget("gemini-2.5-flash")["rpm"], 10)
+            os.environ["MEALMIND_RATE_TIER"] = "tier2"
+            self.assertEqual(get_rate_limiter("gemini-2.5-pro").rpm, 1000)
+        self.assertEqual(model_budget("gemini-2.5-flash", "tier1")["rpm"], 1000)
+        self.assertEqual(model_budget("unknown-model", "tier1"), {})
+        with self.assertRaises(ValueError):
+            model_budget("gemini-2.5-flash", "tier9")
+
+    def test_configure_replaces_the_shared_limiter(self):
+        limiter = configure_rate_limiter("gemini-2.5-flash", tier="tier1", max_concurrency=4)
+        self.assertIs(get_rate_limiter("gemini-2.5-flash"), limiter)
+        self.assertEqual((limiter.rpm, limiter.tpm, limiter.max_concurrency), (1000, 1000000, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
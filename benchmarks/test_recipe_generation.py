@@ -0,0 +1,101 @@
+"""Tests for concurrent per-day recipe generation.
+
+The agents are stubbed out (no ADK or API key needed).
+
+Usage:
+    python -m unittest benchmarks.test_recipe_generation
+"""
+import asyncio
+import json
+import re
+import types
+import unittest
+from collections import Counter
+from unittest import mock
+
+import orchestrator
+from memory import InMemorySessionStore
+from tools import create_household_profile, add_family_member, HOUSEHOLD_PROFILES
+from utils import allocate_main_ingredients, MAIN_INGREDIENTS, MEAL_SLOTS
+
+from .synthetic import fixed_recipe
+
+AGENTS = [
+    types.SimpleNamespace(name=name)
+    for name in ("recipe_generator", "nutrition_validator", "meal_coordinator", "json_repair")
+]
+
+
+def chunk_slots(days: int) -> list:
+    return [[(day, meal_type) for meal_type in MEAL_SLOTS] for day in range(1, days + 1)]
+
+
+class AllocateMainIngredientsTest(unittest.TestCase):
+
+    def test_chunks_get_different_mains(self):
+        allocations = allocate_main_ingredients(MAIN_INGREDIENTS, chunk_slots(7))
+        mains = [name for chunk in allocations for name in chunk.values()]
+        self.assertEqual(len(mains), 21)
+        self.assertEqual(len(set(mains)), 21)
+        self.assertIn(allocations[0][(1, "breakfast")], MAIN_INGREDIENTS["breakfast"])
+
+    def test_reuse_is_capped_and_leftover_slots_are_open(self):
+        allocations = allocate_main_ingredients(MAIN_INGREDIENTS, chunk_slots(30), max_main_reuse=2)
+        uses = Counter(name for chunk in allocations for name in chunk.values())
+        self.assertEqual(max(uses.values()), 2)
+        for chunk in allocations:
+            self.assertEqual(len(set(chunk.values())), len(chunk))
+        self.assertNotIn((30, "breakfast"), allocations[-1])  # breakfast pool used up
+
+    def test_empty_pool(self):
+        self.assertEqual(allocate_main_ingredients({}, chunk_slots(2)), [{}, {}])
+
+
+class ChunkPromptTest(unittest.TestCase):
+
+    def setUp(self):
+        self.prompts = []
+
+        async def run_stage(orch, agent, message, household_id, session_id):
+            if agent.name == "recipe_generator":
+                self.prompts.append(message)
+                await asyncio.sleep(0)  # let every chunk start before any finishes
+                slots = re.findall(r"day (\d+) (breakfast|lunch|dinner): ([\w ]+)", message)
+                return json.dumps([
+                    fixed_recipe(f"{main} {meal_type} {day}", [main if main != "any" else f"x{day}{meal_type}"],
+                                 int(day), meal_type)
+                    for day, meal_type, main in slots
+                ])
+            if agent.name == "nutrition_validator":
+                recipes = json.loads(message[message.rindex("\n") + 1:])
+                return json.dumps([{"index": i, "approved": True} for i in range(len(recipes))])
+            return "{}"
+
+        patches = [
+            mock.patch.object(orchestrator, "get_shared_agents", lambda api_key=None, model=None: AGENTS),
+            mock.patch.object(orchestrator.MealPlanOrchestrator, "_run_stage", run_stage)
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        create_household_profile("chunks_h", "Chunks")
+        add_family_member("chunks_h", "A", 30, "vegetarian", "soy")
+        self.addCleanup(HOUSEHOLD_PROFILES.pop, "chunks_h", None)
+
+    def test_concurrent_chunks_are_given_distinct_allowed_mains(self):
+        orch = orchestrator.MealPlanOrchestrator(session_store=InMemorySessionStore(), coalesce=False)
+        result = asyncio.run(orch.generate_meal_plan("chunks_h", days=5))
+        self.assertEqual(result["status"], "complete")
+
+        self.assertEqual(len(self.prompts), 5)  # no dedup round was needed
+        assigned = [main for prompt in self.prompts for _, _, main in re.findall(
+            r"day (\d+) (breakfast|lunch|dinner): ([\w ]+)", prompt
+        )]
+        self.assertEqual(len(assigned), 15)
+        self.assertEqual(len(set(assigned)), 15)
+        for main in ("chicken breast", "salmon", "tofu", "tempeh"):
+            self.assertNotIn(main, assigned)
+
+
+if __name__ == "__main__":
+    unittest.main()
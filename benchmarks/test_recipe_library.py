@@ -0,0 +1,56 @@
+"""Tests for RecipeLibrary lookups against household constraints.
+
+Usage:
+    python -m unittest benchmarks.test_recipe_library
+"""
+import unittest
+
+from memory import RecipeLibrary
+
+from .synthetic import fixed_recipe
+
+
+class RecipeLibraryFindTest(unittest.TestCase):
+
+    def setUp(self):
+        self.library = RecipeLibrary()
+        self.library.add_recipes([
+            fixed_recipe("Almond Salad", ["almond", "lettuce"]),
+            fixed_recipe("Cheese Pasta", ["pasta", "cheddar cheese"]),
+            fixed_recipe("Rice Bowl", ["brown rice", "spinach"]),
+            fixed_recipe("Bacon Rice", ["bacon", "brown rice"]),
+            fixed_recipe("Slow Stew", ["beef", "carrot"], minutes=90)
+        ])
+
+    def find(self, **constraints) -> list:
+        return sorted(entry["recipe"]["name"] for entry in self.library.find("dinner", constraints))
+
+    def test_unconstrained(self):
+        self.assertEqual(len(self.find()), 5)
+
+    def test_allergy_groups(self):
+        self.assertNotIn("Almond Salad", self.find(allergies=["nuts"]))
+        self.assertNotIn("Cheese Pasta", self.find(allergies=["dairy"]))
+        self.assertNotIn("Cheese Pasta", self.find(allergies=["gluten"]))
+
+    def test_restrictions_and_health_guidelines(self):
+        self.assertEqual(self.find(dietary_restrictions=["Vegetarian"]), ["Almond Salad", "Cheese Pasta", "Rice Bowl"])
+        self.assertNotIn("Bacon Rice", self.find(health_conditions=["high blood pressure"]))
+
+    def test_plant_substitutes_keep_diet_tags(self):
+        self.library.add_recipes([fixed_recipe("Oat Porridge", ["rolled oats", "almond milk", "peanut butter"])])
+        self.assertIn("Oat Porridge", self.find(dietary_restrictions=["vegan"], allergies=["dairy"]))
+        self.assertNotIn("Oat Porridge", self.find(allergies=["nuts"]))
+
+    def test_cooking_time_limit(self):
+        self.assertNotIn("Slow Stew", self.find(cooking_time_max=45))
+
+    def test_constraints_without_term_tables_match_nothing(self):
+        # Unverifiable constraints must fall back to generation plus validation
+        self.assertEqual(self.find(health_conditions=["celiac"]), [])
+        self.assertEqual(self.find(dietary_restrictions=["keto"]), [])
+        self.assertEqual(self.find(allergies=["kiwi"]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
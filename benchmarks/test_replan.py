@@ -0,0 +1,135 @@
+"""Tests for replacing one meal of a finished plan.
+
+The agents are stubbed out (no ADK or API key needed): the recipe
+generator returns queued candidates and the validator approves or rejects
+everything.
+
+Usage:
+    python -m unittest benchmarks.test_replan
+"""
+import asyncio
+import json
+import types
+import unittest
+from unittest import mock
+
+import orchestrator
+from memory import InMemorySessionStore
+from tools import create_household_profile, add_family_member, HOUSEHOLD_PROFILES
+from utils import PlanAggregates
+
+from .synthetic import fixed_recipe
+
+AGENTS = [
+    types.SimpleNamespace(name=name)
+    for name in ("recipe_generator", "nutrition_validator", "meal_coordinator", "json_repair")
+]
+
+
+class ReplanTest(unittest.TestCase):
+
+    def setUp(self):
+        self.candidates = []  # recipes the generator returns, in order
+        self.messages = []  # (agent name, message)
+        self.approve = True
+
+        async def run_stage(orch, agent, message, household_id, session_id):
+            self.messages.append((agent.name, message))
+            if agent.name == "recipe_generator":
+                return json.dumps([self.candidates.pop(0)])
+            if agent.name == "nutrition_validator":
+                recipes = json.loads(message[message.rindex("\n") + 1:])
+                return json.dumps([{"index": i, "approved": self.approve} for i in range(len(recipes))])
+            return "{}"
+
+        patches = [
+            mock.patch.object(orchestrator, "get_shared_agents", lambda api_key=None, model=None: AGENTS),
+            mock.patch.object(orchestrator.MealPlanOrchestrator, "_run_stage", run_stage)
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.orch = orchestrator.MealPlanOrchestrator(session_store=InMemorySessionStore(), coalesce=False)
+
+        create_household_profile("replan_h", "Replan", cooking_time_max=60)
+        add_family_member("replan_h", "A", 30, "vegetarian", "nuts", "high blood pressure")
+        self.addCleanup(HOUSEHOLD_PROFILES.pop, "replan_h", None)
+        self.plan = {
+            "household_id": "replan_h",
+            "request_id": "r1",
+            "meal_plan": [{"day": 1, "meals": [
+                fixed_recipe("Porridge", ["oats", "banana"], meal_type="breakfast", minutes=10),
+                fixed_recipe("Lentil Soup", ["lentils", "carrot", "onion"], meal_type="lunch", minutes=25),
+                fixed_recipe("Veggie Curry", ["chickpeas", "spinach", "tomato", "rice"], minutes=20)
+            ]}]
+        }
+
+    def replan(self, *candidates, **options) -> dict:
+        self.candidates = list(candidates)
+        return asyncio.run(self.orch.replan(self.plan, 1, "dinner", **options))
+
+    def test_acceptable_replacement(self):
+        result = self.replan(fixed_recipe("Tofu Stir Fry", ["tofu", "broccoli", "rice"]))
+        self.assertEqual(result["replaced"]["old"], "Veggie Curry")
+        self.assertEqual(result["replaced"]["new"], "Tofu Stir Fry")
+        self.assertEqual(result["meal_plan"][0]["meals"][2]["name"], "Tofu Stir Fry")
+        self.assertEqual(self.plan["meal_plan"][0]["meals"][2]["name"], "Veggie Curry")  # input untouched
+        self.assertNotIn("nutrition_validator", [name for name, _ in self.messages])
+
+    def test_rejected_recipe_and_near_duplicates_are_refused(self):
+        result = self.replan(
+            fixed_recipe("veggie curry ", ["tofu", "rice"]),
+            fixed_recipe("Chickpea Spinach Rice", ["chickpeas", "spinach", "tomato", "rice"]),
+            attempts=2
+        )
+        self.assertEqual(result["status"], "invalid")
+        self.assertIn("nearly the same ingredients as the rejected Veggie Curry", result["errors"][0])
+        self.assertIn("is the rejected recipe", self.messages[1][1])  # fed back to the model
+
+    def test_constraints_time_and_repeats_are_checked(self):
+        result = self.replan(
+            fixed_recipe("Almond Bake", ["almond flour", "egg"]),
+            fixed_recipe("Bacon Pasta", ["bacon", "pasta"]),
+            fixed_recipe("Slow Bean Stew", ["beans", "potato"], minutes=30),
+            fixed_recipe("Lentil Soup", ["lentils", "celery"]),
+            fixed_recipe("Bean Tacos", ["beans", "tortilla"], minutes=25),
+            attempts=5
+        )
+        self.assertEqual(result["replaced"]["new"], "Bean Tacos")
+        feedback = [message for name, message in self.messages if name == "recipe_generator"][1:]
+        self.assertIn("allergen nuts: almond flour", feedback[0])
+        self.assertIn("not vegetarian: bacon", feedback[1])
+        self.assertIn("high sodium should be avoided", feedback[1])
+        self.assertIn("25 minutes left", feedback[2])
+        self.assertIn("Lentil Soup is already in the plan", feedback[3])
+
+    def test_unknown_constraints_go_to_the_validator(self):
+        add_family_member("replan_h", "B", 40, "keto")
+        self.approve = False
+        result = self.replan(fixed_recipe("Tofu Stir Fry", ["tofu", "broccoli"]), attempts=1)
+        self.assertIn("validator rejected the recipe (unchecked constraints: diet: keto)", result["errors"])
+        self.assertEqual(self.orch.checkpoints.store.keys("checkpoint:"), [])
+
+    def test_totals_are_updated_not_recomputed(self):
+        first = self.replan(fixed_recipe("Tofu Stir Fry", ["tofu", "broccoli", "rice"]))
+        self.candidates = [fixed_recipe("Bean Chili", ["beans", "tomato", "onion"])]
+        with mock.patch.object(orchestrator.PlanAggregates, "from_plan", side_effect=AssertionError):
+            second = asyncio.run(self.orch.replan(first, 1, "dinner"))
+        fresh = PlanAggregates.from_plan(second["meal_plan"], 150.0, cooking_time_max=60)
+        self.assertEqual(second["grocery_list"], fresh.grocery_list())
+        self.assertEqual(second["optimization"], fresh.schedule())
+
+        # Replanning the older version again sums it once more
+        self.candidates = [fixed_recipe("Bean Tacos", ["beans", "tortilla"])]
+        again = asyncio.run(self.orch.replan(first, 1, "dinner"))
+        fresh = PlanAggregates.from_plan(again["meal_plan"], 150.0, cooking_time_max=60)
+        self.assertEqual(again["grocery_list"], fresh.grocery_list())
+
+    def test_unknown_household(self):
+        result = self.replan(household_id="nobody")
+        self.assertEqual(result["status"], "invalid")
+        self.assertEqual(self.messages, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
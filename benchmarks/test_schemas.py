@@ -0,0 +1,78 @@
+"""Tests for stage output extraction, schema validation and repair paths.
+
+Usage:
+    python -m unittest benchmarks.test_schemas
+"""
+import unittest
+
+from utils import (
+    extract_json,
+    get_path,
+    apply_patch,
+    validate,
+    normalize_verdicts,
+    normalize_plan,
+    RECIPE_LIST_SCHEMA,
+    VERDICT_LIST_SCHEMA,
+    PLAN_SCHEMA
+)
+
+from .synthetic import fixed_recipe
+
+
+class JsonExtractTest(unittest.TestCase):
+
+    def test_fenced_value_after_prose(self):
+        value, complete = extract_json('Here you go:\n```json\n[{"a": 1}]\n```\nEnjoy!')
+        self.assertEqual(value, [{"a": 1}])
+        self.assertTrue(complete)
+
+    def test_truncated_output_recovers_prefix(self):
+        value, complete = extract_json('[{"name": "Oats", "servings": 2}, {"name": "Sal')
+        self.assertFalse(complete)
+        self.assertEqual(value[0], {"name": "Oats", "servings": 2})
+
+    def test_no_json(self):
+        self.assertEqual(extract_json("no json here"), (None, False))
+
+    def test_paths_and_patches(self):
+        data = [{"ingredients": [{"amount": "lots"}]}]
+        self.assertEqual(get_path(data, "0.ingredients.0.amount"), "lots")
+        self.assertIsNone(get_path(data, "3.name"))
+        apply_patch(data, {"0.ingredients.0.amount": 100, "0.name": "Stew"})
+        self.assertEqual(data, [{"ingredients": [{"amount": 100}], "name": "Stew"}])
+
+
+class SchemaTest(unittest.TestCase):
+
+    def test_valid_recipes(self):
+        self.assertEqual(validate([fixed_recipe("Stew", ["beef"])], RECIPE_LIST_SCHEMA), [])
+
+    def test_errors_carry_paths(self):
+        bad = fixed_recipe("Stew", ["beef"])
+        bad["meal_type"] = "brunch"
+        bad["ingredients"][0]["amount"] = -5
+        paths = {error["path"] for error in validate([bad], RECIPE_LIST_SCHEMA)}
+        self.assertEqual(paths, {"0.meal_type", "0.ingredients.0.amount"})
+
+    def test_booleans_are_not_numbers(self):
+        errors = validate([{"index": 0, "approved": 1}], VERDICT_LIST_SCHEMA)
+        self.assertEqual([error["path"] for error in errors], ["0.approved"])
+        self.assertEqual(validate(True, {"type": "integer"})[0]["path"], "")
+
+    def test_errors_are_capped(self):
+        errors = validate([{}] * 50, RECIPE_LIST_SCHEMA, max_errors=5)
+        self.assertEqual(len(errors), 5)
+
+    def test_verdicts_unwrapped(self):
+        self.assertEqual(normalize_verdicts({"verdicts": [{"index": 0}]}), [{"index": 0}])
+        self.assertIsNone(normalize_verdicts("approved"))
+
+    def test_flat_recipes_grouped_into_plan(self):
+        plan = normalize_plan([fixed_recipe("B", ["oats"], 2, "breakfast"), fixed_recipe("A", ["rice"], 1)])
+        self.assertEqual([day["day"] for day in plan["days"]], [1, 2])
+        self.assertEqual(validate(plan, PLAN_SCHEMA), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Tests for the async HTTP service's job queue and request limits.
+
+The orchestrator is a stub whose plans finish when the test lets them.
+
+Usage:
+    python -m unittest benchmarks.test_service
+"""
+import asyncio
+import unittest
+
+from service import MAX_BODY_BYTES, MAX_PLAN_DAYS, MealPlanService
+
+from .load_test_service import http_request
+
+
+class StubOrchestrator:
+    """Completes plans once release is set; household "bad" fails."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+
+    async def generate_meal_plan(self, household_id: str, days: int, request_id: str) -> dict:
+        await self.release.wait()
+        if household_id == "bad":
+            return {"status": "invalid", "stage": "recipe_generator", "errors": ["no JSON found in output"]}
+        return {"status": "complete", "household_id": household_id, "request_id": request_id}
+
+
+class MealPlanServiceTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.orchestrator = StubOrchestrator()
+        self.service = MealPlanService(self.orchestrator, workers=1, queue_size=2)
+        await self.service.start("127.0.0.1", 0)
+
+    async def asyncTearDown(self):
+        await self.service.stop()
+
+    async def request(self, method: str, path: str, payload: dict = None) -> tuple:
+        return await http_request("127.0.0.1", self.service.port, method, path, payload)
+
+    async def plan(self, household_id: str = "h", days: int = 2) -> tuple:
+        return await self.request("POST", "/plans", {"household_id": household_id, "days": days})
+
+    async def wait_for(self, job_id: str) -> dict:
+        for _ in range(100):
+            _, _, job = await self.request("GET", f"/plans/{job_id}")
+            if job["status"] in ("complete", "failed"):
+                return job
+            await asyncio.sleep(0.01)
+        self.fail(f"job {job_id} did not finish")
+
+    async def test_full_queue_answers_429_with_retry_after(self):
+        status, _, running = await self.plan()
+        self.assertEqual(status, 202)
+        await asyncio.sleep(0.01)  # the worker takes it off the queue
+        queued = [await self.plan() for _ in range(2)]
+        self.assertEqual([status for status, _, _ in queued], [202, 202])
+
+        status, headers, body = await self.plan()
+        self.assertEqual(status, 429)
+        self.assertEqual(headers["retry-after"], "20")  # 2 queued jobs x 10 s seeded average, 1 worker
+        self.assertEqual(body, {"error": "Queue full", "retry_after": 20})
+        self.assertEqual(self.service.stats["rejected"], 1)
+
+        self.orchestrator.release.set()
+        for job_id in [running["job_id"]] + [body["job_id"] for _, _, body in queued]:
+            self.assertEqual((await self.wait_for(job_id))["status"], "complete")
+        status, _, body = await self.plan()  # room again
+        self.assertEqual(status, 202)
+        await self.wait_for(body["job_id"])
+        _, _, health = await self.request("GET", "/health")
+        self.assertEqual((health["accepted"], health["rejected"], health["completed"]), (4, 1, 4))
+
+    async def test_failed_plans_are_reported(self):
+        self.orchestrator.release.set()
+        _, _, body = await self.plan("bad")
+        job = await self.wait_for(body["job_id"])
+        self.assertEqual(job["status"], "failed")
+        self.assertEqual(job["error"], "Plan invalid at recipe_generator")
+
+    async def test_invalid_requests(self):
+        for days in (0, MAX_PLAN_DAYS + 1, "x"):
+            with self.subTest(days=days):
+                status, _, _ = await self.plan(days=days)
+                self.assertEqual(status, 400)
+        self.assertEqual((await self.request("POST", "/plans", {"days": 2}))[0], 400)
+        self.assertEqual((await self.request("GET", "/plans/unknown"))[0], 404)
+        self.assertEqual(self.service.stats["accepted"], 0)
+
+    async def test_oversized_body_is_refused_unread(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.service.port)
+        writer.write(f"POST /plans HTTP/1.1\r\nContent-Length: {MAX_BODY_BYTES + 1}\r\n\r\n".encode())
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        self.assertTrue(response.startswith(b"HTTP/1.1 413 Payload Too Large"))
+
+
+if __name__ == "__main__":
+    unittest.main()
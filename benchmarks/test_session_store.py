@@ -0,0 +1,137 @@
+"""Tests for the versioned SQLite session store and its users.
+
+Two stores opened on the same database file stand in for two workers.
+
+Usage:
+    python -m unittest benchmarks.test_session_store
+"""
+import os
+import tempfile
+import unittest
+
+from memory import CheckpointStore, SessionManager, SQLiteSessionStore, StaleWriteError
+
+
+class SessionStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "sessions.db")
+        self.stores = []
+
+    def tearDown(self):
+        for store in self.stores:
+            store.close()
+        self.directory.cleanup()
+
+    def store(self, **settings) -> SQLiteSessionStore:
+        store = SQLiteSessionStore(self.path, **settings)
+        self.stores.append(store)
+        return store
+
+
+class SQLiteSessionStoreTest(SessionStoreTestCase):
+
+    def test_other_workers_flushed_writes_are_seen(self):
+        a, b = self.store(), self.store()
+        a.put("k", {"n": 1})
+        a.flush()
+        self.assertEqual(b.get("k"), {"n": 1})
+        a.put("k", {"n": 2})
+        a.flush()
+        self.assertEqual(b.get("k"), {"n": 2})  # the cached copy is stale
+        self.assertEqual(b.keys("k"), ["k"])
+
+    def test_stale_write_is_dropped_and_reported(self):
+        a, b = self.store(), self.store()
+        a.put("k", {"n": 1})
+        a.flush()
+        b.get("k")
+        a.get("k")
+        a.put("k", {"n": 2})
+        a.flush()
+        b.put("k", {"n": 3})
+        with self.assertRaises(StaleWriteError) as caught:
+            b.flush()
+        self.assertEqual(caught.exception.keys, ["k"])
+        self.assertEqual(b.get("k"), {"n": 2})
+        b.flush()  # reported once
+
+    def test_concurrent_creates_keep_the_first(self):
+        a, b = self.store(), self.store()
+        self.assertIsNone(a.get("k"))
+        self.assertIsNone(b.get("k"))
+        a.put("k", {"by": "a"})
+        a.flush()
+        b.put("k", {"by": "b"})
+        with self.assertRaises(StaleWriteError):
+            b.flush()
+        self.assertEqual(b.get("k"), {"by": "a"})
+
+    def test_blind_writes_and_deletes_never_conflict(self):
+        a, b = self.store(), self.store()
+        a.put("k", {"n": 1})
+        a.flush()
+        b.put("k", {"n": 2})
+        b.flush()
+        a.delete("k")
+        a.flush()
+        self.assertIsNone(b.get("k"))
+
+    def test_stale_writes_reported_only_to_their_keys(self):
+        a, b = self.store(), self.store(batch_size=1)
+        a.put("session:h", {"n": 1})
+        a.flush()
+        b.get("session:h")
+        a.get("session:h")
+        a.put("session:h", {"n": 2})
+        a.flush()
+        b.put("session:h", {"n": 3})  # dropped by an automatic flush
+        b.put("checkpoint:h:r:recipes", {"output": "[]"})
+        b.flush(["checkpoint:h:r:recipes"])
+        with self.assertRaises(StaleWriteError) as caught:
+            b.flush(["session:h"])
+        self.assertEqual(caught.exception.keys, ["session:h"])
+
+
+class StoreUsersTest(SessionStoreTestCase):
+
+    def test_checkpoint_save_ignores_other_keys_conflicts(self):
+        a, b = self.store(), self.store(batch_size=1)
+        a.put("session:h", {"n": 1})
+        a.flush()
+        b.get("session:h")
+        a.get("session:h")
+        a.put("session:h", {"n": 2})
+        a.flush()
+        b.put("session:h", {"n": 3})  # stale, dropped by an automatic flush
+        CheckpointStore(b).save("h", "r1", "recipes", "[]")
+        self.assertEqual(CheckpointStore(a).load("h", "r1", "recipes"), "[]")
+
+    def test_workers_appending_to_one_session_lose_nothing(self):
+        for batch_size in (1, 32):
+            with self.subTest(batch_size=batch_size):
+                a = SessionManager(self.store(batch_size=batch_size))
+                b = SessionManager(self.store(batch_size=batch_size))
+                session_id = f"h{batch_size}"
+                a.get_or_create_session(session_id, "h")
+                b.get_or_create_session(session_id, "h")  # both create it
+                a.add_message(session_id, "user", "a1")
+                b.add_message(session_id, "user", "b1")
+                b.update_context(session_id, {"days": 3})
+                a.flush()
+                b.flush()
+                a.add_message(session_id, "assistant", "a2")
+                b.add_message(session_id, "assistant", "b2")
+                b.flush()
+                a.flush()
+
+                contents = [m["content"] for m in a.get_messages(session_id, limit=10)]
+                self.assertEqual(sorted(contents), ["a1", "a2", "b1", "b2"])
+                self.assertEqual(b.get_context(session_id), {"days": 3})
+                self.assertEqual(a._unsaved, {})
+                self.assertEqual(b._unsaved, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
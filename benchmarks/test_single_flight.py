@@ -0,0 +1,83 @@
+"""Tests for coalescing concurrent identical requests.
+
+Usage:
+    python -m unittest benchmarks.test_single_flight
+"""
+import asyncio
+import unittest
+
+from utils import SingleFlight
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def test_concurrent_calls_share_one_run(self):
+        async def scenario():
+            flight = SingleFlight()
+            runs = []
+
+            async def work():
+                runs.append(1)
+                await asyncio.sleep(0.01)
+                return "plan"
+
+            results = await asyncio.gather(*(flight.run("key", work) for _ in range(5)))
+            return runs, results
+
+        runs, results = asyncio.run(scenario())
+        self.assertEqual(len(runs), 1)
+        self.assertEqual([leader for _, leader in results].count(True), 1)
+        self.assertTrue(all(result == "plan" for result, _ in results))
+
+    def test_errors_reach_every_caller(self):
+        async def scenario():
+            flight = SingleFlight()
+
+            async def work():
+                await asyncio.sleep(0.01)
+                raise ValueError("bad output")
+
+            return await asyncio.gather(*(flight.run("key", work) for _ in range(3)), return_exceptions=True)
+
+        results = asyncio.run(scenario())
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+    def test_cancelling_one_caller_keeps_the_work_for_others(self):
+        async def scenario():
+            flight = SingleFlight()
+
+            async def work():
+                await asyncio.sleep(0.02)
+                return "plan"
+
+            first = asyncio.ensure_future(flight.run("key", work))
+            second = asyncio.ensure_future(flight.run("key", work))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second, flight.stats
+
+        (result, _), stats = asyncio.run(scenario())
+        self.assertEqual(result, "plan")
+        self.assertEqual(stats["started"], 1)
+
+    def test_caller_after_last_waiter_cancels_starts_fresh_work(self):
+        async def scenario():
+            flight = SingleFlight()
+
+            async def work():
+                await asyncio.sleep(0.05)
+                return "plan"
+
+            first = asyncio.ensure_future(flight.run("key", work))
+            await asyncio.sleep(0)
+            first.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await first
+            # The cancelled work has not finished unwinding yet
+            return await flight.run("key", work)
+
+        self.assertEqual(asyncio.run(scenario()), ("plan", True))
+
+
+if __name__ == "__main__":
+    unittest.main()
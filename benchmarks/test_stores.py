@@ -0,0 +1,94 @@
+"""Tests for the shared household, memory and session stores under threads.
+
+Usage:
+    python -m unittest benchmarks.test_stores
+"""
+import random
+import sys
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from memory import MemoryBank, SessionManager
+from tools import create_household_profile, add_family_member, HOUSEHOLD_PROFILES
+from utils import KeyedLock
+
+from .stress_concurrent_stores import run_stress
+from .synthetic import make_plan
+
+
+class KeyedLockTest(unittest.TestCase):
+
+    def test_keys_map_to_stable_reentrant_locks(self):
+        locks = KeyedLock(stripes=8)
+        self.assertIs(locks("h1"), locks("h1"))
+        with locks("h1"):
+            with locks("h1"):
+                pass
+
+    def test_one_writer_per_key(self):
+        locks = KeyedLock()
+        counts = {"h1": 0}
+        inside = []
+
+        def bump(_):
+            with locks("h1"):
+                inside.append(1)
+                self.assertEqual(len(inside), 1)
+                counts["h1"] += 1
+                inside.pop()
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(pool.map(bump, range(2000)))
+        self.assertEqual(counts["h1"], 2000)
+
+
+class StoresTest(unittest.TestCase):
+
+    def setUp(self):
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # switch threads aggressively to expose races
+        self.addCleanup(sys.setswitchinterval, interval)
+
+    def test_no_lost_updates(self):
+        for name, (expected, actual) in run_stress(ops=400, workers=16, households=2).items():
+            with self.subTest(name):
+                self.assertEqual(actual, expected)
+
+    def test_profile_snapshots_are_copy_on_write(self):
+        create_household_profile("stores_h", "Stores")
+        self.addCleanup(HOUSEHOLD_PROFILES.pop, "stores_h", None)
+        snapshot = HOUSEHOLD_PROFILES["stores_h"]
+        add_family_member("stores_h", "A", 30)
+        self.assertEqual(snapshot["members"], [])
+        self.assertEqual(len(HOUSEHOLD_PROFILES["stores_h"]["members"]), 1)
+
+    def test_get_or_create_session_creates_once(self):
+        sessions = SessionManager()
+        start = threading.Barrier(8)
+
+        def join(i: int):
+            start.wait()
+            sessions.get_or_create_session("s1", "h1")
+            sessions.add_message("s1", "user", f"message {i}")
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(join, range(8)))
+        self.assertEqual(len(sessions.get_messages("s1", limit=100)), 8)
+
+    def test_history_keeps_ten_plans_and_indexes_only_those(self):
+        bank = MemoryBank()
+        rng = random.Random(3)
+        for _ in range(12):
+            bank.store_meal_plan("h1", {"days": make_plan(rng, 1)})
+        history = bank.get_meal_history("h1", limit=20)
+        self.assertEqual(len(history), 10)
+        index = bank.variety_index("h1")
+        self.assertEqual(len(index), 30)
+        for entry in history:
+            for meal in entry["plan"]["days"][0]["meals"]:
+                self.assertIn((entry["plan_id"], meal["name"]), index)
+
+
+if __name__ == "__main__":
+    unittest.main()
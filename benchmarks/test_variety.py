@@ -0,0 +1,68 @@
+"""Tests for near-duplicate recipe detection.
+
+Usage:
+    python -m unittest benchmarks.test_variety
+"""
+import unittest
+
+from memory import MemoryBank
+from utils import MinHashIndex, recipe_shingles, merge_recipe_chunks
+
+from .synthetic import fixed_recipe
+
+STIR_FRY = fixed_recipe("Stir Fry", ["chicken", "rice", "broccoli", "soy sauce", "garlic"])
+FRIED_RICE = fixed_recipe("Fried Rice", ["chicken", "rice", "broccoli", "soy sauce", "egg"])
+PORRIDGE = fixed_recipe("Porridge", ["oats", "milk", "banana"], meal_type="breakfast")
+
+
+class MinHashIndexTest(unittest.TestCase):
+
+    def test_near_duplicates_found_distinct_recipes_not(self):
+        index = MinHashIndex(threshold=0.6)
+        index.add("stir fry", recipe_shingles(STIR_FRY))
+        index.add("porridge", recipe_shingles(PORRIDGE))
+
+        similar = index.query(recipe_shingles(FRIED_RICE))
+        self.assertEqual([key for key, _ in similar], ["stir fry"])
+        self.assertEqual(index.query(recipe_shingles(fixed_recipe("Salad", ["lettuce", "tomato"]))), [])
+
+    def test_remove(self):
+        index = MinHashIndex()
+        items = recipe_shingles(fixed_recipe("Stew", ["beef", "carrot", "potato"]))
+        index.add("stew", items)
+        index.remove("stew")
+        self.assertNotIn("stew", index)
+        self.assertEqual(index.query(items), [])
+        self.assertTrue(all(not buckets for buckets in index._buckets))
+
+
+class VarietyIndexTest(unittest.TestCase):
+
+    def test_history_index_follows_the_last_ten_plans(self):
+        bank = MemoryBank()
+        bank.store_meal_plan("h1", {"meal_plan": [{"day": 1, "meals": [STIR_FRY]}]})
+        self.assertEqual(len(bank.variety_index("h1").query(recipe_shingles(FRIED_RICE))), 1)
+        self.assertEqual(len(bank.variety_index("h2")), 0)
+
+        for _ in range(10):
+            bank.store_meal_plan("h1", {"meal_plan": [{"day": 1, "meals": [PORRIDGE]}]})
+        self.assertEqual(bank.variety_index("h1").query(recipe_shingles(FRIED_RICE)), [])
+        self.assertEqual(len(bank.variety_index("h1")), 10)
+
+    def test_merge_flags_repeats_of_history_and_of_the_plan(self):
+        bank = MemoryBank()
+        bank.store_meal_plan("h1", {"meal_plan": [{"day": 1, "meals": [STIR_FRY]}]})
+        chunks = [
+            [fixed_recipe("Fried Rice", ["chicken", "rice", "broccoli", "soy sauce", "egg"], 1)],
+            [fixed_recipe("Oat Bowl", ["oats", "milk", "banana"], 2, "breakfast"),
+             fixed_recipe("Banana Oats", ["oats", "milk", "banana"], 2, "lunch")]
+        ]
+        merged = merge_recipe_chunks(chunks, history=bank.variety_index("h1"))
+        names = [recipe["name"] for recipe in merged["recipes"]]
+        flagged = {names[index] for index in merged["conflicts"]}
+        self.assertEqual(flagged, {"Fried Rice", "Banana Oats"})
+        self.assertIn("Stir Fry", merged["near_duplicates"].values())
+
+
+if __name__ == "__main__":
+    unittest.main()
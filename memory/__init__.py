@@ -1,10 +1,26 @@
 """Memory package - Session management & long-term memory."""
 from .memory_bank import MemoryBank, memory_bank
 from .session_manager import SessionManager, session_manager
+from .session_store import (
+    SessionStore,
+    InMemorySessionStore,
+    SQLiteSessionStore,
+    StaleWriteError,
+    create_session_store
+)
+from .checkpoint_store import CheckpointStore
+from .recipe_library import RecipeLibrary
 
 __all__ = [
     'MemoryBank',
     'memory_bank',
     'SessionManager',
-    'session_manager'
+    'session_manager',
+    'SessionStore',
+    'InMemorySessionStore',
+    'SQLiteSessionStore',
+    'StaleWriteError',
+    'create_session_store',
+    'CheckpointStore',
+    'RecipeLibrary'
 ]
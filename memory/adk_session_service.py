@@ -0,0 +1,108 @@
+"""ADK session service backed by a SessionStore."""
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+from .session_store import SessionStore
+
+
+class StoreSessionService(BaseSessionService):
+    """Persists ADK runner sessions in the same store as SessionManager."""
+
+    def __init__(self, store: SessionStore):
+        """Initialize session service.
+
+        Args:
+            store: Shared session storage backend
+        """
+        super().__init__()
+        self.store = store
+
+    def _key(self, app_name: str, user_id: str, session_id: str) -> str:
+        """Storage key for an ADK session."""
+        return f"adk:{app_name}:{user_id}:{session_id}"
+
+    def _save(self, session: Session):
+        """Write session to the store."""
+        self.store.put(
+            self._key(session.app_name, session.user_id, session.id),
+            session.model_dump(mode="json")
+        )
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None
+    ) -> Session:
+        """Create and store a new session."""
+        session = Session(
+            id=session_id or uuid.uuid4().hex,
+            app_name=app_name,
+            user_id=user_id,
+            state=state or {},
+            last_update_time=time.time()
+        )
+        self._save(session)
+        return session
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None
+    ) -> Optional[Session]:
+        """Load a session, optionally trimming its events."""
+        data = self.store.get(self._key(app_name, user_id, session_id))
+        if data is None:
+            return None
+        session = Session.model_validate(data)
+
+        if config:
+            if config.after_timestamp:
+                session.events = [e for e in session.events if e.timestamp >= config.after_timestamp]
+            if config.num_recent_events:
+                session.events = session.events[-config.num_recent_events:]
+        return session
+
+    async def list_sessions(
+        self,
+        *,
+        app_name: str,
+        user_id: Optional[str] = None
+    ) -> ListSessionsResponse:
+        """List sessions without their events."""
+        prefix = f"adk:{app_name}:" + (f"{user_id}:" if user_id is not None else "")
+        sessions = []
+        for key in self.store.keys(prefix):
+            data = self.store.get(key)
+            if data is not None:
+                data["events"] = []
+                sessions.append(Session.model_validate(data))
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str
+    ) -> None:
+        """Delete a session."""
+        self.store.delete(self._key(app_name, user_id, session_id))
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        """Append event and persist the updated session."""
+        event = await super().append_event(session=session, event=event)
+        if not event.partial:
+            session.last_update_time = event.timestamp
+            self._save(session)
+        return event
@@ -0,0 +1,54 @@
+"""Checkpoint Store - Stage outputs for resumable meal planning runs."""
+from typing import List, Optional
+from datetime import datetime
+from .session_store import SessionStore, StaleWriteError
+
+
+class CheckpointStore:
+    """Stores each pipeline stage's output keyed by (household, request ID, stage)."""
+
+    def __init__(self, store: SessionStore):
+        """Initialize checkpoint store.
+
+        Args:
+            store: Storage backend (a SQLiteSessionStore makes checkpoints
+                survive process restarts)
+        """
+        self.store = store
+
+    def _key(self, household_id: str, request_id: str, stage: str = "") -> str:
+        """Storage key for a checkpoint (or prefix when stage is empty)."""
+        return f"checkpoint:{household_id}:{request_id}:{stage}"
+
+    def save(self, household_id: str, request_id: str, stage: str, output: str):
+        """Save a completed stage's output and flush it immediately.
+
+        Conflicts on other keys of a shared store are left to their owners.
+        """
+        key = self._key(household_id, request_id, stage)
+        self.store.put(key, {
+            "stage": stage,
+            "output": output,
+            "completed_at": datetime.now().isoformat()
+        })
+        try:
+            self.store.flush([key])
+        except StaleWriteError:
+            pass  # another run of this request checkpointed the stage first; either output resumes it
+
+    def load(self, household_id: str, request_id: str, stage: str) -> Optional[str]:
+        """Get a stage's checkpointed output, or None if not completed."""
+        checkpoint = self.store.get(self._key(household_id, request_id, stage))
+        return checkpoint["output"] if checkpoint else None
+
+    def completed_stages(self, household_id: str, request_id: str) -> List[str]:
+        """List stages with a checkpoint for this request."""
+        prefix = self._key(household_id, request_id)
+        return [key[len(prefix):] for key in self.store.keys(prefix)]
+
+    def clear(self, household_id: str, request_id: str):
+        """Delete all checkpoints for this request."""
+        keys = self.store.keys(self._key(household_id, request_id))
+        for key in keys:
+            self.store.delete(key)
+        self.store.flush(keys)
@@ -0,0 +1,512 @@
+"""Columnar export of stored meal plans for fleet-wide analysis.
+
+MemoryBank.meal_history keeps each plan as nested dicts. The exporter
+flattens every stored plan into four tables:
+
+    plans        one row per stored plan (household, cost, conditions)
+    meals        one row per meal
+    ingredients  one row per ingredient of a meal
+    nutrition    one row per meal, nutrients per serving
+
+Rows reference each other by row number: meals.plan is a row of plans,
+ingredients.meal a row of meals, so joins are array indexing
+(plans["conditions"][meals["plan"]]). String columns are dictionary
+encoded: the column holds int32 codes into a vocabulary of the same
+name. Rows are built and written in batches of about batch_size meals,
+so exporting never holds the whole history in columnar form.
+
+Requires numpy; write_parquet and loading Parquet files also need pyarrow
+(imported on first use). This module is therefore not imported by the
+memory package.
+"""
+import glob
+import math
+import os
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from tools.nutrition_lookup import nutrition_lookup
+from tools.profile_store import get_household_constraints
+from utils.ingredient_catalog import get_catalog
+from utils.meal_planning_utils import flatten_recipes
+from utils.plan_aggregates import DEFAULT_COST_PER_100G
+from .memory_bank import MemoryBank
+
+NUTRIENTS = ["calories", "protein_g", "carbs_g", "fat_g", "fiber_g"]
+
+# Column dtypes per table; "str" columns are int32 codes into vocabularies
+TABLES = {
+    "plans": {
+        "plan": "int64",
+        "household": "str",
+        "plan_id": "str",
+        "created_at": "datetime64[s]",
+        "days": "int32",
+        "meals": "int32",
+        "cost": "float64",
+        "cost_per_day": "float64",
+        "conditions": "str",
+        "restrictions": "str"
+    },
+    "meals": {
+        "meal": "int64",
+        "plan": "int64",
+        "day": "int32",
+        "meal_type": "str",
+        "recipe": "str",
+        "cooking_time_minutes": "float64",
+        "servings": "float64",
+        "cost": "float64"
+    },
+    "ingredients": {
+        "meal": "int64",
+        "plan": "int64",
+        "ingredient": "str",
+        "amount": "float64",
+        "unit": "str",
+        "cost": "float64"
+    },
+    "nutrition": {
+        "meal": "int64",
+        "plan": "int64",
+        **{nutrient: "float64" for nutrient in NUTRIENTS}
+    }
+}
+
+
+def _numpy_dtype(dtype: str) -> str:
+    """NumPy dtype of a column spec."""
+    return "int32" if dtype == "str" else dtype
+
+
+class HistoryExporter:
+    """Flattens MemoryBank.meal_history into columnar batches.
+
+    Costs use catalog prices (DEFAULT_COST_PER_100G for unknown
+    ingredients, as estimate_ingredient_cost does); nutrition comes from
+    the meal's "nutrition" when present, otherwise it is computed per
+    serving as calculate_recipe_nutrition does.
+    Conditions and restrictions are the household's current ones, joined
+    with "|" in sorted order ("" for none).
+    """
+
+    def __init__(self, bank: MemoryBank, batch_size: int = 65536, region: str = ""):
+        """Initialize exporter.
+
+        Args:
+            bank: Memory bank to export
+            batch_size: Meals per batch
+            region: Price region (see IngredientCatalog.prices)
+        """
+        self.bank = bank
+        self.batch_size = batch_size
+        self._prices = get_catalog().prices(region)
+        string_columns = [c for columns in TABLES.values() for c, dtype in columns.items() if dtype == "str"]
+        self._codes = {column: {} for column in string_columns}  # column -> {string: code}
+        self._strings = {column: [] for column in string_columns}  # column -> strings by code
+        self._prices_per_100g = []  # by ingredient code
+        self._nutrients_per_100g = []  # by ingredient code, NUTRIENTS order
+        self._nutrients_scale = []  # by ingredient code: scale nutrients by amount
+
+    def _code(self, column: str, value: str) -> int:
+        """Vocabulary code of a string value."""
+        codes = self._codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+            self._strings[column].append(value)
+        return code
+
+    def vocabularies(self) -> Dict[str, np.ndarray]:
+        """Strings by code for each string column (grows while exporting)."""
+        return {column: np.array(strings, dtype=str) for column, strings in self._strings.items()}
+
+    def _ingredient(self, name: str) -> int:
+        """Vocabulary code of an ingredient, recording its price and nutrients."""
+        code = self._codes["ingredient"].get(name)
+        if code is None:
+            code = self._code("ingredient", name)
+            self._prices_per_100g.append(self._prices.get(name, DEFAULT_COST_PER_100G))
+            nutrition = nutrition_lookup(name, 100.0)
+            self._nutrients_per_100g.append([nutrition[nutrient] for nutrient in NUTRIENTS])
+            # Estimates for unknown foods are per ingredient, not per 100g
+            self._nutrients_scale.append("note" not in nutrition)
+        return code
+
+    def batches(self) -> Iterator[Dict[str, Dict[str, np.ndarray]]]:
+        """Yield {table: {column: array}} batches covering the whole history.
+
+        Plans are never split across batches, so a batch can exceed
+        batch_size by one plan's meals.
+        """
+        buffers = self._empty_buffers()
+        plan_row = meal_row = 0
+        households = {}  # household_id -> (conditions, restrictions)
+        code = self._code
+        ingredient_code = self._ingredient
+        raw_codes = {}  # ingredient name as stored -> code
+        for household_id, history in list(self.bank.meal_history.items()):
+            if household_id not in households:
+                constraints = get_household_constraints(household_id)
+                households[household_id] = (
+                    "|".join(sorted({c.lower() for c in constraints.get("health_conditions", [])})),
+                    "|".join(sorted({r.lower() for r in constraints.get("dietary_restrictions", [])}))
+                )
+            conditions, restrictions = households[household_id]
+            plans, meals = buffers["plans"], buffers["meals"]
+            ingredients, nutrition = buffers["ingredients"], buffers["nutrition"]
+            for entry in history:
+                recipes = [r for r in flatten_recipes(entry["plan"]) if isinstance(r.get("ingredients"), list)]
+                days = set()
+                for recipe in recipes:
+                    for ing in recipe["ingredients"]:
+                        if not isinstance(ing, dict):
+                            continue
+                        raw = ing.get("name", "")
+                        ingredient = raw_codes.get(raw)
+                        if ingredient is None:
+                            ingredient = raw_codes[raw] = ingredient_code(" ".join(str(raw).lower().split()))
+                        amount = ing.get("amount")
+                        if amount.__class__ is not float and amount.__class__ is not int:
+                            amount = _number(amount)
+                        ingredients["meal"].append(meal_row)
+                        ingredients["plan"].append(plan_row)
+                        ingredients["ingredient"].append(ingredient)
+                        ingredients["amount"].append(amount)
+                        ingredients["unit"].append(code("unit", str(ing.get("unit", ""))))
+                    day = int(_number(recipe.get("day")))
+                    days.add(day)
+                    meals["meal"].append(meal_row)
+                    meals["plan"].append(plan_row)
+                    meals["day"].append(day)
+                    meals["meal_type"].append(code("meal_type", str(recipe.get("meal_type", ""))))
+                    meals["recipe"].append(code("recipe", str(recipe.get("name", ""))))
+                    meals["cooking_time_minutes"].append(_number(recipe.get("cooking_time_minutes")))
+                    meals["servings"].append(_number(recipe.get("servings"), 4.0) or 4.0)
+                    # Stored values; NaN is computed from the ingredients
+                    stored = recipe.get("nutrition")
+                    stored = stored if isinstance(stored, dict) else {}
+                    nutrition["meal"].append(meal_row)
+                    nutrition["plan"].append(plan_row)
+                    for nutrient in NUTRIENTS:
+                        nutrition[nutrient].append(_number(stored[nutrient], math.nan) if nutrient in stored else math.nan)
+                    meal_row += 1
+
+                plans["plan"].append(plan_row)
+                plans["household"].append(code("household", household_id))
+                plans["plan_id"].append(code("plan_id", str(entry.get("plan_id", ""))))
+                plans["created_at"].append(entry.get("created_at") or "NaT")
+                plans["days"].append(len(days))
+                plans["meals"].append(len(recipes))
+                plans["conditions"].append(code("conditions", conditions))
+                plans["restrictions"].append(code("restrictions", restrictions))
+                plan_row += 1
+
+                if len(meals["meal"]) >= self.batch_size:
+                    yield self._to_arrays(buffers)
+                    buffers = self._empty_buffers()
+                    plans, meals = buffers["plans"], buffers["meals"]
+                    ingredients, nutrition = buffers["ingredients"], buffers["nutrition"]
+        if buffers["plans"]["plan"]:
+            yield self._to_arrays(buffers)
+
+    @staticmethod
+    def _empty_buffers() -> Dict[str, Dict[str, list]]:
+        """Empty column lists for every table (derived columns stay empty)."""
+        return {table: {column: [] for column in columns} for table, columns in TABLES.items()}
+
+    def _to_arrays(self, buffers: Dict[str, Dict[str, list]]) -> Dict[str, Dict[str, np.ndarray]]:
+        """Column lists as typed arrays, with costs and nutrition computed."""
+        arrays = {}
+        for table, columns in TABLES.items():
+            arrays[table] = {}
+            for column, dtype in columns.items():
+                values = buffers[table][column]
+                if dtype.startswith("datetime64"):
+                    # ISO timestamps keep microseconds, which a direct
+                    # cast to seconds rejects
+                    arrays[table][column] = np.array(values, dtype="datetime64[us]").astype(dtype)
+                else:
+                    arrays[table][column] = np.array(values, dtype=_numpy_dtype(dtype))
+
+        plans, meals = arrays["plans"], arrays["meals"]
+        ingredients, nutrition = arrays["ingredients"], arrays["nutrition"]
+        # Rows of this batch relative to its first meal and plan (a batch
+        # can hold plans without meals, e.g. only invalid results)
+        meal_count, plan_count = len(meals["meal"]), len(plans["plan"])
+        meal_index = ingredients["meal"] - (meals["meal"][0] if meal_count else 0)
+        plan_index = meals["plan"] - (plans["plan"][0] if plan_count else 0)
+        codes = ingredients["ingredient"]
+        grams = ingredients["amount"] / 100.0
+
+        ingredients["cost"] = grams * np.array(self._prices_per_100g)[codes]
+        meals["cost"] = np.bincount(meal_index, weights=ingredients["cost"], minlength=meal_count)
+        plans["cost"] = np.bincount(plan_index, weights=meals["cost"], minlength=plan_count)
+        plans["cost_per_day"] = np.divide(
+            plans["cost"], plans["days"], out=np.zeros(plan_count), where=plans["days"] > 0
+        )
+        per_100g = np.array(self._nutrients_per_100g).reshape(-1, len(NUTRIENTS))[codes]
+        scale = np.where(np.array(self._nutrients_scale, dtype=bool)[codes], grams, 1.0)
+        for i, nutrient in enumerate(NUTRIENTS):
+            computed = np.bincount(meal_index, weights=per_100g[:, i] * scale, minlength=meal_count)
+            stored = nutrition[nutrient]
+            nutrition[nutrient] = np.where(np.isnan(stored), computed / meals["servings"], stored)
+        return arrays
+
+    def to_numpy(self) -> "HistoryTables":
+        """Export the whole history in memory."""
+        parts = defaultdict(lambda: defaultdict(list))
+        for batch in self.batches():
+            for table, columns in batch.items():
+                for column, values in columns.items():
+                    parts[table][column].append(values)
+        return HistoryTables(
+            {
+                table: {
+                    column: (np.concatenate(parts[table][column]) if parts[table][column]
+                             else np.array([], dtype=_numpy_dtype(dtype)))
+                    for column, dtype in columns.items()
+                }
+                for table, columns in TABLES.items()
+            },
+            self.vocabularies()
+        )
+
+    def write_npz(self, directory: str) -> Dict[str, int]:
+        """Write each batch as <table>-<batch>.npz plus vocabularies.npz.
+
+        Args:
+            directory: Output directory (created if missing)
+
+        Returns:
+            Rows written per table
+        """
+        os.makedirs(directory, exist_ok=True)
+        rows = {table: 0 for table in TABLES}
+        for number, batch in enumerate(self.batches()):
+            for table, columns in batch.items():
+                np.savez(os.path.join(directory, f"{table}-{number:05d}.npz"), **columns)
+                rows[table] += len(next(iter(columns.values())))
+        np.savez(os.path.join(directory, "vocabularies.npz"), **self.vocabularies())
+        return rows
+
+    def write_parquet(self, directory: str, compression: str = "zstd") -> Dict[str, int]:
+        """Write <table>.parquet files, one row group per batch (needs pyarrow).
+
+        String columns are stored as Parquet dictionary columns, so the
+        files need no separate vocabulary.
+
+        Args:
+            directory: Output directory (created if missing)
+            compression: Parquet codec
+
+        Returns:
+            Rows written per table
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        os.makedirs(directory, exist_ok=True)
+        schemas = {
+            table: pa.schema([
+                (column, pa.dictionary(pa.int32(), pa.string()) if dtype == "str" else pa.from_numpy_dtype(np.dtype(dtype)))
+                for column, dtype in columns.items()
+            ])
+            for table, columns in TABLES.items()
+        }
+        writers = {
+            table: pq.ParquetWriter(os.path.join(directory, f"{table}.parquet"), schema, compression=compression)
+            for table, schema in schemas.items()
+        }
+        rows = {table: 0 for table in TABLES}
+        try:
+            for batch in self.batches():
+                for table, columns in batch.items():
+                    arrays = []
+                    for column, dtype in TABLES[table].items():
+                        values = columns[column]
+                        if dtype == "str":
+                            # Only the strings used by this batch go into its dictionary
+                            used, indices = np.unique(values, return_inverse=True)
+                            strings = self._strings[column]
+                            arrays.append(pa.DictionaryArray.from_arrays(
+                                pa.array(indices.astype("int32")), pa.array([strings[i] for i in used], pa.string())
+                            ))
+                        else:
+                            arrays.append(pa.array(values))
+                    writers[table].write_batch(pa.record_batch(arrays, schema=schemas[table]))
+                    rows[table] += len(columns[next(iter(columns))])
+        finally:
+            for writer in writers.values():
+                writer.close()
+        return rows
+
+
+class HistoryTables:
+    """Exported history as NumPy columns, with vectorized queries.
+
+    tables is {table: {column: array}} (see TABLES); vocabularies maps
+    each string column to its strings by code.
+    """
+
+    def __init__(self, tables: Dict[str, Dict[str, np.ndarray]], vocabularies: Dict[str, np.ndarray]):
+        """Initialize tables.
+
+        Args:
+            tables: Columns per table
+            vocabularies: Strings by code per string column
+        """
+        self.tables = tables
+        self.vocabularies = vocabularies
+
+    def __getitem__(self, table: str) -> Dict[str, np.ndarray]:
+        """Columns of a table."""
+        return self.tables[table]
+
+    def rows(self) -> Dict[str, int]:
+        """Row count per table."""
+        return {table: len(next(iter(columns.values()))) for table, columns in self.tables.items()}
+
+    def decode(self, column: str, codes: np.ndarray) -> np.ndarray:
+        """Strings of a string column's codes."""
+        return self.vocabularies[column][codes]
+
+    def group_by(self, table: str, by: str, value: Optional[str] = None, how: str = "mean") -> Dict:
+        """Aggregate one column of a table by another.
+
+        Args:
+            table: Table name
+            by: Grouping column (string columns are decoded in the result)
+            value: Aggregated column (not needed for "count")
+            how: "mean", "sum" or "count"
+
+        Returns:
+            {group: aggregate}
+        """
+        columns = self.tables[table]
+        keys, groups = np.unique(columns[by], return_inverse=True)
+        counts = np.bincount(groups, minlength=len(keys))
+        if how == "count":
+            result = counts
+        else:
+            result = np.bincount(groups, weights=columns[value], minlength=len(keys))
+            if how == "mean":
+                result = result / np.maximum(counts, 1)
+            elif how != "sum":
+                raise ValueError(f"Unknown aggregate: {how}")
+        if by in self.vocabularies:
+            keys = self.decode(by, keys)
+        return {key.item(): aggregate.item() for key, aggregate in zip(keys, result)}
+
+    def cost_per_day_by_condition(self) -> Dict[str, Dict]:
+        """Mean plan cost per day for each health condition.
+
+        Plans of households with several conditions count for each of
+        them; "none" covers households without any.
+
+        Returns:
+            {condition: {"plans", "cost_per_day"}}
+        """
+        plans = self.tables["plans"]
+        combos = self.vocabularies["conditions"]
+        sums = np.bincount(plans["conditions"], weights=plans["cost_per_day"], minlength=len(combos))
+        counts = np.bincount(plans["conditions"], minlength=len(combos))
+        totals = defaultdict(lambda: [0.0, 0])
+        # One step per distinct condition combination, not per plan
+        for combo, total, count in zip(combos, sums, counts):
+            for condition in (str(combo).split("|") if combo else ["none"]):
+                totals[condition][0] += total
+                totals[condition][1] += count
+        return {
+            condition: {"plans": int(count), "cost_per_day": round(float(total) / int(count), 2) if count else 0.0}
+            for condition, (total, count) in sorted(totals.items())
+        }
+
+    def most_reused_ingredients(self, top: int = 10) -> List[Dict]:
+        """Ingredients used by the most plans.
+
+        Returns:
+            [{"ingredient", "plans", "meals"}], most plans first
+        """
+        ingredients = self.tables["ingredients"]
+        names = self.vocabularies["ingredient"]
+        codes = ingredients["ingredient"]
+        meals = np.bincount(codes, minlength=len(names))
+        plans = np.zeros(len(names), dtype=np.int64)
+        plan_rows = ingredients["plan"]
+        if len(plan_rows):
+            # Rows are in plan order: mark (plan, ingredient) pairs in a
+            # bounded plans x ingredients bitmap, a block of plans at a time
+            step = max(1, (1 << 24) // len(names))
+            starts = np.arange(plan_rows[0], plan_rows[-1] + 1, step)
+            bounds = np.searchsorted(plan_rows, np.append(starts, plan_rows[-1] + 1))
+            for start, first, last in zip(starts, bounds[:-1], bounds[1:]):
+                seen = np.zeros((step, len(names)), dtype=bool)
+                seen[plan_rows[first:last] - start, codes[first:last]] = True
+                plans += seen.sum(axis=0)
+        order = np.lexsort((-meals, -plans))[:top]
+        return [
+            {"ingredient": str(names[i]), "plans": int(plans[i]), "meals": int(meals[i])}
+            for i in order if meals[i]
+        ]
+
+
+def load_history(directory: str) -> HistoryTables:
+    """Load tables written by write_parquet or write_npz.
+
+    Args:
+        directory: Export directory
+
+    Returns:
+        Loaded tables (Parquet needs pyarrow)
+    """
+    if os.path.exists(os.path.join(directory, "vocabularies.npz")):
+        with np.load(os.path.join(directory, "vocabularies.npz")) as data:
+            vocabularies = {column: data[column] for column in data.files}
+        tables = {}
+        for table, columns in TABLES.items():
+            parts = defaultdict(list)
+            for path in sorted(glob.glob(os.path.join(directory, f"{table}-*.npz"))):
+                with np.load(path) as data:
+                    for column in columns:
+                        parts[column].append(data[column])
+            tables[table] = {
+                column: np.concatenate(parts[column]) if parts[column] else np.array([], dtype=_numpy_dtype(dtype))
+                for column, dtype in columns.items()
+            }
+        return HistoryTables(tables, vocabularies)
+
+    import pyarrow.parquet as pq
+
+    tables = {}
+    vocabularies = {}
+    for table, columns in TABLES.items():
+        strings = [column for column, dtype in columns.items() if dtype == "str"]
+        data = pq.read_table(os.path.join(directory, f"{table}.parquet"), read_dictionary=strings)
+        data = data.unify_dictionaries().combine_chunks()
+        tables[table] = {}
+        for column, dtype in columns.items():
+            chunks = data.column(column).chunks
+            if dtype == "str":
+                if chunks:
+                    tables[table][column] = chunks[0].indices.to_numpy(zero_copy_only=False).astype("int32")
+                    vocabularies[column] = chunks[0].dictionary.to_numpy(zero_copy_only=False).astype(str)
+                else:
+                    tables[table][column] = np.array([], dtype="int32")
+                    vocabularies[column] = np.array([], dtype=str)
+            else:
+                values = chunks[0].to_numpy(zero_copy_only=False) if chunks else np.array([])
+                tables[table][column] = values.astype(dtype)
+    return HistoryTables(tables, vocabularies)
+
+
+def _number(value, default: float = 0.0) -> float:
+    """A numeric field of model output as float (default if not numeric)."""
+    if value.__class__ is int or value.__class__ is float:
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
@@ -1,16 +1,25 @@
 """Enhanced Memory Bank - Per-member preference tracking."""
 import json
+import uuid
 from typing import Dict, List, Optional
 from datetime import datetime
+from utils.concurrency import KeyedLock
+from utils.meal_planning_utils import flatten_recipes
+from utils.variety import MinHashIndex, recipe_shingles
 
 
 class MemoryBank:
-    """Long-term memory with per-member preference tracking."""
+    """Long-term memory with per-member preference tracking.
+    
+    Per-household entries are copy-on-write: writers build a new dict/list
+    under the household's lock and swap it in, so readers never lock.
+    """
     
     def __init__(self):
         """Initialize enhanced memory bank."""
         # Household-level
         self.meal_history = {}  # household_id -> [meal_plans]
+        self.variety_indexes = {}  # household_id -> MinHashIndex of recipes in meal_history
         self.household_preferences = {}  # household_id -> shared_preferences
         
         # Per-member tracking
@@ -18,6 +27,8 @@ class MemoryBank:
         self.member_dislikes = {}  # household_id -> {member_name -> [ingredients]}
         self.member_preferences = {}  # household_id -> {member_name -> preferences}
         self.member_health_history = {}  # household_id -> {member_name -> health_data}
+        
+        self._locks = KeyedLock()
     
     # ============================================================================
     # PER-MEMBER FAVORITES
@@ -25,25 +36,22 @@ class MemoryBank:
     
     def add_member_favorite(self, household_id: str, member_name: str, recipe: Dict):
         """Add favorite recipe for specific member."""
-        if household_id not in self.member_favorites:
-            self.member_favorites[household_id] = {}
-        
-        if member_name not in self.member_favorites[household_id]:
-            self.member_favorites[household_id][member_name] = []
-        
-        # Avoid duplicates
-        if not any(r.get('name') == recipe.get('name') for r in self.member_favorites[household_id][member_name]):
-            self.member_favorites[household_id][member_name].append({
-                **recipe,
-                "favorited_at": datetime.now().isoformat(),
-                "favorited_by": member_name
-            })
+        with self._locks(household_id):
+            favorites = self.member_favorites.get(household_id, {})
+            current = favorites.get(member_name, [])
+            
+            # Avoid duplicates
+            if not any(r.get('name') == recipe.get('name') for r in current):
+                entry = {
+                    **recipe,
+                    "favorited_at": datetime.now().isoformat(),
+                    "favorited_by": member_name
+                }
+                self.member_favorites[household_id] = {**favorites, member_name: current + [entry]}
     
     def get_member_favorites(self, household_id: str, member_name: str) -> List[Dict]:
         """Get favorite recipes for specific member."""
-        if household_id in self.member_favorites:
-            return self.member_favorites[household_id].get(member_name, [])
-        return []
+        return self.member_favorites.get(household_id, {}).get(member_name, [])
     
     def get_all_member_favorites(self, household_id: str) -> Dict[str, List]:
         """Get favorites for all members."""
@@ -55,21 +63,16 @@ class MemoryBank:
     
     def add_member_dislike(self, household_id: str, member_name: str, ingredient: str):
         """Add disliked ingredient for specific member."""
-        if household_id not in self.member_dislikes:
-            self.member_dislikes[household_id] = {}
-        
-        if member_name not in self.member_dislikes[household_id]:
-            self.member_dislikes[household_id][member_name] = []
-        
         ingredient_lower = ingredient.lower()
-        if ingredient_lower not in [d.lower() for d in self.member_dislikes[household_id][member_name]]:
-            self.member_dislikes[household_id][member_name].append(ingredient)
+        with self._locks(household_id):
+            dislikes = self.member_dislikes.get(household_id, {})
+            current = dislikes.get(member_name, [])
+            if ingredient_lower not in [d.lower() for d in current]:
+                self.member_dislikes[household_id] = {**dislikes, member_name: current + [ingredient]}
     
     def get_member_dislikes(self, household_id: str, member_name: str) -> List[str]:
         """Get disliked ingredients for specific member."""
-        if household_id in self.member_dislikes:
-            return self.member_dislikes[household_id].get(member_name, [])
-        return []
+        return self.member_dislikes.get(household_id, {}).get(member_name, [])
     
     def get_all_member_dislikes(self, household_id: str) -> Dict[str, List]:
         """Get dislikes for all members."""
@@ -78,9 +81,8 @@ class MemoryBank:
     def get_household_dislikes(self, household_id: str) -> List[str]:
         """Get ALL dislikes across household (for safe meal planning)."""
         all_dislikes = []
-        if household_id in self.member_dislikes:
-            for member_dislikes in self.member_dislikes[household_id].values():
-                all_dislikes.extend(member_dislikes)
+        for member_dislikes in self.member_dislikes.get(household_id, {}).values():
+            all_dislikes.extend(member_dislikes)
         return list(set(all_dislikes))
     
     # ============================================================================
@@ -89,19 +91,17 @@ class MemoryBank:
     
     def update_member_preferences(self, household_id: str, member_name: str, preferences: Dict):
         """Update preferences for specific member."""
-        if household_id not in self.member_preferences:
-            self.member_preferences[household_id] = {}
-        
-        if member_name not in self.member_preferences[household_id]:
-            self.member_preferences[household_id][member_name] = {}
-        
-        self.member_preferences[household_id][member_name].update(preferences)
+        with self._locks(household_id):
+            all_preferences = self.member_preferences.get(household_id, {})
+            current = all_preferences.get(member_name, {})
+            self.member_preferences[household_id] = {
+                **all_preferences,
+                member_name: {**current, **preferences}
+            }
     
     def get_member_preferences(self, household_id: str, member_name: str) -> Dict:
         """Get preferences for specific member."""
-        if household_id in self.member_preferences:
-            return self.member_preferences[household_id].get(member_name, {})
-        return {}
+        return self.member_preferences.get(household_id, {}).get(member_name, {})
     
     def get_all_member_preferences(self, household_id: str) -> Dict[str, Dict]:
         """Get preferences for all members."""
@@ -112,18 +112,39 @@ class MemoryBank:
     # ============================================================================
     
     def store_meal_plan(self, household_id: str, meal_plan: Dict):
-        """Store meal plan in history."""
-        if household_id not in self.meal_history:
-            self.meal_history[household_id] = []
-        
-        self.meal_history[household_id].append({
+        """Store meal plan in history and index its recipes for variety checks."""
+        entry = {
             "plan": meal_plan,
+            "plan_id": uuid.uuid4().hex,
             "created_at": datetime.now().isoformat()
-        })
+        }
+        with self._locks(household_id):
+            # Keep only last 10 plans
+            history = self.meal_history.get(household_id, []) + [entry]
+            index = self.variety_index(household_id)
+            for old in history[:-10]:
+                for recipe in self._plan_recipes(old):
+                    index.remove((old.get("plan_id"), str(recipe.get("name"))))
+            for recipe in self._plan_recipes(entry):
+                index.add((entry["plan_id"], str(recipe.get("name"))), recipe_shingles(recipe))
+            self.meal_history[household_id] = history[-10:]
+    
+    @staticmethod
+    def _plan_recipes(entry: Dict) -> List[Dict]:
+        """Recipes of a history entry."""
+        return [r for r in flatten_recipes(entry["plan"]) if isinstance(r.get("ingredients"), list)]
+    
+    def variety_index(self, household_id: str) -> MinHashIndex:
+        """Near-duplicate index over the recipes in a household's history.
         
-        # Keep only last 10 plans
-        if len(self.meal_history[household_id]) > 10:
-            self.meal_history[household_id] = self.meal_history[household_id][-10:]
+        Keys are (plan_id, recipe name); see utils.variety.MinHashIndex.
+        Unlike the other entries it is updated in place (under the
+        household's lock); queries do not lock.
+        """
+        index = self.variety_indexes.get(household_id)
+        if index is None:
+            index = self.variety_indexes.setdefault(household_id, MinHashIndex())
+        return index
     
     def get_meal_history(self, household_id: str, limit: int = 5) -> List[Dict]:
         """Get recent meal plans."""
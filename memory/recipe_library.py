@@ -0,0 +1,246 @@
+"""Recipe Library - Validated recipes indexed for retrieval-first planning."""
+import hashlib
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from tools.cost_estimator import estimate_ingredient_cost
+from tools.health_guidelines import RESTRICTION_EXCLUDES, excluded_terms, has_term, term_key
+from tools.nutrition_lookup import calculate_recipe_nutrition
+from utils.meal_planning_utils import MEAL_SLOTS, main_ingredient
+from utils.variety import MinHashIndex, recipe_shingles, DEFAULT_SIMILARITY
+from .session_store import InMemorySessionStore, SessionStore
+
+
+class RecipeLibrary:
+    """Validated recipes with precomputed nutrition, cost and tags.
+
+    Recipes are persisted in a SessionStore (a SQLiteSessionStore shares
+    the library across processes and restarts) and indexed in memory by
+    tag ("slot:dinner", "diet:vegetarian", "main:salmon") and by
+    ingredient name. Lookups intersect tag sets and subtract the recipes
+    of excluded ingredients, so their cost depends on the number of
+    matching recipes, not on the library size.
+    """
+
+    def __init__(self, store: SessionStore = None):
+        """Initialize library and load stored recipes.
+
+        Args:
+            store: Storage backend (defaults to an in-memory store)
+        """
+        self.store = store or InMemorySessionStore()
+        self._recipes = {}  # recipe_id -> entry
+        self._tags = {}  # tag -> {recipe_id}
+        self._ingredients = {}  # ingredient name -> {recipe_id}
+        self._lock = threading.Lock()
+        for key in self.store.keys("recipe:"):
+            entry = self.store.get(key)
+            if entry:
+                self._index(entry)
+
+    def __len__(self) -> int:
+        """Number of recipes in the library."""
+        return len(self._recipes)
+
+    # ============================================================================
+    # ADDING RECIPES
+    # ============================================================================
+
+    @staticmethod
+    def recipe_id(recipe: Dict) -> str:
+        """Library key of a recipe (same name and slot -> same recipe)."""
+        name = " ".join(str(recipe.get("name", "")).lower().split())
+        return hashlib.sha1(f"{recipe.get('meal_type')}:{name}".encode()).hexdigest()[:16]
+
+    def add_recipes(self, recipes: Iterable[Dict]) -> int:
+        """Add validated recipes (already known recipes are skipped).
+
+        Args:
+            recipes: Recipes that passed validation
+
+        Returns:
+            Number of recipes added
+        """
+        added = 0
+        with self._lock:
+            for recipe in recipes:
+                if recipe.get("meal_type") not in MEAL_SLOTS or not recipe.get("ingredients"):
+                    continue
+                recipe_id = self.recipe_id(recipe)
+                if recipe_id in self._recipes:
+                    continue
+                entry = self._entry(recipe_id, recipe)
+                self.store.put(f"recipe:{recipe_id}", entry)
+                self._index(entry)
+                added += 1
+        if added:
+            # Recipe keys are content hashes: a conflicting write holds the
+            # same recipe, so there is nothing to report
+            self.store.flush(())
+        return added
+
+    def _entry(self, recipe_id: str, recipe: Dict) -> Dict:
+        """Library entry with precomputed nutrition, cost and tags."""
+        recipe = {k: v for k, v in recipe.items() if k not in ("day", "nutrition")}
+        ingredients = sorted({i.get("name", "").lower() for i in recipe["ingredients"] if i.get("name")})
+        tags = [f"slot:{recipe['meal_type']}"]
+        main = main_ingredient(recipe)
+        if main:
+            tags.append(f"main:{main}")
+        return {
+            "id": recipe_id,
+            "recipe": recipe,
+            "nutrition": calculate_recipe_nutrition(json.dumps(recipe)),
+            "cost": round(sum(
+                estimate_ingredient_cost(i.get("name", ""), i.get("amount", 0))["total_cost"]
+                for i in recipe["ingredients"]
+            ), 2),
+            "cooking_time_minutes": recipe.get("cooking_time_minutes", 0),
+            "ingredients": ingredients,
+            "main_ingredient": main,
+            "tags": tags,
+            "added_at": datetime.now().isoformat()
+        }
+
+    def _index(self, entry: Dict):
+        """Add an entry to the in-memory indexes.
+
+        Diet tags are derived from the ingredients here rather than
+        stored, so stored recipes follow the current RESTRICTION_EXCLUDES.
+        """
+        recipe_id = entry["id"]
+        entry["tags"] = [tag for tag in entry["tags"] if not tag.startswith("diet:")] + [
+            f"diet:{restriction}" for restriction, excluded in RESTRICTION_EXCLUDES.items()
+            if not any(has_term(name, excluded) for name in entry["ingredients"])
+        ]
+        self._recipes[recipe_id] = entry
+        for tag in entry["tags"]:
+            self._tags.setdefault(tag, set()).add(recipe_id)
+        for name in entry["ingredients"]:
+            self._ingredients.setdefault(name, set()).add(recipe_id)
+
+    # ============================================================================
+    # RETRIEVAL
+    # ============================================================================
+
+    def find(self, meal_type: str, constraints: Dict) -> List[Dict]:
+        """Entries for a meal slot that satisfy household constraints.
+
+        Checks dietary restrictions (via diet tags), allergens and health
+        "avoid" entries (expanded to ingredient terms by excluded_terms,
+        as the replan checks do) and the cooking time limit. A constraint
+        without a term table cannot be verified locally, so nothing
+        matches and the slot falls back to the LLM and the validator.
+
+        Args:
+            meal_type: "breakfast", "lunch" or "dinner"
+            constraints: Output of get_household_constraints
+
+        Returns:
+            Matching entries ordered by recipe ID
+        """
+        excluded, unknown = excluded_terms({
+            "allergies": constraints.get("allergies", []),
+            "health_conditions": constraints.get("health_conditions", [])
+        })
+        if unknown:
+            return []
+        ids = set(self._tags.get(f"slot:{meal_type}", ()))
+        for restriction in constraints.get("dietary_restrictions", []):
+            ids &= self._tags.get(f"diet:{term_key(restriction)}", set())
+
+        terms = {term for group in excluded.values() for term in group}
+        if ids and terms:
+            for name, recipe_ids in list(self._ingredients.items()):
+                if has_term(name, terms):
+                    ids -= recipe_ids
+
+        cooking_time_max = constraints.get("cooking_time_max")
+        entries = [self._recipes[i] for i in sorted(ids)]
+        if cooking_time_max:
+            entries = [e for e in entries if e["cooking_time_minutes"] <= cooking_time_max]
+        return entries
+
+    def assemble(
+        self,
+        days: int,
+        constraints: Dict,
+        seed: str = "",
+        avoid: MinHashIndex = None,
+        similarity: float = DEFAULT_SIMILARITY
+    ) -> Dict:
+        """Fill a plan's slots from the library (pure Python, no LLM).
+
+        Each slot gets a compliant recipe not used elsewhere in the plan,
+        preferring main ingredients not yet used that day and used least
+        overall. Recipes whose ingredients nearly match a recipe already in
+        the plan or in avoid are skipped. seed rotates the choice so
+        households sharing the same constraints do not all get the same plan.
+
+        Args:
+            days: Number of days to plan
+            constraints: Output of get_household_constraints
+            seed: Rotation seed (e.g. the household ID)
+            avoid: Recently planned recipes (e.g. MemoryBank.variety_index())
+            similarity: Near-duplicate threshold (Jaccard similarity)
+
+        Returns:
+            {"recipes": recipes with day, meal_type and nutrition set,
+             "gaps": [(day, meal_type)] slots without a compliant recipe}
+        """
+        candidates = {slot: self.find(slot, constraints) for slot in MEAL_SLOTS}
+        offset = int(hashlib.sha1(seed.encode()).hexdigest()[:8], 16)
+        used: Set[str] = set()
+        planned = MinHashIndex(threshold=similarity)
+        main_counts = {}
+        recipes = []
+        gaps = []
+        for day in range(1, days + 1):
+            day_mains = set()
+            for slot in MEAL_SLOTS:
+                entries = candidates[slot]
+                while True:
+                    best = self._pick(entries, offset, used, day_mains, main_counts)
+                    if best is None:
+                        break
+                    # Near-duplicates are never picked for this plan
+                    used.add(best["id"])
+                    ingredients = recipe_shingles(best["recipe"])
+                    if not planned.query(ingredients) and not (avoid and avoid.query(ingredients, similarity)):
+                        break
+                if best is None:
+                    gaps.append((day, slot))
+                    continue
+                planned.add(best["id"], ingredients)
+                main = best["main_ingredient"]
+                day_mains.add(main)
+                main_counts[main] = main_counts.get(main, 0) + 1
+                recipes.append({**best["recipe"], "day": day, "meal_type": slot, "nutrition": best["nutrition"]})
+        return {"recipes": recipes, "gaps": gaps}
+
+    @staticmethod
+    def _pick(entries: List[Dict], offset: int, used: Set[str], day_mains: Set, main_counts: Dict) -> Optional[Dict]:
+        """Best unused entry: new main ingredient for the day, then least used."""
+        best = None
+        best_rank = None
+        count = len(entries)
+        for i in range(count):
+            entry = entries[(offset + i) % count]
+            if entry["id"] in used:
+                continue
+            main = entry["main_ingredient"]
+            rank = (main in day_mains, main_counts.get(main, 0))
+            if best_rank is None or rank < best_rank:
+                best, best_rank = entry, rank
+                if rank == (False, 0):
+                    break
+        return best
+
+    def stats(self) -> Dict:
+        """Library size and recipes per tag."""
+        return {
+            "recipes": len(self._recipes),
+            "tags": {tag: len(ids) for tag, ids in sorted(self._tags.items())}
+        }
@@ -1,57 +1,144 @@
 """Session Manager - Tracks conversation sessions."""
+import copy
 from typing import Dict, List, Optional
 from datetime import datetime
+from utils.concurrency import KeyedLock
+from .session_store import SessionStore, InMemorySessionStore, StaleWriteError, create_session_store
 
 
 class SessionManager:
     """Manages conversation sessions for continuity."""
-    
-    def __init__(self):
-        """Initialize session manager."""
-        self.sessions = {}  # session_id -> session_data
-    
+
+    def __init__(self, store: SessionStore = None):
+        """Initialize session manager.
+
+        Args:
+            store: Session storage backend (defaults to in-memory)
+        """
+        self.store = store or InMemorySessionStore()
+        self._locks = KeyedLock()
+        self._unsaved = {}  # session_id -> [(kind, value)] changes since the last flush
+
+    def _key(self, session_id: str) -> str:
+        """Storage key for a session."""
+        return f"session:{session_id}"
+
     def create_session(self, session_id: str, household_id: str):
         """Create a new session."""
-        self.sessions[session_id] = {
+        session = {
             "session_id": session_id,
             "household_id": household_id,
             "created_at": datetime.now().isoformat(),
             "messages": [],
             "context": {}
         }
-        return self.sessions[session_id]
-    
+        with self._locks(session_id):
+            self.store.put(self._key(session_id), session)
+            self._record(session_id, "create", session)
+        return session
+
+    def get_or_create_session(self, session_id: str, household_id: str) -> Dict:
+        """Get session, creating it atomically if missing."""
+        with self._locks(session_id):
+            session = self.get_session(session_id)
+            if session is None:
+                session = self.create_session(session_id, household_id)
+            return session
+
     def add_message(self, session_id: str, role: str, content: str):
         """Add message to session."""
-        if session_id in self.sessions:
-            self.sessions[session_id]["messages"].append({
-                "role": role,
-                "content": content,
-                "timestamp": datetime.now().isoformat()
-            })
-    
+        message = {
+            "role": role,
+            "content": content,
+            "timestamp": datetime.now().isoformat()
+        }
+        with self._locks(session_id):
+            session = self.get_session(session_id)
+            if session is not None:
+                session["messages"].append(message)
+                self.store.put(self._key(session_id), session)
+                self._record(session_id, "message", message)
+
     def update_context(self, session_id: str, context: Dict):
         """Update session context."""
-        if session_id in self.sessions:
-            self.sessions[session_id]["context"].update(context)
-    
+        with self._locks(session_id):
+            session = self.get_session(session_id)
+            if session is not None:
+                session["context"].update(context)
+                self.store.put(self._key(session_id), session)
+                self._record(session_id, "context", dict(context))
+
     def get_session(self, session_id: str) -> Optional[Dict]:
         """Get session data."""
-        return self.sessions.get(session_id)
-    
+        return self.store.get(self._key(session_id))
+
     def get_context(self, session_id: str) -> Dict:
         """Get session context."""
-        if session_id in self.sessions:
-            return self.sessions[session_id]["context"]
+        session = self.get_session(session_id)
+        if session is not None:
+            return session["context"]
         return {}
-    
+
     def get_messages(self, session_id: str, limit: int = 10) -> List[Dict]:
         """Get recent messages."""
-        if session_id in self.sessions:
-            messages = self.sessions[session_id]["messages"]
+        session = self.get_session(session_id)
+        if session is not None:
+            messages = session["messages"]
             return messages[-limit:] if len(messages) > limit else messages
         return []
 
+    def flush(self, attempts: int = 5):
+        """Persist buffered session writes.
+
+        A session another process updated since it was read is read again
+        and the changes made here since the last flush are reapplied to it,
+        so workers appending to the same session lose nothing. Only this
+        manager's keys are checked: conflicts on other keys of a shared
+        store are left to their owners.
+
+        Args:
+            attempts: Flushes tried before leaving still-conflicting
+                changes for the next call
+        """
+        counts = {session_id: len(changes) for session_id, changes in list(self._unsaved.items())}
+        for _ in range(attempts):
+            try:
+                self.store.flush([self._key(session_id) for session_id in counts])
+            except StaleWriteError as e:
+                for key in e.keys:
+                    self._reapply(key[len(self._key("")):])
+                continue
+            for session_id, count in counts.items():
+                with self._locks(session_id):
+                    changes = self._unsaved.get(session_id, [])
+                    del changes[:count]
+                    if not changes:
+                        self._unsaved.pop(session_id, None)
+            return
+
+    def _record(self, session_id: str, kind: str, value: Dict):
+        """Remember a change until a flush confirms it was written."""
+        self._unsaved.setdefault(session_id, []).append((kind, copy.deepcopy(value)))
+
+    def _reapply(self, session_id: str):
+        """Apply unflushed changes to the current stored session and write it."""
+        with self._locks(session_id):
+            session = self.get_session(session_id)
+            for kind, value in self._unsaved.get(session_id, []):
+                if kind == "create":
+                    if session is None:
+                        session = copy.deepcopy(value)
+                elif session is None:
+                    continue
+                elif kind == "message":
+                    # Changes already written (by an earlier flush) are kept once
+                    if value not in session["messages"]:
+                        session["messages"].append(value)
+                else:
+                    session["context"].update(value)
+            if session is not None:
+                self.store.put(self._key(session_id), session)
+
 
 # Global instance
-session_manager = SessionManager()
+session_manager = SessionManager(create_session_store())
@@ -0,0 +1,349 @@
+"""Session Store - Pluggable persistence for session data."""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+
+class SessionStore:
+    """Key-value storage interface for session data.
+
+    Values are JSON-serializable dicts. Implementations may buffer writes;
+    call flush() to make them durable.
+    """
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Get value for key, or None if missing."""
+        raise NotImplementedError
+
+    def put(self, key: str, value: Dict):
+        """Store value under key."""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        """Delete key if present."""
+        raise NotImplementedError
+
+    def keys(self, prefix: str = "") -> List[str]:
+        """List keys starting with prefix."""
+        raise NotImplementedError
+
+    def flush(self, keys: Iterable[str] = None):
+        """Persist any buffered writes.
+
+        Args:
+            keys: Keys the caller wrote; implementations that reject stale
+                writes only report those of these keys (None reports all)
+        """
+
+    def close(self):
+        """Flush and release resources."""
+        self.flush()
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store (default, nothing survives a restart)."""
+
+    def __init__(self):
+        """Initialize in-memory store."""
+        self._data = {}  # key -> json string
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Get value for key."""
+        raw = self._data.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    def put(self, key: str, value: Dict):
+        """Store value under key."""
+        self._data[key] = json.dumps(value)
+
+    def delete(self, key: str):
+        """Delete key if present."""
+        self._data.pop(key, None)
+
+    def keys(self, prefix: str = "") -> List[str]:
+        """List keys starting with prefix."""
+        return sorted(k for k in list(self._data) if k.startswith(prefix))
+
+
+_DELETED = object()
+_UNKNOWN = object()  # base version of a blind write (key not read first)
+
+
+class StaleWriteError(Exception):
+    """Buffered writes based on a version another process has replaced."""
+
+    def __init__(self, keys: List[str]):
+        """Initialize error.
+
+        Args:
+            keys: Keys whose writes were not applied
+        """
+        super().__init__(f"Stale writes not applied: {', '.join(keys)}")
+        self.keys = keys
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite-backed store with batched writes and read-through caching.
+
+    Any process opening the same database file sees flushed sessions, so
+    a worker can resume a conversation started by another one. Every row
+    carries a version: cached values are only served while the row's
+    version is unchanged, and a write to a key that was read first is
+    applied only if the row still has the version that was read
+    (compare-and-swap). Otherwise the write is skipped instead of
+    overwriting another process's update, and the next flush() of that
+    key raises StaleWriteError, so the component owning the key can
+    re-read and reapply its change.
+    """
+
+    def __init__(
+        self,
+        path: str = "mealmind_sessions.db",
+        batch_size: int = 32,
+        flush_interval: float = 1.0,
+        cache_size: int = 1024
+    ):
+        """Initialize SQLite store.
+
+        Args:
+            path: Database file path (":memory:" for a private database)
+            batch_size: Pending writes that trigger a flush
+            flush_interval: Seconds after which the next write triggers a flush
+            cache_size: Maximum number of decoded values kept in memory
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.cache_size = cache_size
+
+        self._lock = threading.RLock()
+        self._pending = {}  # key -> (json string or _DELETED, base version)
+        self._cache = OrderedDict()  # key -> (json string, version)
+        self._versions = {}  # key -> version last read (None = absent), for keys not yet written
+        self._stale = {}  # keys of dropped stale writes not yet reported to their owner
+        self._last_flush = time.monotonic()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "key TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL, "
+            "version INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")}
+        if "version" not in columns:
+            # Databases created before rows were versioned
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Get value for key (pending writes, then cache, then database).
+
+        A cached value is returned only if the row's version still
+        matches, so writes flushed by other processes are seen.
+        """
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                raw = pending[0]
+                return None if raw is _DELETED else json.loads(raw)
+            cached = self._cache.get(key)
+            # The data column is only transferred when the cached copy is stale
+            row = self._conn.execute(
+                "SELECT version, CASE WHEN version = ? THEN NULL ELSE data END FROM sessions WHERE key = ?",
+                (cached[1] if cached else None, key)
+            ).fetchone()
+            if row is None:
+                self._cache.pop(key, None)
+                self._track(key, None)
+                return None
+            version, raw = row
+            if raw is None:
+                raw = cached[0]
+                self._cache.move_to_end(key)
+            else:
+                self._remember(key, raw, version)
+            self._track(key, version)
+        return json.loads(raw)
+
+    def put(self, key: str, value: Dict):
+        """Buffer a write for key."""
+        raw = json.dumps(value)
+        with self._lock:
+            self._pending[key] = (raw, self._base(key))
+            self._maybe_flush()
+
+    def delete(self, key: str):
+        """Buffer a delete for key."""
+        with self._lock:
+            self._pending[key] = (_DELETED, _UNKNOWN)
+            self._cache.pop(key, None)
+            self._versions.pop(key, None)
+            self._maybe_flush()
+
+    def keys(self, prefix: str = "") -> List[str]:
+        """List keys starting with prefix."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM sessions WHERE substr(key, 1, ?) = ?",
+                (len(prefix), prefix)
+            ).fetchall()
+            found = {r[0] for r in rows}
+            for key, (raw, _) in self._pending.items():
+                if not key.startswith(prefix):
+                    continue
+                if raw is _DELETED:
+                    found.discard(key)
+                else:
+                    found.add(key)
+        return sorted(found)
+
+    def flush(self, keys: Iterable[str] = None):
+        """Write all pending changes in one transaction.
+
+        Stale writes are dropped (the next read returns the current value)
+        and the rest is committed. A dropped write is reported once, to the
+        first flush that names its key, so one component's conflict never
+        surfaces in another's flush.
+
+        Args:
+            keys: Keys the caller wrote (None reports every stale write)
+
+        Raises:
+            StaleWriteError: Writes to keys, in this or an automatic flush
+                since they were last reported, were based on a version
+                another process has since replaced
+        """
+        with self._lock:
+            self._write()
+            if keys is None:
+                stale = list(self._stale)
+                self._stale.clear()
+            else:
+                stale = [key for key in keys if self._stale.pop(key, False)]
+        if stale:
+            raise StaleWriteError(stale)
+
+    def _write(self):
+        """Commit pending changes, recording stale writes in _stale."""
+        with self._lock:
+            stale = []
+            if self._pending:
+                now = time.time()
+                written = {}
+                with self._conn:
+                    for key, (raw, base) in self._pending.items():
+                        if raw is _DELETED:
+                            self._conn.execute("DELETE FROM sessions WHERE key = ?", (key,))
+                            continue
+                        if base is _UNKNOWN:
+                            row = self._conn.execute(
+                                "INSERT INTO sessions (key, data, updated_at, version) VALUES (?, ?, ?, 1) "
+                                "ON CONFLICT(key) DO UPDATE SET data = excluded.data, "
+                                "updated_at = excluded.updated_at, version = version + 1 "
+                                "RETURNING version",
+                                (key, raw, now)
+                            ).fetchone()
+                        elif base is None:
+                            row = self._conn.execute(
+                                "INSERT INTO sessions (key, data, updated_at, version) VALUES (?, ?, ?, 1) "
+                                "ON CONFLICT(key) DO NOTHING RETURNING version",
+                                (key, raw, now)
+                            ).fetchone()
+                        else:
+                            row = self._conn.execute(
+                                "UPDATE sessions SET data = ?, updated_at = ?, version = version + 1 "
+                                "WHERE key = ? AND version = ? RETURNING version",
+                                (raw, now, key, base)
+                            ).fetchone()
+                        if row is None:
+                            stale.append(key)
+                        else:
+                            written[key] = (raw, row[0])
+                self._pending.clear()
+                for key in stale:
+                    self._cache.pop(key, None)
+                    self._versions.pop(key, None)
+                for key, (raw, version) in written.items():
+                    self._remember(key, raw, version)
+            for key in stale:
+                self._stale[key] = True
+            # Keys nobody flushes by name must not pile up forever
+            while len(self._stale) > self.cache_size:
+                self._stale.pop(next(iter(self._stale)))
+            self._last_flush = time.monotonic()
+
+    def invalidate(self, key: str = None):
+        """Drop cached value(s) so the next read fetches them again."""
+        with self._lock:
+            if key is None:
+                self._cache.clear()
+                self._versions.clear()
+            else:
+                self._cache.pop(key, None)
+                self._versions.pop(key, None)
+
+    def close(self):
+        """Write pending changes and close the connection.
+
+        Stale writes nobody has flushed by key are dropped silently.
+        """
+        with self._lock:
+            try:
+                self._write()
+            finally:
+                self._conn.close()
+
+    def _base(self, key: str):
+        """Version a write to key is based on (_UNKNOWN if never read)."""
+        pending = self._pending.get(key)
+        if pending is not None:
+            return pending[1]
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached[1]
+        return self._versions.get(key, _UNKNOWN)
+
+    def _track(self, key: str, version: Optional[int]):
+        """Record the version a read saw, for keys without a cached value."""
+        if key in self._cache:
+            self._versions.pop(key, None)
+            return
+        self._versions[key] = version
+        while len(self._versions) > self.cache_size:
+            self._versions.pop(next(iter(self._versions)))
+
+    def _remember(self, key: str, raw: str, version: int):
+        """Insert into the LRU cache."""
+        self._cache[key] = (raw, version)
+        self._cache.move_to_end(key)
+        self._versions.pop(key, None)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _maybe_flush(self):
+        """Flush when the batch is full or the interval has elapsed."""
+        if (len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self._write()
+
+
+def create_session_store(path: str = None) -> SessionStore:
+    """Create session store from a path or MEALMIND_SESSION_DB.
+
+    Args:
+        path: SQLite database path; falls back to the MEALMIND_SESSION_DB
+            environment variable, then to an in-memory store
+
+    Returns:
+        Configured session store
+    """
+    path = path or os.getenv("MEALMIND_SESSION_DB")
+    if path:
+        return SQLiteSessionStore(path)
+    return InMemorySessionStore()
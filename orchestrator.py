@@ -1,68 +1,723 @@
-"""Simplified 3-Agent Orchestrator using Google ADK Sequential Workflow."""
-from google.adk.agents import SequentialAgent
-from google.adk.runners import InMemoryRunner
-from google.genai import types
-from agents import (
-    create_recipe_generator_agent,
-    create_nutrition_validator_agent,
-    create_schedule_optimizer_agent
+"""Simplified 3-Agent Orchestrator using a checkpointed sequential workflow.
+
+google.adk and google.genai are imported on first use, and agents are
+built once per (api_key, model) and shared by all orchestrators, so
+importing this module and creating orchestrators stays cheap.
+"""
+from memory import MemoryBank, SessionManager, SessionStore, session_manager
+from memory.checkpoint_store import CheckpointStore
+from memory.recipe_library import RecipeLibrary
+from tools import (
+    get_household_constraints,
+    calculate_recipe_nutrition
+)
+from tools.health_guidelines import excluded_terms, has_term
+from utils import (
+    PlanAggregates,
+    parse_recipes,
+    main_ingredient,
+    assign_slots,
+    allocate_main_ingredients,
+    merge_recipe_chunks,
+    constraint_fingerprint,
+    encode_constraints,
+    extract_json,
+    get_path,
+    apply_patch,
+    validate,
+    normalize_recipes,
+    normalize_verdicts,
+    normalize_plan,
+    group_by_day,
+    RECIPE_LIST_SCHEMA,
+    VERDICT_LIST_SCHEMA,
+    PLAN_SCHEMA,
+    SingleFlight,
+    MEAL_SLOTS,
+    MAIN_INGREDIENTS,
+    recipe_shingles,
+    jaccard,
+    DEFAULT_SIMILARITY
 )
-from utils import optimize_schedule, generate_grocery_list
+import asyncio
+import contextvars
+import functools
+import json
 import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
 
 
-# Configure retry options
-retry_config = types.RetryOptions(
-    max_attempts=5,
-    backoff_base=7,
-    initial_delay=1
-)
+APP_NAME = "mealmind"
+
+# Plans whose running totals are kept for replanning
+PLAN_AGGREGATES_CACHE_SIZE = 256
+
+RECIPE_FORMAT = """Output a JSON array. Each recipe: {"day": int, "meal_type": "breakfast"|"lunch"|"dinner", \
+"name": str, "ingredients": [{"name": str, "amount": grams, "unit": "grams"}], \
+"cooking_time_minutes": int, "servings": int}"""
+
+
+# Token usage per stage of the running workflow ({stage: {"calls",
+# "prompt_tokens", "output_tokens"}}); set per workflow, shared by its tasks
+_token_usage = contextvars.ContextVar("token_usage", default=None)
+
+
+class StageOutputError(ValueError):
+    """A stage's output still fails its schema after repair."""
+    
+    def __init__(self, stage: str, errors: list):
+        """Initialize error.
+        
+        Args:
+            stage: Stage (checkpoint) name
+            errors: Remaining validation errors
+        """
+        super().__init__(f"{stage} output failed validation: {errors[:3]}")
+        self.stage = stage
+        self.errors = errors
+
+
+@functools.lru_cache(maxsize=None)
+def get_retry_config():
+    """Retry options for Gemini calls.
+    
+    HTTP-level retries are off: the shared rate limiter
+    (utils.rate_limiter) retries 429/5xx with jittered backoff and adapts
+    concurrency, instead of every agent backing off in lockstep.
+    """
+    from google.genai import types
+    return types.HttpRetryOptions(attempts=1)
+
+
+_shared_agents = {}  # (api_key, id(model)) -> (model, [agents])
+_shared_agents_lock = threading.Lock()
+
+
+def get_shared_agents(api_key: str = None, model=None) -> list:
+    """Get the 3 stage agents and the JSON repair agent, building them on first use.
+    
+    Args:
+        api_key: Google API key for Gemini
+        model: Model replacing Gemini for all agents
+    
+    Returns:
+        [recipe generator, nutrition validator, schedule optimizer, json repair]
+    """
+    key = (api_key, id(model))
+    with _shared_agents_lock:
+        if key not in _shared_agents:
+            from agents import (
+                create_recipe_generator_agent,
+                create_nutrition_validator_agent,
+                create_schedule_optimizer_agent,
+                create_json_repair_agent
+            )
+            retry_config = get_retry_config()
+            # Keep a reference to the model so its id is not reused
+            _shared_agents[key] = (model, [
+                create_recipe_generator_agent(api_key, retry_config, model),
+                create_nutrition_validator_agent(api_key, retry_config, model),
+                create_schedule_optimizer_agent(api_key, retry_config, model),
+                create_json_repair_agent(api_key, retry_config, model)
+            ])
+        return _shared_agents[key][1]
 
 
 class MealPlanOrchestrator:
     """Orchestrates 3 LLM agents + Python utilities for meal planning."""
     
-    def __init__(self, api_key: str = None):
+    def __init__(
+        self,
+        api_key: str = None,
+        session_store: SessionStore = None,
+        checkpoint_store: CheckpointStore = None,
+        validation_shard_size: int = 3,
+        generation_chunk_days: int = 1,
+        max_concurrency: int = 8,
+        coalesce: bool = True,
+        max_repairs: int = 2,
+        recipe_library: RecipeLibrary = None,
+        library_min_coverage: float = 0.75,
+        memory_bank: MemoryBank = None,
+        variety_threshold: float = DEFAULT_SIMILARITY,
+        model=None
+    ):
         """Initialize orchestrator.
         
         Args:
             api_key: Google API key for Gemini
+            session_store: Session storage shared by the runner and the
+                session manager (defaults to the global session manager's)
+            checkpoint_store: Stage output checkpoints (defaults to the
+                session store)
+            validation_shard_size: Recipes per concurrent validation run
+            generation_chunk_days: Days per concurrent recipe generation run
+            max_concurrency: Maximum concurrent agent runs per plan
+            coalesce: Share one in-progress workflow between concurrent
+                requests with identical constraints and parameters
+            max_repairs: Repair rounds for stage output failing its schema
+            recipe_library: Validated recipes to plan from before calling
+                the LLM (plans are always generated when omitted)
+            library_min_coverage: Fraction of a plan's slots the library
+                must fill for a retrieval-first plan; the LLM fills the rest
+            memory_bank: Meal history; completed plans are stored in it and
+                recipes nearly matching recent plans are regenerated
+            variety_threshold: Ingredient-set Jaccard similarity at which
+                two recipes count as near-duplicates
+            model: Model for all agents instead of Gemini (e.g. OfflineGemini)
         """
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
+        self.model = model
+        self.validation_shard_size = validation_shard_size
+        self.generation_chunk_days = generation_chunk_days
+        self.max_concurrency = max_concurrency
+        self.coalesce = coalesce
+        self.max_repairs = max_repairs
+        self.recipe_library = recipe_library
+        self.library_min_coverage = library_min_coverage
+        self.memory_bank = memory_bank
+        self.variety_threshold = variety_threshold
+        self.flights = SingleFlight()
+        
+        # Runner sessions and conversation history share one store
+        if session_store is None:
+            self.session_manager = session_manager
+        else:
+            self.session_manager = SessionManager(session_store)
+        self.session_store = self.session_manager.store
+        self.checkpoints = checkpoint_store or CheckpointStore(self.session_store)
+        
+        # Running totals of recently returned plans, so a replan updates
+        # them for the swapped meal instead of recomputing the whole plan
+        self._aggregates = OrderedDict()  # request_id -> (meal_plan, PlanAggregates)
+        self._aggregates_lock = threading.Lock()
+        
+        # ADK objects are created on first use
+        self._session_service = None
+        self._runners = {}
+    
+    @property
+    def stages(self) -> list:
+        """Sequential workflow (3 agents only), run stage by stage so each
+        stage's output can be checkpointed."""
+        return get_shared_agents(self.api_key, self.model)[:3]
+    
+    @property
+    def recipe_agent(self):
+        """1. Generate recipes."""
+        return self.stages[0]
+    
+    @property
+    def nutrition_agent(self):
+        """2. Validate safety."""
+        return self.stages[1]
+    
+    @property
+    def schedule_optimizer_agent(self):
+        """3. Optimize schedule."""
+        return self.stages[2]
+    
+    @property
+    def repair_agent(self):
+        """Fixes fields of stage output that fail validation."""
+        return get_shared_agents(self.api_key, self.model)[3]
+    
+    @property
+    def session_service(self):
+        """ADK session service backed by the persistent session store."""
+        if self._session_service is None:
+            from memory.adk_session_service import StoreSessionService
+            self._session_service = StoreSessionService(self.session_store)
+        return self._session_service
+    
+    def _runner(self, agent):
+        """Get the runner for a stage agent."""
+        if agent.name not in self._runners:
+            from google.adk.runners import Runner
+            self._runners[agent.name] = Runner(
+                app_name=APP_NAME,
+                agent=agent,
+                session_service=self.session_service
+            )
+        return self._runners[agent.name]
+    
+    async def _run_stage(self, agent, message: str, household_id: str, stage_session_id: str) -> str:
+        """Run one agent in a fresh session and return its final text.
         
-        # Create 3 LLM agents
-        self.recipe_agent = create_recipe_generator_agent(self.api_key, retry_config)
-        self.nutrition_agent = create_nutrition_validator_agent(self.api_key, retry_config)
-        self.schedule_optimizer_agent = create_schedule_optimizer_agent(self.api_key, retry_config)
-        
-        # Create sequential workflow (3 agents only)
-        self.workflow = SequentialAgent(
-            name="meal_planning_workflow",
-            description="3-agent meal planning system with Python utilities",
-            agents=[
-                self.recipe_agent,              # 1. Generate recipes
-                self.nutrition_agent,           # 2. Validate safety
-                self.schedule_optimizer_agent   # 3. Optimize schedule
-            ]
+        Args:
+            agent: Stage agent
+            message: Input message for the stage
+            household_id: Household identifier (ADK user ID)
+            stage_session_id: Session dedicated to this stage attempt
+        
+        Returns:
+            Final text response of the agent
+        """
+        # Drop any half-finished conversation from an earlier failed attempt
+        await self.session_service.delete_session(
+            app_name=APP_NAME, user_id=household_id, session_id=stage_session_id
+        )
+        await self.session_service.create_session(
+            app_name=APP_NAME, user_id=household_id, session_id=stage_session_id
         )
         
-        # Create runner
-        self.runner = InMemoryRunner(agent=self.workflow)
+        from google.genai import types
+        content = types.Content(role="user", parts=[types.Part(text=message)])
+        final_text = ""
+        try:
+            async for event in self._runner(agent).run_async(
+                user_id=household_id,
+                session_id=stage_session_id,
+                new_message=content
+            ):
+                if event.partial:
+                    continue
+                _record_usage(agent.name, event.usage_metadata)
+                if not event.content or not event.content.parts:
+                    continue
+                text = "".join(part.text for part in event.content.parts if part.text)
+                if text:
+                    final_text = text
+        finally:
+            # Stage sessions are single-use: the output lives on in the
+            # checkpoint, and a retry starts a fresh session anyway
+            await self.session_service.delete_session(
+                app_name=APP_NAME, user_id=household_id, session_id=stage_session_id
+            )
+        return final_text
+    
+    async def _structured_output(
+        self,
+        stage: str,
+        schema: dict,
+        normalize,
+        produce,
+        household_id: str,
+        request_id: str,
+        checkpoint: bool = True
+    ) -> tuple:
+        """Get a stage's output as data validated against its schema.
+        
+        Output that contains no usable JSON runs the stage once more.
+        Schema errors are sent to the repair agent, which patches only the
+        offending fields (up to max_repairs rounds). Valid output is
+        checkpointed as normalized JSON.
+        
+        Args:
+            stage: Checkpoint name of the stage
+            schema: Schema for the normalized output (utils.schemas)
+            normalize: Maps extracted JSON to the schema's shape (None if unusable)
+            produce: Zero-argument coroutine function running the stage
+            household_id: Household identifier
+            request_id: Run identifier
+            checkpoint: Save valid output under stage
+        
+        Returns:
+            (data, errors): errors is empty when data is valid
+        """
+        output = self.checkpoints.load(household_id, request_id, stage) if checkpoint else None
+        data = None
+        for _ in range(2):
+            if output is None:
+                output = await produce()
+            data = normalize(extract_json(output)[0])
+            if data is not None:
+                break
+            output = None
+        if data is None:
+            return None, [{"path": "", "error": "no JSON found in output"}]
+        
+        errors = validate(data, schema)
+        for attempt in range(self.max_repairs):
+            if not errors:
+                break
+            data = await self._repair(stage, data, errors, household_id, f"{request_id}:{stage}:repair{attempt}")
+            errors = validate(data, schema)
+        if checkpoint and not errors:
+            self.checkpoints.save(household_id, request_id, stage, json.dumps(data))
+        return data, errors
+    
+    async def _repair(self, stage: str, data, errors: list, household_id: str, repair_session_id: str):
+        """Ask the repair agent for a patch of the failing fields and apply it.
+        
+        Returns:
+            data with the patch applied (unchanged if the reply has no patch)
+        """
+        lines = []
+        context = {}
+        for error in errors:
+            path = error["path"]
+            lines.append(
+                f"- {path or '(root)'}: {error['error']} "
+                f"(current value: {json.dumps(get_path(data, path))})"
+            )
+            # The list item containing the error tells the model what it is about
+            parts = path.split(".")
+            item = next((".".join(parts[:i + 1]) for i, p in enumerate(parts) if p.isdigit()), path)
+            context[item] = get_path(data, item)
+        
+        message = f"""Fix these fields in the {stage} output.
+
+Errors:
+{chr(10).join(lines)}
+
+Items containing them:
+{json.dumps(context)}
+
+Output a JSON object mapping each path above to its corrected value."""
+        output = await self._run_stage(self.repair_agent, message, household_id, repair_session_id)
+        patch, _ = extract_json(output)
+        if isinstance(patch, dict):
+            data = apply_patch(data, patch)
+        return data
+    
+    async def _generate_recipes(self, household_id: str, days: int, request_id: str) -> str:
+        """Generate recipes in concurrent per-day chunks and merge them.
+        
+        Chunks share the household constraints. Before they start, each
+        slot is assigned a main ingredient from MAIN_INGREDIENTS (minus
+        those the household's constraints exclude), so chunks running at
+        the same time do not converge on the same ones; chunks also see
+        the main ingredients claimed by chunks that already finished. Each
+        recipe is stamped with a slot its chunk asked for, and slots a
+        chunk left uncovered (e.g. truncated output) are generated in one
+        extra call. Repeated recipes, overused main ingredients and
+        near-duplicates (within the plan or of the household's recent
+        plans) found while merging are regenerated in one call, before
+        any of them reaches the validator.
+        
+        Args:
+            household_id: Household identifier
+            days: Number of days to plan
+            request_id: Run identifier (chunks are checkpointed individually)
+        
+        Returns:
+            Recipes as a JSON array in (day, meal) order
+        """
+        agent = self.recipe_agent
+        household = get_household_constraints(household_id)
+        constraints = encode_constraints(household)
+        size = self.generation_chunk_days
+        day_ranges = [(start, min(start + size - 1, days)) for start in range(1, days + 1, size)]
+        chunk_slots = [
+            [(day, meal_type) for day in range(first, last + 1) for meal_type in MEAL_SLOTS]
+            for first, last in day_ranges
+        ]
+        excluded = list(excluded_terms(household)[0].values()) if "error" not in household else []
+        pools = {
+            meal_type: [name for name in names if not any(has_term(name, terms) for terms in excluded)]
+            for meal_type, names in MAIN_INGREDIENTS.items()
+        }
+        mains = allocate_main_ingredients(pools, chunk_slots)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        claimed = set()
+        
+        missing = []
+        
+        async def run(stage: str, message_factory, slots: list) -> list:
+            async with semaphore:
+                recipes, errors = await self._structured_output(
+                    stage,
+                    RECIPE_LIST_SCHEMA,
+                    normalize_recipes,
+                    lambda: self._run_stage(agent, message_factory(), household_id, f"{request_id}:{stage}"),
+                    household_id,
+                    request_id
+                )
+            if errors:
+                raise StageOutputError(stage, errors)
+            # The model's day/meal labels are not trusted: each recipe is
+            # stamped with a slot this call asked for
+            assigned = assign_slots(recipes, slots)
+            missing.extend(assigned["missing"])
+            recipes = assigned["recipes"]
+            claimed.update(filter(None, (main_ingredient(r) for r in recipes)))
+            return recipes
+        
+        def chunk_message(first: int, last: int, slots: list, assigned: dict) -> str:
+            # Built when the chunk starts, so it sees every claim made so far
+            others = claimed - set(assigned.values())
+            return f"""Generate {(last - first + 1) * 3} recipes for household {household_id}: \
+breakfast, lunch and dinner for day {first}{f' to day {last}' if last > first else ''} of a {days}-day plan.
+
+Household constraints: {constraints}
+Main ingredient (largest amount) of each recipe, where it fits the constraints: \
+{'; '.join(f'day {day} {meal_type}: {assigned.get((day, meal_type), "any")}' for day, meal_type in slots)}
+Main ingredients already used on other days (choose different ones): {', '.join(sorted(others)) or 'none'}
+
+{RECIPE_FORMAT}"""
+        
+        chunks = await asyncio.gather(*(
+            run(
+                f"{agent.name}:{first}",
+                functools.partial(chunk_message, first, last, slots, assigned),
+                slots
+            )
+            for (first, last), slots, assigned in zip(day_ranges, chunk_slots, mains)
+        ))
+        if missing:
+            # Truncated or short chunks: generate just the uncovered slots
+            slots = sorted(missing, key=lambda slot: (slot[0], MEAL_SLOTS.index(slot[1])))
+            generated = await self._generate_slots(
+                household_id, slots, [r for chunk in chunks for r in chunk], request_id
+            )
+            uncovered = slots[len(generated):]
+            if uncovered:
+                raise StageOutputError(f"{agent.name}:gaps", [
+                    f"no recipe for day {day} {meal_type}" for day, meal_type in uncovered
+                ])
+            chunks = list(chunks) + [generated]
+        merged = merge_recipe_chunks(
+            chunks, history=self._variety_index(household_id), similarity=self.variety_threshold
+        )
+        recipes, conflicts = merged["recipes"], merged["conflicts"]
+        similar = sorted(set(merged["near_duplicates"].values()))
+        avoid_similar = f"Avoid ingredient combinations close to: {', '.join(similar)}\n" if similar else ""
+        
+        if conflicts:
+            kept = [r for i, r in enumerate(recipes) if i not in conflicts]
+            slots = [f"day {recipes[i].get('day')} {recipes[i].get('meal_type')}" for i in conflicts]
+            
+            def dedup_message() -> str:
+                return f"""Generate {len(conflicts)} replacement recipes for household {household_id}: {', '.join(slots)}.
+
+Household constraints: {constraints}
+Do not repeat these recipes: {', '.join(sorted({str(r.get('name')) for r in kept}))}
+Main ingredients already used (prefer different ones): {', '.join(sorted(merged['main_ingredients']))}
+{avoid_similar}
+{RECIPE_FORMAT}"""
+            
+            replacements = await run(
+                f"{agent.name}:dedup",
+                dedup_message,
+                [(recipes[i].get("day"), recipes[i].get("meal_type")) for i in conflicts]
+            )
+            # Keep the original recipe for any slot the model did not fill
+            missing.clear()
+            by_slot = {(r["day"], r["meal_type"]): r for r in replacements}
+            for index in conflicts:
+                recipes[index] = by_slot.get((recipes[index].get("day"), recipes[index].get("meal_type")), recipes[index])
+        
+        return json.dumps(recipes)
+    
+    async def _validate_recipes(self, prompt: str, recipes_output: str, household_id: str, request_id: str) -> str:
+        """Validate recipes in concurrent shards and keep the approved ones.
+        
+        Each shard's verdicts are checked against VERDICT_LIST_SCHEMA. A
+        recipe without a well-formed approving verdict is rejected.
+        
+        Args:
+            prompt: Original plan request
+            recipes_output: Recipe generator output
+            household_id: Household identifier
+            request_id: Run identifier (shards are checkpointed individually)
+        
+        Returns:
+            Approved recipes as a JSON array, in generation order
+        """
+        agent = self.nutrition_agent
+        recipes = parse_recipes(recipes_output)
+        size = self.validation_shard_size
+        shards = [recipes[i:i + size] for i in range(0, len(recipes), size)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def validate_shard(index: int, shard: list) -> list:
+            stage = f"{agent.name}:{index}"
+            message = (
+                f"{prompt}\n\nRecipes to validate ({len(shard)} of {len(recipes)}):\n"
+                f"{json.dumps(shard)}"
+            )
+            async with semaphore:
+                verdicts, _ = await self._structured_output(
+                    stage,
+                    VERDICT_LIST_SCHEMA,
+                    normalize_verdicts,
+                    lambda: self._run_stage(agent, message, household_id, f"{request_id}:{stage}"),
+                    household_id,
+                    request_id
+                )
+            approved = {
+                verdict.get("index") for verdict in verdicts or []
+                if isinstance(verdict, dict) and verdict.get("approved") is True
+            }
+            return [recipe for i, recipe in enumerate(shard) if i in approved]
+        
+        approved = await asyncio.gather(*(validate_shard(i, shard) for i, shard in enumerate(shards)))
+        return json.dumps([recipe for shard in approved for recipe in shard])
+    
+    async def _plan(self, agent, stage_input: str, approved_output: str, household_id: str, request_id: str) -> str:
+        """Run the final stage and return the plan as JSON matching PLAN_SCHEMA.
+        
+        If the coordinator's plan stays invalid after repair, or contains
+        recipes that were not approved, the approved recipes are grouped by
+        day directly instead.
+        """
+        approved = parse_recipes(approved_output)
+        plan, errors = await self._structured_output(
+            agent.name,
+            PLAN_SCHEMA,
+            normalize_plan,
+            lambda: self._run_stage(agent, stage_input, household_id, f"{request_id}:{agent.name}"),
+            household_id,
+            request_id,
+            checkpoint=False
+        )
+        approved_names = {recipe.get("name") for recipe in approved}
+        if errors or any(meal.get("name") not in approved_names for day in plan["days"] for meal in day["meals"]):
+            plan = {"days": group_by_day(approved)}
+            errors = validate(plan, PLAN_SCHEMA)
+            if errors:
+                raise StageOutputError(agent.name, errors)
+        return json.dumps(plan)
+    
+    async def _run_workflow(self, household_id: str, request_id: str, prompt: str, days: int) -> tuple:
+        """Run the 3 stages, resuming from checkpoints.
+        
+        Returns:
+            (final stage output, seconds per stage run in this call)
+        """
+        stage_input = prompt
+        output = ""
+        stage_timings = {}
+        for agent in self.stages:
+            previous_output = output
+            output = self.checkpoints.load(household_id, request_id, agent.name)
+            if output is None:
+                started = time.perf_counter()
+                if agent is self.recipe_agent:
+                    # Fan out: generation time stays flat in plan length
+                    output = await self._generate_recipes(household_id, days, request_id)
+                elif agent is self.nutrition_agent:
+                    # Fan out: validation time stays flat in plan length
+                    output = await self._validate_recipes(prompt, previous_output, household_id, request_id)
+                else:
+                    output = await self._plan(agent, stage_input, previous_output, household_id, request_id)
+                self.checkpoints.save(household_id, request_id, agent.name, output)
+                stage_timings[agent.name] = round(time.perf_counter() - started, 4)
+            stage_input = f"{prompt}\n\nOutput from {agent.name}:\n{output}"
+        return output, stage_timings
+    
+    async def _run_library_workflow(
+        self, household_id: str, request_id: str, prompt: str, days: int, constraints: dict
+    ) -> tuple:
+        """Plan from the recipe library, generating only the slots it cannot fill.
+        
+        Library recipes were validated when they were added and are checked
+        against the household's constraints in Python, so they skip the
+        validator; generated gap recipes go through it. The coordinator is
+        not run: recipes are grouped by day directly.
+        
+        Returns:
+            (plan as JSON matching PLAN_SCHEMA, seconds per stage, number of
+            library recipes), or (None, {}, 0) when the library covers less
+            than library_min_coverage of the slots
+        """
+        started = time.perf_counter()
+        selection = self.recipe_library.assemble(
+            days, constraints, seed=household_id,
+            avoid=self._variety_index(household_id), similarity=self.variety_threshold
+        )
+        recipes, gaps = selection["recipes"], selection["gaps"]
+        if len(recipes) < self.library_min_coverage * days * len(MEAL_SLOTS):
+            return None, {}, 0
+        stage_timings = {"recipe_library": round(time.perf_counter() - started, 4)}
+        from_library = len(recipes)
+        
+        if gaps:
+            started = time.perf_counter()
+            # Separate checkpoint namespace from a full workflow run
+            gap_request_id = f"{request_id}:library"
+            generated = await self._generate_slots(household_id, gaps, recipes, gap_request_id)
+            approved = await self._validate_recipes(prompt, json.dumps(generated), household_id, gap_request_id)
+            recipes = recipes + parse_recipes(approved)
+            stage_timings[self.recipe_agent.name] = round(time.perf_counter() - started, 4)
+        
+        plan = {"days": group_by_day(recipes)}
+        errors = validate(plan, PLAN_SCHEMA)
+        if errors:
+            raise StageOutputError("recipe_library", errors)
+        return json.dumps(plan), stage_timings, from_library
+    
+    async def _generate_slots(self, household_id: str, slots: list, planned: list, request_id: str) -> list:
+        """Generate recipes for specific (day, meal_type) slots of a plan.
+        
+        Args:
+            household_id: Household identifier
+            slots: (day, meal_type) pairs to fill
+            planned: Recipes already in the plan (not to be repeated)
+            request_id: Run identifier
+        
+        Returns:
+            One recipe per slot the model filled, with day and meal_type set
+        """
+        agent = self.recipe_agent
+        stage = f"{agent.name}:gaps"
+        constraints = encode_constraints(get_household_constraints(household_id))
+        message = f"""Generate {len(slots)} recipes for household {household_id}: \
+{', '.join(f'day {day} {meal_type}' for day, meal_type in slots)}.
+
+Household constraints: {constraints}
+Do not repeat these recipes: {', '.join(sorted({str(r.get('name')) for r in planned})) or 'none'}
+Main ingredients already used (prefer different ones): \
+{', '.join(sorted(filter(None, {main_ingredient(r) for r in planned}))) or 'none'}
+
+{RECIPE_FORMAT}"""
+        recipes, errors = await self._structured_output(
+            stage,
+            RECIPE_LIST_SCHEMA,
+            normalize_recipes,
+            lambda: self._run_stage(agent, message, household_id, f"{request_id}:{stage}"),
+            household_id,
+            request_id
+        )
+        if errors:
+            raise StageOutputError(stage, errors)
+        return [{**recipe, "day": day, "meal_type": meal_type} for (day, meal_type), recipe in zip(slots, recipes)]
     
     async def generate_meal_plan(
         self,
         household_id: str,
-        days: int = 3
+        days: int = 3,
+        session_id: str = None,
+        request_id: str = None
     ) -> dict:
         """Generate complete meal plan.
         
+        Each stage's output is checkpointed under (household_id, request_id,
+        stage). Calling again with the same request_id after a failure or a
+        crash resumes at the first stage without a checkpoint. Checkpoints
+        are deleted once the plan is complete.
+        
+        Concurrent calls whose households have the same constraint
+        fingerprint and the same days share one workflow (see
+        utils.SingleFlight); the others report it as "coalesced_with".
+        
+        With a recipe library, plans are assembled from validated library
+        recipes when it covers enough of the plan, and only the missing
+        slots are generated ("library_recipes" counts the reused ones).
+        Recipes of fully generated plans are added to the library.
+        
+        With a memory bank, completed plans are stored in its meal history
+        and new recipes are checked against it for near-duplicates; a
+        household with history then no longer shares workflows with others.
+        
         Args:
             household_id: Household identifier  
             days: Number of days to plan
+            session_id: Conversation to continue (defaults to the household's)
+            request_id: Resumable run identifier (generated when omitted)
         
         Returns:
-            Complete meal plan with grocery list
+            Complete meal plan with grocery list, stage timings and
+            "token_usage" (model calls and prompt/output tokens per stage,
+            from the responses' usage metadata), or {"status": "invalid",
+            "stage", "errors"} when a stage's output could not be repaired
         """
+        request_id = request_id or uuid.uuid4().hex
+        constraints = get_household_constraints(household_id)
         prompt = f"""Generate a complete {days}-day meal plan for household: {household_id}
 
 WORKFLOW:
@@ -70,47 +725,353 @@ WORKFLOW:
 2. Nutrition Validator: Validate each recipe for safety
 3. Schedule Optimizer: Optimize cooking schedule and format final output
 
-Start by checking household constraints with get_household_constraints('{household_id}')."""
+Household constraints: {encode_constraints(constraints)}"""
+        
+        session_id = session_id or household_id
+        self.session_manager.get_or_create_session(session_id, household_id)
+        self.session_manager.add_message(session_id, "user", prompt)
         
-        result = await self.runner.run_debug(prompt)
+        async def workflow() -> dict:
+            usage = {}
+            token = _token_usage.set(usage)
+            try:
+                output = None
+                from_library = 0
+                if self.recipe_library is not None and "error" not in constraints:
+                    output, stage_timings, from_library = await self._run_library_workflow(
+                        household_id, request_id, prompt, days, constraints
+                    )
+                if output is None:
+                    output, stage_timings = await self._run_workflow(household_id, request_id, prompt, days)
+                    if self.recipe_library is not None:
+                        # Recipes in the final plan passed validation
+                        self.recipe_library.add_recipes(m for d in json.loads(output)["days"] for m in d["meals"])
+                # Checkpoints only serve resuming a failed run (including
+                # the library run's gap stages, stored under this prefix)
+                self.checkpoints.clear(household_id, request_id)
+            finally:
+                _token_usage.reset(token)
+            return {
+                "output": output,
+                "stage_timings": stage_timings,
+                "request_id": request_id,
+                "library_recipes": from_library,
+                "token_usage": usage
+            }
         
-        # Post-process with Python utilities (outside LLM)
         try:
-            if isinstance(result, str):
-                import json
-                meal_data = json.loads(result)
+            if self.coalesce:
+                # Unknown households and households with history (which
+                # shapes their recipes) never share a workflow
+                if "error" in constraints or self._variety_index(household_id):
+                    fingerprint = household_id
+                else:
+                    fingerprint = constraint_fingerprint(constraints)
+                key = (fingerprint, days)
+                run, _ = await self.flights.run(key, workflow)
             else:
-                meal_data = result
-            
-            if "days" in meal_data or "meal_plan" in meal_data:
-                meals = meal_data.get("days") or meal_data.get("meal_plan", [])
-                
-                # Run Python utilities
-                optimization = optimize_schedule(meals, 45)
-                grocery = generate_grocery_list(meals, 150.0)
-                
-                # Add to result
-                final_result = {
-                    "meal_plan": meals,
-                    "optimization": optimization,
-                    "grocery_list": grocery,
-                    "status": "complete"
-                }
-                return final_result
-        except:
-            pass
-        
-        return result
+                run = await workflow()
+            result = run["output"]
+            self.session_manager.add_message(session_id, "assistant", result)
+        except StageOutputError as e:
+            return {
+                "status": "invalid",
+                "stage": e.stage,
+                "errors": e.errors,
+                "request_id": request_id
+            }
+        finally:
+            self.session_manager.flush()
+        
+        # Post-process with Python utilities (outside LLM); the final stage
+        # output is a plan validated against PLAN_SCHEMA
+        meals = json.loads(result)["days"]
+        aggregates = PlanAggregates.from_plan(
+            meals, constraints.get("budget_weekly", 150.0), cooking_time_max=constraints.get("cooking_time_max", 45)
+        )
+        self._keep_aggregates(request_id, meals, aggregates)
+        
+        final_result = {
+            "household_id": household_id,
+            "meal_plan": meals,
+            "optimization": aggregates.schedule(),
+            "grocery_list": aggregates.grocery_list(),
+            "request_id": request_id,
+            "stage_timings": run["stage_timings"],
+            "token_usage": run["token_usage"],
+            "status": "complete"
+        }
+        if self.recipe_library is not None:
+            final_result["library_recipes"] = run["library_recipes"]
+        if run["request_id"] != request_id:
+            final_result["coalesced_with"] = run["request_id"]
+        if self.memory_bank is not None:
+            self.memory_bank.store_meal_plan(household_id, final_result)
+        return final_result
+    
+    def _variety_index(self, household_id: str):
+        """The household's recent-recipe index, or None without a memory bank."""
+        if self.memory_bank is None:
+            return None
+        return self.memory_bank.variety_index(household_id)
+    
+    async def replan(
+        self,
+        plan: dict,
+        day: int,
+        meal_slot: str,
+        reason: str = "",
+        household_id: str = None,
+        attempts: int = 2
+    ) -> dict:
+        """Replace one meal of a finished plan.
+        
+        Only the recipe generator runs, for a single recipe, with the rest
+        of the plan as context for ingredient reuse and variety. The
+        replacement is validated in Python (schema, allergens, dietary
+        restrictions and health guidelines via their ingredient term
+        tables, the day's remaining cooking time, repeats of the plan's
+        recipes and of the rejected one, including near-duplicates at
+        variety_threshold); the validator agent only runs for constraints
+        without a term table. The
+        optimization and grocery list are updated for the swapped meal
+        rather than recomputed (for the last PLAN_AGGREGATES_CACHE_SIZE
+        plans this orchestrator returned; others are summed once first).
+        
+        Args:
+            plan: Result of generate_meal_plan (or of an earlier replan)
+            day: Day of the meal to replace
+            meal_slot: "breakfast", "lunch" or "dinner"
+            reason: Why the user rejected the meal (passed to the model)
+            household_id: Household (defaults to the plan's)
+            attempts: Generation attempts before giving up
+        
+        Returns:
+            The updated plan (the input plan is not modified), or
+            {"status": "invalid", "stage", "errors"} if no acceptable
+            replacement was generated
+        """
+        household_id = household_id or plan["household_id"]
+        meals = plan["meal_plan"]
+        day_index = next((i for i, d in enumerate(meals) if d.get("day") == day), None)
+        if day_index is None:
+            raise ValueError(f"Day {day} is not in the plan")
+        meal_index = next(
+            (i for i, m in enumerate(meals[day_index]["meals"]) if m.get("meal_type") == meal_slot), None
+        )
+        if meal_index is None:
+            raise ValueError(f"Day {day} has no {meal_slot}")
+        old_meal = meals[day_index]["meals"][meal_index]
+        
+        request_id = plan.get("request_id") or uuid.uuid4().hex
+        stage = f"{self.recipe_agent.name}:replan"
+        constraints = get_household_constraints(household_id)
+        if "error" in constraints:
+            return {
+                "status": "invalid",
+                "stage": stage,
+                "errors": [constraints["error"]],
+                "request_id": request_id
+            }
+        excluded, unknown = excluded_terms(constraints)
+        cooking_time_max = constraints.get("cooking_time_max")
+        time_left = None
+        if cooking_time_max:
+            time_left = cooking_time_max - sum(
+                m.get("cooking_time_minutes", 0) for m in meals[day_index]["meals"] if m is not old_meal
+            )
+        others = [m for d in meals for m in d["meals"] if m is not old_meal]
+        context = "\n".join(
+            f"- day {m.get('day')} {m.get('meal_type')}: {m.get('name')} "
+            f"({', '.join(i.get('name', '') for i in m.get('ingredients', []))})"
+            for m in others
+        )
+        problems = []
+        new_meal = None
+        usage = {}
+        token = _token_usage.set(usage)
+        try:
+            for attempt in range(attempts):
+                message = f"""Generate 1 replacement recipe for household {household_id}: day {day} {meal_slot}.
+
+Rejected recipe: {old_meal.get('name')}{f' (reason: {reason})' if reason else ''}
+Household constraints: {encode_constraints(constraints)}
+{f'Cooking time left for day {day}: {max(0, time_left)} minutes' if time_left is not None else ''}
+Rest of the plan (reuse its ingredients where sensible, do not repeat its recipes):
+{context}
+{f'Problems with the previous attempt: {"; ".join(problems)}' if problems else ''}
+{RECIPE_FORMAT}"""
+                session_id = f"{request_id}:{stage}:{uuid.uuid4().hex}"
+                recipes, errors = await self._structured_output(
+                    stage,
+                    RECIPE_LIST_SCHEMA,
+                    normalize_recipes,
+                    lambda: self._run_stage(self.recipe_agent, message, household_id, session_id),
+                    household_id,
+                    request_id,
+                    checkpoint=False
+                )
+                if errors:
+                    problems = [f"{e['path']}: {e['error']}" for e in errors]
+                    continue
+                candidate = {**recipes[0], "day": day, "meal_type": meal_slot}
+                problems = _recipe_problems(
+                    candidate, excluded, time_left, others, old_meal, self.variety_threshold
+                )
+                if not problems and unknown:
+                    problems = await self._validate_replacement(candidate, constraints, unknown, household_id, request_id)
+                if not problems:
+                    new_meal = candidate
+                    break
+        finally:
+            _token_usage.reset(token)
+        if new_meal is None:
+            return {
+                "status": "invalid",
+                "stage": stage,
+                "errors": problems,
+                "request_id": request_id
+            }
+        new_meal["nutrition"] = calculate_recipe_nutrition(json.dumps(new_meal))
+        new_meals = list(meals)
+        new_meals[day_index] = {
+            **meals[day_index],
+            "meals": [new_meal if i == meal_index else m for i, m in enumerate(meals[day_index]["meals"])]
+        }
+        
+        aggregates = self._take_aggregates(request_id, meals)
+        if aggregates is None:
+            aggregates = PlanAggregates.from_plan(meals)
+        aggregates.budget = constraints.get("budget_weekly", 150.0)
+        aggregates.cooking_time_max = constraints.get("cooking_time_max", 45)
+        aggregates.replace_meal(day_index, old_meal, new_meal)
+        self._keep_aggregates(request_id, new_meals, aggregates)
+        return {
+            **plan,
+            "household_id": household_id,
+            "meal_plan": new_meals,
+            "optimization": aggregates.schedule(),
+            "grocery_list": aggregates.grocery_list(),
+            "replaced": {
+                "day": day,
+                "meal_type": meal_slot,
+                "old": old_meal.get("name"),
+                "new": new_meal.get("name"),
+                "reason": reason
+            },
+            "token_usage": usage
+        }
+    
+    def _keep_aggregates(self, request_id: str, meals: list, aggregates: PlanAggregates):
+        """Cache a returned plan's running totals for replanning it."""
+        with self._aggregates_lock:
+            self._aggregates[request_id] = (meals, aggregates)
+            self._aggregates.move_to_end(request_id)
+            while len(self._aggregates) > PLAN_AGGREGATES_CACHE_SIZE:
+                self._aggregates.popitem(last=False)
+    
+    def _take_aggregates(self, request_id: str, meals: list):
+        """Remove and return the cached totals of exactly this meal plan.
+        
+        Returns:
+            PlanAggregates, or None if the plan is not cached (evicted,
+            from another process, or an older version of a replanned plan)
+        """
+        with self._aggregates_lock:
+            cached = self._aggregates.get(request_id)
+            if cached is None or cached[0] is not meals:
+                return None
+            del self._aggregates[request_id]
+            return cached[1]
+    
+    async def _validate_replacement(
+        self, recipe: dict, constraints: dict, unknown: list, household_id: str, request_id: str
+    ) -> list:
+        """Have the validator agent check constraints without a term table.
+        
+        Returns:
+            Problems (empty if the validator approved the recipe)
+        """
+        validation_id = f"{request_id}:replan:{uuid.uuid4().hex}"
+        prompt = (
+            f"Validate a replacement recipe for household {household_id}.\n"
+            f"Household constraints: {encode_constraints(constraints)}"
+        )
+        try:
+            approved = await self._validate_recipes(prompt, json.dumps([recipe]), household_id, validation_id)
+        finally:
+            self.checkpoints.clear(household_id, validation_id)
+        if parse_recipes(approved):
+            return []
+        return [f"validator rejected the recipe (unchecked constraints: {', '.join(unknown)})"]
+
+
+def _record_usage(stage: str, usage_metadata):
+    """Add one model call's usage metadata to the running workflow's totals."""
+    usage = _token_usage.get()
+    if usage is None or usage_metadata is None:
+        return
+    totals = usage.setdefault(stage, {"calls": 0, "prompt_tokens": 0, "output_tokens": 0})
+    totals["calls"] += 1
+    totals["prompt_tokens"] += usage_metadata.prompt_token_count or 0
+    totals["output_tokens"] += usage_metadata.candidates_token_count or 0
+
+
+def _recipe_problems(
+    recipe: dict, excluded: dict, time_left, others: list, rejected: dict, similarity: float
+) -> list:
+    """Reasons a replacement recipe is unacceptable (empty if acceptable).
+    
+    Args:
+        recipe: Replacement recipe
+        excluded: {reason: ingredient terms} from excluded_terms
+        time_left: Cooking minutes left for the day (None = no limit)
+        others: The plan's other meals
+        rejected: The meal being replaced
+        similarity: Ingredient-set Jaccard similarity at which the
+            recipe counts as the rejected meal again
+    """
+    problems = []
+    ingredient_names = [i.get("name", "").lower() for i in recipe.get("ingredients", [])]
+    for reason, terms in excluded.items():
+        found = [name for name in ingredient_names if has_term(name, terms)]
+        if found:
+            problems.append(f"{reason}: {', '.join(found)}")
+    
+    if time_left is not None and recipe.get("cooking_time_minutes", 0) > time_left:
+        problems.append(f"cooking time exceeds the {max(0, time_left)} minutes left for the day")
+    
+    name = str(recipe.get("name", "")).strip().lower()
+    if name == str(rejected.get("name", "")).strip().lower():
+        problems.append(f"{recipe.get('name')} is the rejected recipe")
+    elif jaccard(recipe_shingles(recipe), recipe_shingles(rejected)) >= similarity:
+        problems.append(f"{recipe.get('name')} has nearly the same ingredients as the rejected {rejected.get('name')}")
+    if any(str(m.get("name", "")).strip().lower() == name for m in others):
+        problems.append(f"{recipe.get('name')} is already in the plan")
+    return problems
 
 
 # Factory function
-def create_orchestrator(api_key: str = None) -> MealPlanOrchestrator:
+def create_orchestrator(
+    api_key: str = None,
+    session_store: SessionStore = None,
+    checkpoint_store: CheckpointStore = None,
+    model=None
+) -> MealPlanOrchestrator:
     """Create orchestrator instance.
     
     Args:
         api_key: Google API key
+        session_store: Optional shared session storage backend
+        checkpoint_store: Optional stage checkpoint store
+        model: Optional model replacing Gemini for all agents
     
     Returns:
         Configured orchestrator with 3 agents
     """
-    return MealPlanOrchestrator(api_key=api_key)
+    return MealPlanOrchestrator(
+        api_key=api_key,
+        session_store=session_store,
+        checkpoint_store=checkpoint_store,
+        model=model
+    )
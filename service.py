@@ -0,0 +1,321 @@
+"""Async HTTP service for MealMind meal plan generation.
+
+Plan requests go onto a bounded queue drained by a pool of workers.
+Clients get a job ID back and poll or stream the result. When the queue
+is full the service answers 429 with a Retry-After estimate.
+
+Endpoints:
+    POST /households          Create a household with its members
+    POST /plans               {"household_id", "days" (1-30)} -> 202 {"job_id", ...}
+    GET  /plans/<job_id>         Job status and result
+    GET  /plans/<job_id>/stream  Server-sent events until the job finishes
+    GET  /health              Queue depth and worker stats
+
+Usage:
+    python service.py [--port 8080] [--workers 4] [--queue-size 64] [--offline]
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from orchestrator import MealPlanOrchestrator
+from tools import create_household_profile, add_family_member
+
+STATUS_TEXT = {
+    200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 429: "Too Many Requests",
+    500: "Internal Server Error"
+}
+MAX_BODY_BYTES = 64 * 1024
+MAX_PLAN_DAYS = 30
+
+
+class MealPlanService:
+    """Job queue and worker pool around a MealPlanOrchestrator."""
+
+    def __init__(
+        self,
+        orchestrator: MealPlanOrchestrator,
+        workers: int = 4,
+        queue_size: int = 64,
+        max_finished_jobs: int = 10000
+    ):
+        """Initialize service.
+
+        Args:
+            orchestrator: Orchestrator used by all workers
+            workers: Number of concurrent plan workers
+            queue_size: Maximum queued jobs before returning 429
+            max_finished_jobs: Finished jobs kept for polling
+        """
+        self.orchestrator = orchestrator
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_finished_jobs = max_finished_jobs
+
+        self.jobs = OrderedDict()  # job_id -> job
+        self.queue: Optional[asyncio.Queue] = None
+        self.changed: Optional[asyncio.Condition] = None
+        self._worker_tasks = []
+        self._server = None
+        self._job_seconds = 10.0  # moving average, seeds Retry-After
+        self.stats = {"accepted": 0, "rejected": 0, "completed": 0, "failed": 0}
+
+    # ============================================================================
+    # JOBS
+    # ============================================================================
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080):
+        """Start workers and the HTTP server."""
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.changed = asyncio.Condition()
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+
+    async def stop(self):
+        """Stop the server and workers."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+
+    @property
+    def port(self) -> int:
+        """Port the server is bound to."""
+        return self._server.sockets[0].getsockname()[1]
+
+    def submit(self, household_id: str, days: int) -> Tuple[Optional[Dict], int]:
+        """Enqueue a plan job.
+
+        Returns:
+            (job, 0) when accepted, (None, retry_after_seconds) when full
+        """
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "household_id": household_id,
+            "days": days,
+            "status": "queued",
+            "created_at": time.time(),
+            "result": None,
+            "error": None
+        }
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            return None, self.retry_after()
+        self.jobs[job["job_id"]] = job
+        self.stats["accepted"] += 1
+        return job, 0
+
+    def retry_after(self) -> int:
+        """Seconds until a queue slot is likely to free up."""
+        return max(1, math.ceil(self._job_seconds * self.queue.qsize() / self.workers))
+
+    async def _worker(self):
+        """Drain the queue, one plan at a time."""
+        while True:
+            job = await self.queue.get()
+            started = time.monotonic()
+            await self._update(job, status="running")
+            try:
+                result = await self.orchestrator.generate_meal_plan(
+                    job["household_id"], days=job["days"], request_id=job["job_id"]
+                )
+                if result.get("status") == "complete":
+                    await self._update(job, status="complete", result=result)
+                    self.stats["completed"] += 1
+                else:
+                    await self._update(job, status="failed", result=result,
+                                       error=f"Plan {result.get('status', 'failed')} at {result.get('stage', 'unknown stage')}")
+                    self.stats["failed"] += 1
+            except Exception as e:
+                await self._update(job, status="failed", error=str(e))
+                self.stats["failed"] += 1
+            finally:
+                elapsed = time.monotonic() - started
+                self._job_seconds = 0.8 * self._job_seconds + 0.2 * elapsed
+                self.queue.task_done()
+                self._evict_finished()
+
+    async def _update(self, job: Dict, **changes):
+        """Update a job and wake up streaming clients."""
+        job.update(changes)
+        async with self.changed:
+            self.changed.notify_all()
+
+    def _evict_finished(self):
+        """Drop the oldest finished jobs beyond max_finished_jobs."""
+        finished = [jid for jid, job in self.jobs.items() if job["status"] in ("complete", "failed")]
+        for jid in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[jid]
+
+    # ============================================================================
+    # HTTP
+    # ============================================================================
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one HTTP request per connection."""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            request_line, *header_lines = head.decode("latin-1").split("\r\n")
+            method, path, _ = request_line.split(" ", 2)
+            headers = {}
+            for line in header_lines:
+                if ":" in line:
+                    name, value = line.split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", 0) or 0)
+            if length < 0:
+                raise ValueError("negative Content-Length")
+            if length > MAX_BODY_BYTES:
+                return await self._respond(writer, 413, {"error": f"Body exceeds {MAX_BODY_BYTES} bytes"})
+            body = await reader.readexactly(length)
+            await self._route(method, path.split("?", 1)[0].rstrip("/"), body, writer)
+        except (asyncio.IncompleteReadError, ValueError):
+            await self._respond(writer, 400, {"error": "Malformed request"})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter):
+        """Dispatch a request to its endpoint."""
+        parts = path.strip("/").split("/")
+
+        if parts == ["health"] and method == "GET":
+            return await self._respond(writer, 200, {
+                "queued": self.queue.qsize(),
+                "queue_size": self.queue_size,
+                "workers": self.workers,
+                "avg_job_seconds": round(self._job_seconds, 3),
+                **self.stats
+            })
+
+        if parts == ["households"] and method == "POST":
+            try:
+                data = json.loads(body or b"{}")
+                profile = create_household_profile(
+                    data["household_id"],
+                    data.get("household_name", data["household_id"]),
+                    int(data.get("cooking_time_max", 45)),
+                    float(data.get("budget_weekly", 150.0)),
+                    ", ".join(data.get("cuisine_preferences", []))
+                )
+                for member in data.get("members", []):
+                    add_family_member(
+                        data["household_id"],
+                        member["name"],
+                        int(member.get("age", 30)),
+                        ", ".join(member.get("dietary_restrictions", [])),
+                        ", ".join(member.get("allergies", [])),
+                        ", ".join(member.get("health_conditions", []))
+                    )
+            except (ValueError, KeyError, TypeError) as e:
+                return await self._respond(writer, 400, {"error": f"Invalid household: {e}"})
+            return await self._respond(writer, 200, {"household_id": profile["household_id"]})
+
+        if parts == ["plans"] and method == "POST":
+            try:
+                data = json.loads(body or b"{}")
+                household_id = str(data["household_id"])
+                days = int(data.get("days", 3))
+                if not 1 <= days <= MAX_PLAN_DAYS:
+                    raise ValueError(f"days must be between 1 and {MAX_PLAN_DAYS}")
+            except (ValueError, KeyError, TypeError) as e:
+                return await self._respond(writer, 400, {"error": f"Invalid plan request: {e}"})
+            job, retry_after = self.submit(household_id, days)
+            if job is None:
+                return await self._respond(
+                    writer, 429, {"error": "Queue full", "retry_after": retry_after},
+                    {"Retry-After": str(retry_after)}
+                )
+            return await self._respond(writer, 202, {
+                "job_id": job["job_id"],
+                "status": job["status"],
+                "status_url": f"/plans/{job['job_id']}",
+                "stream_url": f"/plans/{job['job_id']}/stream"
+            })
+
+        if len(parts) in (2, 3) and parts[0] == "plans" and method == "GET":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                return await self._respond(writer, 404, {"error": "Job not found"})
+            if len(parts) == 3 and parts[2] == "stream":
+                return await self._stream(job, writer)
+            if len(parts) == 2:
+                return await self._respond(writer, 200, job)
+
+        await self._respond(writer, 404, {"error": "Not found"})
+
+    async def _stream(self, job: Dict, writer: asyncio.StreamWriter):
+        """Send server-sent events for a job until it finishes."""
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n"
+        )
+        last_status = None
+        while True:
+            if job["status"] != last_status:
+                last_status = job["status"]
+                event = "result" if last_status in ("complete", "failed") else "status"
+                writer.write(f"event: {event}\ndata: {json.dumps(job, default=str)}\n\n".encode())
+                await writer.drain()
+                if event == "result":
+                    return
+            async with self.changed:
+                await self.changed.wait_for(lambda: job["status"] != last_status)
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: Dict, headers: Dict = None):
+        """Write a JSON response."""
+        body = json.dumps(payload, default=str).encode()
+        head = [
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            "Connection: close"
+        ]
+        head += [f"{k}: {v}" for k, v in (headers or {}).items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+        await writer.drain()
+
+
+async def serve(host: str, port: int, workers: int, queue_size: int, offline: bool = False):
+    """Run the service until cancelled."""
+    model = None
+    if offline:
+        from agents import OfflineGemini
+        model = OfflineGemini()
+    service = MealPlanService(MealPlanOrchestrator(model=model), workers, queue_size)
+    server = await service.start(host, port)
+    print(f"🚀 MealMind service on http://{host}:{service.port} "
+          f"({workers} workers, queue {queue_size}{', offline model' if offline else ''})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main():
+    """Parse arguments and run the service."""
+    parser = argparse.ArgumentParser(description="MealMind async HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--offline", action="store_true", help="Use OfflineGemini (no API key)")
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.workers, args.queue_size, args.offline))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ from .profile_store import (
     create_household_profile,
     add_family_member,
     get_household_constraints,
+    get_compact_constraints,
     HOUSEHOLD_PROFILES
 )
 from .cost_estimator import estimate_ingredient_cost, calculate_meal_plan_cost
@@ -17,6 +18,7 @@ __all__ = [
     'create_household_profile',
     'add_family_member',
     'get_household_constraints',
+    'get_compact_constraints',
     'estimate_ingredient_cost',
     'calculate_meal_plan_cost',
     'get_health_guidelines',
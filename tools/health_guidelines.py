@@ -1,6 +1,8 @@
 """Health guidelines and allergen checking tools."""
-from typing import Dict
+from typing import Dict, Iterable, List, Optional, Tuple
+import functools
 import json
+import re
 
 HEALTH_GUIDELINES = {
     "diabetes": {"avoid": ["sugar", "white bread", "white rice"], "prefer": ["whole grains", "vegetables", "lean protein"]},
@@ -8,12 +10,164 @@ HEALTH_GUIDELINES = {
     "high blood pressure": {"avoid": ["high sodium", "processed meats"], "prefer": ["fruits", "vegetables", "whole grains"]}
 }
 
+# Ingredient-name terms per food group. A term matches at the start of a
+# word ("almond" catches "Almond Butter" and "almonds", "ham" does not
+# catch "graham"), so compounds ending in a term are listed themselves
+_MEAT = ["chicken", "beef", "pork", "lamb", "turkey", "bacon", "ham", "sausage", "veal", "duck"]
+_FISH = [
+    "salmon", "tuna", "cod", "fish", "anchovy", "sardine", "trout", "mackerel", "tilapia", "halibut",
+    "catfish", "swordfish", "monkfish", "whitefish"
+]
+_SHELLFISH = ["shrimp", "prawn", "crab", "lobster", "clam", "mussel", "oyster", "scallop", "squid", "shellfish"]
+_DAIRY = ["milk", "cheese", "butter", "yogurt", "yoghurt", "cream", "whey", "ghee", "casein", "paneer"]
+_GLUTEN = [
+    "wheat", "bread", "pasta", "flour", "barley", "rye", "couscous", "noodle", "spelt", "semolina", "seitan",
+    "flatbread", "shortbread", "cornbread", "sourdough"
+]
+_TREE_NUTS = ["almond", "cashew", "pecan", "walnut", "pistachio", "hazelnut", "macadamia", "brazil nut", "pine nut"]
+_PEANUTS = ["peanut", "groundnut"]
+_EGG = ["egg", "mayonnaise", "meringue"]
+_SOY = ["soy", "tofu", "edamame", "tempeh", "miso"]
+_SESAME = ["sesame", "tahini"]
+
+# Phrases in which a term does not name its food group ("almond milk" is
+# not dairy, "eggplant" is not egg). An exception only masks its own term,
+# so almond milk is still found by the nut terms.
+TERM_EXCEPTIONS = {
+    "milk": ["almond milk", "oat milk", "soy milk", "soya milk", "rice milk", "coconut milk", "cashew milk", "hemp milk"],
+    "butter": [
+        "butternut", "peanut butter", "almond butter", "cashew butter", "nut butter", "seed butter",
+        "cocoa butter", "cacao butter", "shea butter", "apple butter"
+    ],
+    "cream": ["coconut cream", "cream of tartar"],
+    "yogurt": ["coconut yogurt", "soy yogurt", "oat yogurt"],
+    "egg": ["eggplant"]
+}
+
+# Terms that break each dietary restriction, keyed by term_key()
+RESTRICTION_EXCLUDES = {
+    "vegetarian": _MEAT + _FISH + _SHELLFISH,
+    "pescatarian": _MEAT,
+    "vegan": _MEAT + _FISH + _SHELLFISH + _DAIRY + _EGG + ["honey"],
+    "dairyfree": _DAIRY,
+    "glutenfree": _GLUTEN,
+    "nutfree": _TREE_NUTS + _PEANUTS
+}
+
+# Terms each allergy rules out, keyed by term_key() in singular form
+ALLERGEN_TERMS = {
+    "nut": _TREE_NUTS + _PEANUTS,
+    "treenut": _TREE_NUTS,
+    "peanut": _PEANUTS,
+    "dairy": _DAIRY,
+    "milk": _DAIRY,
+    "lactose": _DAIRY,
+    "gluten": _GLUTEN,
+    "wheat": _GLUTEN,
+    "egg": _EGG,
+    "fish": _FISH,
+    "shellfish": _SHELLFISH,
+    "seafood": _FISH + _SHELLFISH,
+    "soy": _SOY,
+    "soya": _SOY,
+    "sesame": _SESAME
+}
+
+# Ingredient terms behind each HEALTH_GUIDELINES "avoid" entry
+AVOID_TERMS = {
+    "sugar": ["sugar", "syrup", "honey", "molasses"],
+    "white bread": ["white bread", "baguette"],
+    "white rice": ["white rice"],
+    "refined carbs": ["white bread", "baguette", "white rice", "white flour", "all-purpose flour", "pasta", "noodle"],
+    "high sodium": ["soy sauce", "bacon", "ham", "salami", "sausage", "pepperoni", "bouillon", "stock cube", "pickle", "anchovy"],
+    "processed meats": ["bacon", "ham", "salami", "sausage", "pepperoni", "chorizo", "prosciutto", "hot dog"]
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _term_pattern(term: str) -> "re.Pattern":
+    """Regex finding a term at a word start, or one of its exceptions."""
+    exceptions = "|".join(re.escape(phrase) for phrase in TERM_EXCEPTIONS.get(term, []))
+    return re.compile(rf"{exceptions}|(?P<term>\b{re.escape(term)})" if exceptions else rf"\b{re.escape(term)}")
+
+
+def has_term(name: str, terms: Iterable[str]) -> bool:
+    """Whether a lowercase ingredient name contains one of terms (see TERM_EXCEPTIONS)."""
+    for term in terms:
+        if term in name:  # cheap filter, most names contain no term at all
+            pattern = _term_pattern(term)
+            if term not in TERM_EXCEPTIONS:
+                if pattern.search(name):
+                    return True
+            elif any(match.group("term") for match in pattern.finditer(name)):
+                return True
+    return False
+
+
+def term_key(name: str) -> str:
+    """Canonical constraint name ("Gluten-Free" -> "glutenfree")."""
+    return re.sub(r"[^a-z]", "", name.lower())
+
+
+def allergen_terms(allergy: str) -> Optional[List[str]]:
+    """Ingredient terms an allergy rules out, or None if it is not in ALLERGEN_TERMS."""
+    key = term_key(allergy)
+    return ALLERGEN_TERMS.get(key) or ALLERGEN_TERMS.get(key[:-1] if key.endswith("s") else None)
+
+
+def excluded_terms(constraints: Dict) -> Tuple[Dict[str, List[str]], List[str]]:
+    """Ingredient terms ruled out by household constraints.
+
+    Allergies are expanded through ALLERGEN_TERMS, dietary restrictions
+    through RESTRICTION_EXCLUDES and health "avoid" entries through
+    AVOID_TERMS. Constraints missing from those tables (including health
+    conditions without HEALTH_GUIDELINES) cannot be checked locally:
+    they are listed as unknown (an unknown allergy still rules out its
+    own name).
+
+    Args:
+        constraints: Output of get_household_constraints
+
+    Returns:
+        ({reason: terms}, [unknown constraints])
+    """
+    excluded = {}
+    unknown = []
+    for allergy in constraints.get("allergies", []):
+        if not allergy.strip():
+            continue
+        terms = allergen_terms(allergy)
+        if terms is None:
+            unknown.append(f"allergy: {allergy}")
+            terms = [allergy.strip().lower()]
+        excluded[f"allergen {allergy}"] = terms
+    for restriction in constraints.get("dietary_restrictions", []):
+        terms = RESTRICTION_EXCLUDES.get(term_key(restriction))
+        if terms is None:
+            unknown.append(f"diet: {restriction}")
+        else:
+            excluded[f"not {restriction}"] = terms
+    for condition in constraints.get("health_conditions", []):
+        if not condition.strip():
+            continue
+        if condition.strip().lower() not in HEALTH_GUIDELINES:
+            unknown.append(f"health: {condition}")
+            continue
+        for avoid in get_health_guidelines(condition.strip()).get("avoid", []):
+            terms = AVOID_TERMS.get(avoid.lower())
+            if terms is None:
+                unknown.append(f"{condition}: {avoid}")
+            else:
+                excluded[f"{avoid} should be avoided for {condition}"] = terms
+    return excluded, unknown
+
+
 def get_health_guidelines(condition: str) -> Dict:
     """Get dietary guidelines for a health condition."""
     return HEALTH_GUIDELINES.get(condition.lower(), {"avoid": [], "prefer": [], "note": f"No guidelines for {condition}"})
 
 def check_allergens_in_recipe(recipe_json: str, allergies: str) -> Dict:
-    """Check if recipe contains allergens."""
+    """Check if recipe contains allergens (e.g. "nuts" also finds almonds)."""
     try:
         recipe = json.loads(recipe_json)
         allergy_list = [a.strip().lower() for a in allergies.split(",") if a.strip()]
@@ -21,6 +175,7 @@ def check_allergens_in_recipe(recipe_json: str, allergies: str) -> Dict:
         for ing in recipe.get("ingredients", []):
             ing_name = ing.get("name", "").lower()
             for allergen in allergy_list:
-                if allergen in ing_name: found.append(f"{allergen} in {ing.get('name')}")
+                if has_term(ing_name, allergen_terms(allergen) or [allergen]):
+                    found.append(f"{allergen} in {ing.get('name')}")
         return {"has_allergens": len(found) > 0, "found_allergens": found}
     except: return {"error": "Invalid JSON"}
@@ -1,19 +1,10 @@
 """Nutrition lookup tools."""
 from typing import Dict
 import json
+from utils.ingredient_catalog import get_catalog
 
-NUTRITION_DB = {
-    "chicken breast": {"calories": 165, "protein_g": 31, "carbs_g": 0, "fat_g": 3.6, "fiber_g": 0},
-    "brown rice": {"calories": 112, "protein_g": 2.6, "carbs_g": 24, "fat_g": 0.9, "fiber_g": 1.8},
-    "broccoli": {"calories": 34, "protein_g": 2.8, "carbs_g": 7, "fat_g": 0.4, "fiber_g": 2.6},
-    "salmon": {"calories": 206, "protein_g": 22, "carbs_g": 0, "fat_g": 13, "fiber_g": 0},
-    "quinoa": {"calories": 120, "protein_g": 4.4, "carbs_g": 21, "fat_g": 1.9, "fiber_g": 2.8},
-    "spinach": {"calories": 23, "protein_g": 2.9, "carbs_g": 3.6, "fat_g": 0.4, "fiber_g": 2.2},
-    "sweet potato": {"calories": 86, "protein_g": 1.6, "carbs_g": 20, "fat_g": 0.1, "fiber_g": 3.0},
-    "eggs": {"calories": 155, "protein_g": 13, "carbs_g": 1.1, "fat_g": 11, "fiber_g": 0},
-    "olive oil": {"calories": 884, "protein_g": 0, "carbs_g": 0, "fat_g": 100, "fiber_g": 0},
-    "tofu": {"calories": 76, "protein_g": 8, "carbs_g": 1.9, "fat_g": 4.8, "fiber_g": 0.3},
-}
+# Nutrient fields per 100g, read from the ingredient catalog
+NUTRIENTS = ["calories", "protein_g", "carbs_g", "fat_g", "fiber_g"]
 
 
 def nutrition_lookup(ingredient: str, amount_grams: float = 100.0) -> Dict:
@@ -26,10 +17,9 @@ def nutrition_lookup(ingredient: str, amount_grams: float = 100.0) -> Dict:
     Returns:
         Nutritional information dictionary
     """
-    ingredient_lower = ingredient.lower()
+    base = get_catalog().get(ingredient)
     
-    if ingredient_lower in NUTRITION_DB:
-        base = NUTRITION_DB[ingredient_lower]
+    if base is not None and all(nutrient in base for nutrient in NUTRIENTS):
         factor = amount_grams / 100.0
         return {
             "ingredient": ingredient,
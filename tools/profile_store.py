@@ -1,8 +1,13 @@
 """Profile store tools for household management."""
 from typing import Dict
+from utils.concurrency import KeyedLock
+from utils.meal_planning_utils import encode_constraints
 
-# Global storage for household profiles
+# Global storage for household profiles.
+# Profiles are copy-on-write: writers replace a household's dict under its
+# lock, so readers always see a consistent snapshot without locking.
 HOUSEHOLD_PROFILES = {}
+_profile_locks = KeyedLock()
 
 
 def create_household_profile(
@@ -26,7 +31,7 @@ def create_household_profile(
     """
     cuisines = [c.strip() for c in cuisine_preferences.split(",") if c.strip()]
     
-    HOUSEHOLD_PROFILES[household_id] = {
+    profile = {
         "household_id": household_id,
         "household_name": household_name,
         "cooking_time_max": cooking_time_max,
@@ -35,7 +40,10 @@ def create_household_profile(
         "members": []
     }
     
-    return HOUSEHOLD_PROFILES[household_id]
+    with _profile_locks(household_id):
+        HOUSEHOLD_PROFILES[household_id] = profile
+    
+    return profile
 
 
 def add_family_member(
@@ -59,9 +67,6 @@ def add_family_member(
     Returns:
         Created member profile
     """
-    if household_id not in HOUSEHOLD_PROFILES:
-        return {"error": "Household not found"}
-    
     member = {
         "name": name,
         "age": age,
@@ -70,7 +75,11 @@ def add_family_member(
         "health_conditions": [h.strip() for h in health_conditions.split(",") if h.strip()]
     }
     
-    HOUSEHOLD_PROFILES[household_id]["members"].append(member)
+    with _profile_locks(household_id):
+        profile = HOUSEHOLD_PROFILES.get(household_id)
+        if profile is None:
+            return {"error": "Household not found"}
+        HOUSEHOLD_PROFILES[household_id] = {**profile, "members": profile["members"] + [member]}
     return member
 
 
@@ -83,10 +92,10 @@ def get_household_constraints(household_id: str) -> Dict:
     Returns:
         Aggregated constraints from all members
     """
-    if household_id not in HOUSEHOLD_PROFILES:
+    profile = HOUSEHOLD_PROFILES.get(household_id)
+    if profile is None:
         return {"error": "Household not found"}
     
-    profile = HOUSEHOLD_PROFILES[household_id]
     all_restrictions = []
     all_allergies = []
     all_conditions = []
@@ -107,3 +116,15 @@ def get_household_constraints(household_id: str) -> Dict:
         "member_count": len(profile["members"]),
         "members": profile["members"]
     }
+
+
+def get_compact_constraints(household_id: str) -> Dict:
+    """Get a household's dietary constraints in compact form (agent tool).
+    
+    Args:
+        household_id: Household identifier
+    
+    Returns:
+        {"constraints": encoded constraints} (codes in CONSTRAINT_LEGEND)
+    """
+    return {"constraints": encode_constraints(get_household_constraints(household_id))}
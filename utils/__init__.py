@@ -2,11 +2,74 @@
 from .meal_planning_utils import (
     optimize_schedule,
     generate_grocery_list,
-    calculate_optimization_score
+    calculate_optimization_score,
+    parse_recipes,
+    flatten_recipes,
+    main_ingredient,
+    assign_slots,
+    allocate_main_ingredients,
+    merge_recipe_chunks,
+    constraint_fingerprint,
+    encode_constraints,
+    MEAL_SLOTS,
+    MAIN_INGREDIENTS,
+    CONSTRAINT_CODES,
+    CONSTRAINT_LEGEND
 )
+from .json_extract import extract_json, get_path, apply_patch
+from .schemas import (
+    validate,
+    normalize_recipes,
+    normalize_verdicts,
+    normalize_plan,
+    group_by_day,
+    RECIPE_SCHEMA,
+    RECIPE_LIST_SCHEMA,
+    VERDICT_LIST_SCHEMA,
+    PLAN_SCHEMA
+)
+from .plan_aggregates import PlanAggregates
+from .ingredient_catalog import IngredientCatalog, build_catalog, get_catalog, configure_catalog
+from .variety import MinHashIndex, recipe_shingles, jaccard, DEFAULT_SIMILARITY
+from .concurrency import KeyedLock, SingleFlight
 
 __all__ = [
     'optimize_schedule',
     'generate_grocery_list',
-    'calculate_optimization_score'
+    'calculate_optimization_score',
+    'parse_recipes',
+    'flatten_recipes',
+    'main_ingredient',
+    'assign_slots',
+    'allocate_main_ingredients',
+    'merge_recipe_chunks',
+    'constraint_fingerprint',
+    'encode_constraints',
+    'MEAL_SLOTS',
+    'MAIN_INGREDIENTS',
+    'CONSTRAINT_CODES',
+    'CONSTRAINT_LEGEND',
+    'extract_json',
+    'get_path',
+    'apply_patch',
+    'validate',
+    'normalize_recipes',
+    'normalize_verdicts',
+    'normalize_plan',
+    'group_by_day',
+    'RECIPE_SCHEMA',
+    'RECIPE_LIST_SCHEMA',
+    'VERDICT_LIST_SCHEMA',
+    'PLAN_SCHEMA',
+    'PlanAggregates',
+    'IngredientCatalog',
+    'build_catalog',
+    'get_catalog',
+    'configure_catalog',
+    'MinHashIndex',
+    'recipe_shingles',
+    'jaccard',
+    'DEFAULT_SIMILARITY',
+    'KeyedLock',
+    'SingleFlight'
 ]
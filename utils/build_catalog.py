@@ -0,0 +1,24 @@
+"""Build a memory-mapped ingredient catalog from CSV.
+
+Usage:
+    python -m utils.build_catalog foods.csv foods.cat
+
+Then point MEALMIND_CATALOG at foods.cat (see utils.ingredient_catalog
+for the CSV columns and file format).
+"""
+import argparse
+
+from .ingredient_catalog import build_catalog
+
+
+def main():
+    """Parse arguments and build the catalog."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("csv", help="Source CSV (name column plus numeric columns)")
+    parser.add_argument("out", help="Catalog file to write")
+    args = parser.parse_args()
+    print(f"{build_catalog(args.csv, args.out)} foods written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Concurrency helpers for the shared in-process stores."""
+import asyncio
+import functools
+import threading
+import zlib
+from typing import Awaitable, Callable
+
+
+class KeyedLock:
+    """Striped locks: writers for different keys rarely contend.
+
+    Locks are re-entrant thread locks, so they are safe to use from tool
+    functions running in executor threads as well as from coroutines (as
+    long as the critical section does not await).
+    """
+
+    def __init__(self, stripes: int = 64):
+        """Initialize lock stripes.
+
+        Args:
+            stripes: Number of underlying locks
+        """
+        self._locks = [threading.RLock() for _ in range(stripes)]
+
+    def __call__(self, key: str) -> threading.RLock:
+        """Get the lock guarding key."""
+        return self._locks[zlib.crc32(str(key).encode()) % len(self._locks)]
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one coroutine.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it runs await the same task and share its result or exception.
+    Each caller awaits through asyncio.shield, so cancelling one caller
+    leaves the work running for the others. The work itself is cancelled
+    only when every caller waiting on it has gone.
+    """
+
+    def __init__(self):
+        """Initialize flight table."""
+        self._flights = {}  # (loop, key) -> [task, waiter count]
+        self.stats = {"started": 0, "coalesced": 0, "cancelled": 0}
+
+    def in_flight(self, key) -> bool:
+        """Whether work for key is running on the current event loop."""
+        return (asyncio.get_running_loop(), key) in self._flights
+
+    async def run(self, key, factory: Callable[[], Awaitable]):
+        """Run factory() once per key among concurrent callers.
+
+        Args:
+            key: Hashable identity of the work
+            factory: Zero-argument coroutine function doing the work
+
+        Returns:
+            (result, leader) where leader is True for the caller whose
+            call started the work
+        """
+        # Tasks belong to one event loop, so flights are per loop
+        flight_key = (asyncio.get_running_loop(), key)
+        flight = self._flights.get(flight_key)
+        leader = flight is None
+        if leader:
+            task = asyncio.ensure_future(factory())
+            flight = self._flights[flight_key] = [task, 0]
+            task.add_done_callback(functools.partial(self._finished, flight_key))
+            self.stats["started"] += 1
+        else:
+            self.stats["coalesced"] += 1
+
+        task = flight[0]
+        flight[1] += 1
+        try:
+            return await asyncio.shield(task), leader
+        finally:
+            flight[1] -= 1
+            if flight[1] == 0 and not task.done():
+                # Forget the flight now: the task only finishes cancelling
+                # on a later loop iteration, and callers arriving before
+                # then must start fresh work instead of joining it
+                if self._flights.get(flight_key) is flight:
+                    del self._flights[flight_key]
+                task.cancel()
+                self.stats["cancelled"] += 1
+
+    def _finished(self, flight_key, task: asyncio.Task):
+        """Forget a finished flight so later calls start fresh work."""
+        if self._flights.get(flight_key, [None])[0] is task:
+            del self._flights[flight_key]
+        if not task.cancelled():
+            task.exception()  # retrieved, even if every caller has left
@@ -0,0 +1,373 @@
+"""Memory-mapped ingredient catalog for nutrition and price data (no LLM needed).
+
+The catalog is built once from a CSV file (one row per food: a "name"
+column plus numeric columns such as calories, protein_g or regional
+price columns like cost_per_100g_uk) into a compact binary file:
+
+    header     magic, version, record count, offsets of the sections below,
+               file size
+    fields     JSON list of the numeric column names
+    index      record count x uint64 name hashes, sorted
+    name refs  record count x (uint32 offset, uint32 length) into names
+    records    record count x field count float64 (NaN = missing value)
+    names      UTF-8 names, concatenated
+
+Readers memory-map the file read-only, so opening it is O(1) and worker
+processes share its pages through the OS page cache instead of each
+holding a copy. Opening checks the header's layout against the file
+size, so a truncated or foreign file is rejected up front rather than
+failing (or silently missing foods) on lookup. Lookups binary-search the
+hash index; recent lookups are cached per process.
+"""
+import array
+import bisect
+import csv
+import functools
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+MAGIC = b"MMCATLG1"
+VERSION = 2
+_HEADER = struct.Struct("<8sIIIIQQQQQ")  # magic, version, fields, records, pad, offsets, file size
+_NAME_REF = struct.Struct("<II")
+
+# Bundled catalog, built on first use unless MEALMIND_CATALOG names a built file
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "ingredients.csv")
+
+# Price column used when no region is given
+COST_FIELD = "cost_per_100g"
+
+
+def normalize_name(name: str) -> str:
+    """Catalog key of an ingredient name (lowercase, single spaces)."""
+    return " ".join(str(name).lower().split())
+
+
+def _hash(key: str) -> int:
+    """64-bit hash of a normalized name."""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+
+def _align(offset: int) -> int:
+    """Round an offset up to a multiple of 8."""
+    return (offset + 7) & ~7
+
+
+def _layout(field_block_length: int, field_count: int, count: int) -> Tuple[int, int, int, int]:
+    """Offsets of the index, name refs, records and names sections."""
+    index_offset = _align(_HEADER.size + 4 + field_block_length)
+    refs_offset = index_offset + 8 * count
+    records_offset = _align(refs_offset + _NAME_REF.size * count)
+    names_offset = records_offset + 8 * field_count * count
+    return index_offset, refs_offset, records_offset, names_offset
+
+
+def build_catalog(csv_path: str, out_path: str) -> int:
+    """Build a binary catalog from a CSV file.
+
+    The CSV needs a "name" column; every other column is numeric (empty
+    cells are stored as missing). Duplicate names keep the last row. The
+    file is written to a temporary path and renamed into place, so
+    readers never see a partial catalog.
+
+    Args:
+        csv_path: Source CSV
+        out_path: Catalog file to write
+
+    Returns:
+        Number of foods in the catalog
+    """
+    rows = {}
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = [column.strip() for column in next(reader)]
+        name_column = header.index("name")
+        fields = [column for i, column in enumerate(header) if i != name_column]
+        for row in reader:
+            if len(row) <= name_column or not row[name_column].strip():
+                continue
+            key = normalize_name(row[name_column])
+            values = [cell.strip() for i, cell in enumerate(row) if i != name_column]
+            values += [""] * (len(fields) - len(values))
+            rows[key] = [float(v) if v else math.nan for v in values[:len(fields)]]
+
+    entries = sorted((_hash(key), key) for key in rows)
+    count = len(entries)
+    field_block = json.dumps(fields).encode()
+
+    hashes = array.array("Q", (h for h, _ in entries))
+    values = array.array("d")
+    names = bytearray()
+    name_refs = bytearray()
+    for _, key in entries:
+        values.extend(rows[key])
+        encoded = key.encode()
+        name_refs += _NAME_REF.pack(len(names), len(encoded))
+        names += encoded
+    if sys.byteorder != "little":
+        hashes.byteswap()
+        values.byteswap()
+
+    index_offset, refs_offset, records_offset, names_offset = _layout(len(field_block), len(fields), count)
+    size = names_offset + len(names)
+
+    directory = os.path.dirname(os.path.abspath(out_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(_HEADER.pack(
+                MAGIC, VERSION, len(fields), count, 0,
+                index_offset, refs_offset, records_offset, names_offset, size
+            ))
+            out.write(struct.pack("<I", len(field_block)) + field_block)
+            out.write(b"\0" * (index_offset - out.tell()))
+            out.write(hashes.tobytes())
+            out.write(name_refs)
+            out.write(b"\0" * (records_offset - out.tell()))
+            out.write(values.tobytes())
+            out.write(names)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return count
+
+
+class IngredientCatalog:
+    """Read-only view of a built catalog file."""
+
+    def __init__(self, path: str, cache_size: int = 65536):
+        """Memory-map a catalog file.
+
+        Args:
+            path: File written by build_catalog
+            cache_size: Lookups cached per process
+
+        Raises:
+            ValueError: The file is empty, truncated, or not a version
+                VERSION catalog
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            index_offset = self._read_header()
+        except (struct.error, TypeError, ValueError) as e:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a valid version {VERSION} ingredient catalog ({e})") from e
+        if sys.byteorder == "little":
+            self._hashes = memoryview(self._mmap)[index_offset:index_offset + 8 * self._count].cast("Q")
+        else:
+            hashes = array.array("Q", self._mmap[index_offset:index_offset + 8 * self._count])
+            hashes.byteswap()
+            self._hashes = memoryview(hashes)
+        self._find = functools.lru_cache(maxsize=cache_size)(self._find_uncached)
+        self._cache_size = cache_size
+        self._price_tables = {}
+
+    def _read_header(self) -> int:
+        """Read the header and fields, checking the layout against the file.
+
+        Returns:
+            Offset of the hash index
+        """
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError("shorter than the header")
+        (magic, version, field_count, count, _,
+         index_offset, refs_offset, records_offset, names_offset, size) = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"format {magic!r} version {version}")
+        if size != len(self._mmap):
+            raise ValueError(f"{len(self._mmap)} bytes, header says {size}")
+        (block_length,) = struct.unpack_from("<I", self._mmap, _HEADER.size)
+        offsets = (index_offset, refs_offset, records_offset, names_offset)
+        if offsets != _layout(block_length, field_count, count) or names_offset > size:
+            raise ValueError(f"section offsets {offsets} do not match the header")
+        fields = json.loads(self._mmap[_HEADER.size + 4:_HEADER.size + 4 + block_length])
+        if not isinstance(fields, list) or len(fields) != field_count:
+            raise ValueError(f"field list does not have {field_count} fields")
+
+        self.fields = fields
+        self._field_index = {field: i for i, field in enumerate(self.fields)}
+        self._count = count
+        self._refs_offset = refs_offset
+        self._records_offset = records_offset
+        self._names_offset = names_offset
+        self._record = struct.Struct(f"<{field_count}d")
+        return index_offset
+
+    def __len__(self) -> int:
+        """Number of foods in the catalog."""
+        return self._count
+
+    def __contains__(self, name: str) -> bool:
+        """Whether a food is in the catalog."""
+        return self._find(normalize_name(name)) is not None
+
+    def _name(self, position: int) -> str:
+        """Name of the record at position."""
+        offset, length = _NAME_REF.unpack_from(self._mmap, self._refs_offset + _NAME_REF.size * position)
+        start = self._names_offset + offset
+        return self._mmap[start:start + length].decode()
+
+    def _find_uncached(self, key: str) -> Optional[Tuple[float, ...]]:
+        """Field values of a normalized name, or None if absent."""
+        target = _hash(key)
+        position = bisect.bisect_left(self._hashes, target)
+        while position < self._count and self._hashes[position] == target:
+            if self._name(position) == key:
+                return self._record.unpack_from(
+                    self._mmap, self._records_offset + self._record.size * position
+                )
+            position += 1
+        return None
+
+    def get(self, name: str) -> Optional[Dict[str, float]]:
+        """All known values of a food ({field: value}), or None if absent."""
+        values = self._find(normalize_name(name))
+        if values is None:
+            return None
+        return {field: value for field, value in zip(self.fields, values) if not math.isnan(value)}
+
+    def value(self, name: str, field: str, default: Optional[float] = None) -> Optional[float]:
+        """One value of a food, or default if the food or value is missing."""
+        index = self._field_index.get(field)
+        values = self._find(normalize_name(name))
+        if index is None or values is None or math.isnan(values[index]):
+            return default
+        return values[index]
+
+    def price_field(self, region: str = "") -> str:
+        """Price column for a region (the default column if it has none)."""
+        field = f"{COST_FIELD}_{region.lower()}" if region else COST_FIELD
+        return field if field in self._field_index else COST_FIELD
+
+    def prices(self, region: str = "") -> "PriceTable":
+        """Cost per 100g by ingredient name, as a dict-like lookup."""
+        field = self.price_field(region)
+        if field not in self._price_tables:
+            self._price_tables[field] = PriceTable(self, field, self._cache_size)
+        return self._price_tables[field]
+
+    def names(self) -> Iterator[str]:
+        """All food names (in index order)."""
+        for position in range(self._count):
+            yield self._name(position)
+
+    def close(self):
+        """Unmap the file."""
+        self._find.cache_clear()
+        self._price_tables.clear()
+        self._hashes.release()
+        self._mmap.close()
+
+
+class PriceTable:
+    """Dict-like cost per 100g lookup backed by a catalog.
+
+    Supports get() and `in`, which is what the grocery and cost
+    utilities use; values missing from a regional column fall back to
+    the default price column. Prices are memoized by the name as given,
+    since the grocery utilities look up the same few names per plan.
+    """
+
+    def __init__(self, catalog: IngredientCatalog, field: str = COST_FIELD, cache_size: int = 65536):
+        """Initialize price table.
+
+        Args:
+            catalog: Ingredient catalog
+            field: Price column
+            cache_size: Names memoized before the memo is reset
+        """
+        self.catalog = catalog
+        self.field = field
+        self._cache_size = cache_size
+        self._memo = {}  # name -> price or None
+
+    def get(self, name: str, default: Optional[float] = None) -> Optional[float]:
+        """Cost per 100g of an ingredient, or default if unknown."""
+        try:
+            price = self._memo[name]
+        except KeyError:
+            price = self.catalog.value(name, self.field)
+            if price is None and self.field != COST_FIELD:
+                price = self.catalog.value(name, COST_FIELD)
+            if len(self._memo) >= self._cache_size:
+                self._memo.clear()
+            self._memo[name] = price
+        return default if price is None else price
+
+    def __contains__(self, name: str) -> bool:
+        """Whether the ingredient has a price."""
+        return self.get(name) is not None
+
+    def __getitem__(self, name: str) -> float:
+        """Cost per 100g of an ingredient (KeyError if unknown)."""
+        price = self.get(name)
+        if price is None:
+            raise KeyError(name)
+        return price
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def _cache_dir() -> str:
+    """Per-user cache directory for built catalogs (private, created on first use)."""
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    path = os.path.join(base, "mealmind")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
+
+
+def get_catalog() -> IngredientCatalog:
+    """The process-wide catalog, opened on first use.
+
+    MEALMIND_CATALOG names a catalog built with build_catalog. Otherwise
+    the bundled CSV is built into the user's cache directory (once per
+    CSV content and format version, shared by that user's processes);
+    a missing, corrupt or outdated file there is rebuilt.
+    """
+    global _catalog
+    if _catalog is not None:
+        return _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            path = os.getenv("MEALMIND_CATALOG")
+            if path:
+                _catalog = IngredientCatalog(path)
+            else:
+                with open(DEFAULT_CSV, "rb") as f:
+                    digest = hashlib.sha1(f.read()).hexdigest()[:12]
+                path = os.path.join(_cache_dir(), f"catalog-v{VERSION}-{digest}.bin")
+                try:
+                    _catalog = IngredientCatalog(path)
+                except (FileNotFoundError, ValueError):
+                    build_catalog(DEFAULT_CSV, path)
+                    _catalog = IngredientCatalog(path)
+        return _catalog
+
+
+def configure_catalog(path: str) -> IngredientCatalog:
+    """Use a different built catalog for this process.
+
+    Args:
+        path: File written by build_catalog
+
+    Returns:
+        The opened catalog
+    """
+    global _catalog
+    catalog = IngredientCatalog(path)
+    with _catalog_lock:
+        _catalog = catalog
+    return catalog
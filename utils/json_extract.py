@@ -0,0 +1,145 @@
+"""Tolerant JSON extraction from LLM output (no LLM needed).
+
+Agent replies wrap JSON in prose or ```json fences, and can stop mid-way
+(token limits, cancelled streams). extract_json finds the JSON value and,
+when it is cut off, recovers the longest prefix that forms valid JSON by
+closing the open containers. Paths ("3.ingredients.0.amount") address
+values inside the result for validation errors and repair patches.
+"""
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+_FENCE = re.compile(r"```(?:json)?\s*([\s\S]*?)(?:```|$)")
+_CLOSERS = {"[": "]", "{": "}"}
+
+# Prefix cut points tried per candidate before giving up
+MAX_RECOVERY_ATTEMPTS = 64
+
+
+def extract_json(text: str) -> Tuple[Any, bool]:
+    """Extract the JSON value from agent output.
+
+    Fenced blocks are preferred (last one first, including an unclosed
+    fence at the end); otherwise the first '[' or '{' in the text starts
+    the value. Text after the value is ignored.
+
+    Args:
+        text: Agent response text
+
+    Returns:
+        (value, complete): complete is False when the value was recovered
+        from truncated output; (None, False) when nothing could be parsed
+    """
+    candidates = _FENCE.findall(text or "") or [text or ""]
+    for candidate in reversed(candidates):
+        start = min((i for i in (candidate.find("["), candidate.find("{")) if i >= 0), default=-1)
+        if start < 0:
+            continue
+        try:
+            value, _ = json.JSONDecoder().raw_decode(candidate, start)
+            return value, True
+        except ValueError:
+            pass
+        value = _recover_prefix(candidate[start:])
+        if value is not None:
+            return value, False
+    return None, False
+
+
+def _recover_prefix(text: str) -> Optional[Any]:
+    """Parse the longest prefix of truncated JSON that can be closed.
+
+    Scans once, tracking open containers outside strings. Every ',' and
+    closing bracket ends a complete element, so the prefix up to there
+    plus the missing closers is a candidate; candidates are tried from
+    the longest.
+    """
+    stack: List[str] = []
+    cuts: List[str] = []
+    in_string = escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in "]}":
+            if not stack or stack[-1] != char:
+                break
+            stack.pop()
+            if not stack:
+                break  # a complete value; raw_decode failed for another reason
+            cuts.append(text[:i + 1] + "".join(reversed(stack)))
+        elif char == ",":
+            cuts.append(text[:i] + "".join(reversed(stack)))
+    if stack and not in_string:
+        # Cut right after a value: close what is open (a cut-off string
+        # is dropped instead, it may be a truncated name)
+        cuts.append(text.rstrip().rstrip(",") + "".join(reversed(stack)))
+
+    for candidate in reversed(cuts[-MAX_RECOVERY_ATTEMPTS:]):
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            continue
+    return None
+
+
+def _path_parts(path: str) -> List[Any]:
+    """Split a dotted path; numeric parts index lists."""
+    return [int(p) if p.lstrip("-").isdigit() else p for p in path.split(".") if p != ""]
+
+
+def get_path(data: Any, path: str, default: Any = None) -> Any:
+    """Value at a dotted path, or default if it does not exist."""
+    for part in _path_parts(path):
+        try:
+            data = data[part]
+        except (KeyError, IndexError, TypeError):
+            return default
+    return data
+
+
+def apply_patch(data: Any, patch: Dict[str, Any]) -> Any:
+    """Set each path in patch to its value (pure Python).
+
+    Missing object keys are created; a list index equal to the list length
+    appends. Paths that cannot be reached are skipped. The empty path
+    replaces the whole value.
+
+    Args:
+        data: Parsed JSON value (modified in place)
+        patch: Mapping of dotted path to new value
+
+    Returns:
+        The patched value
+    """
+    for path, value in patch.items():
+        parts = _path_parts(str(path))
+        if not parts:
+            data = value
+            continue
+        target = data
+        for part in parts[:-1]:
+            try:
+                target = target[part]
+            except (KeyError, IndexError, TypeError):
+                target = None
+                break
+        last = parts[-1]
+        if isinstance(target, dict):
+            target[str(last)] = value
+        elif isinstance(target, list) and isinstance(last, int):
+            if last == len(target):
+                target.append(value)
+            elif -len(target) <= last < len(target):
+                target[last] = value
+    return data
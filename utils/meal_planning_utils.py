@@ -1,8 +1,54 @@
 """Pure Python utilities for meal planning (no LLM needed)."""
+import hashlib
 import json
-from typing import Dict, List
+import re
+from typing import Dict, List, Optional
 from collections import defaultdict
 
+from .json_extract import extract_json
+from .plan_aggregates import PlanAggregates, schedule_summary
+from .variety import MinHashIndex, recipe_shingles, DEFAULT_SIMILARITY
+
+
+MEAL_SLOTS = ["breakfast", "lunch", "dinner"]
+
+# Main ingredients dealt out to concurrently generated chunks of a plan, so
+# chunks that start together do not all pick the same ones
+_BREAKFAST_MAINS = ["oats", "eggs", "greek yogurt", "cottage cheese", "buckwheat", "quinoa", "sweet potato", "tofu"]
+_MEAL_MAINS = [
+    "chicken breast", "chicken thigh", "turkey", "beef", "pork loin", "lamb",
+    "salmon", "cod", "tuna", "shrimp", "tofu", "tempeh", "chickpeas", "lentils",
+    "black beans", "kidney beans", "quinoa", "brown rice", "whole wheat pasta",
+    "sweet potato", "potato", "cauliflower", "mushrooms", "eggplant", "butternut squash"
+]
+MAIN_INGREDIENTS = {"breakfast": _BREAKFAST_MAINS, "lunch": _MEAL_MAINS, "dinner": _MEAL_MAINS}
+
+# Short codes for common constraint values in prompts (other values are
+# used verbatim); CONSTRAINT_LEGEND explains them to the agents once
+CONSTRAINT_CODES = {
+    "vegetarian": "veg",
+    "vegan": "vgn",
+    "pescatarian": "pesc",
+    "gluten-free": "gf",
+    "dairy-free": "df",
+    "halal": "hal",
+    "kosher": "kos",
+    "nuts": "nut",
+    "tree nuts": "tnut",
+    "peanuts": "pnut",
+    "shellfish": "shf",
+    "diabetes": "dm",
+    "high blood pressure": "hbp",
+    "high cholesterol": "chol",
+    "celiac": "cel"
+}
+
+CONSTRAINT_LEGEND = (
+    "Constraint codes: " + ", ".join(f"{code}={value}" for value, code in CONSTRAINT_CODES.items())
+    + ". Other values are literal. diet/allergy/health apply to every meal; "
+    "ageN entries list members (by age) whose own constraints differ."
+)
+
 
 def optimize_schedule(meal_plan: List[Dict], cooking_time_max: int = 45) -> Dict:
     """Optimize meal schedule using Python algorithms (no LLM).
@@ -20,9 +66,6 @@ def optimize_schedule(meal_plan: List[Dict], cooking_time_max: int = 45) -> Dict
         day_time = sum(meal.get("cooking_time_minutes", 0) for meal in day.get("meals", []))
         daily_times.append(day_time)
     
-    total_time = sum(daily_times)
-    avg_time = round(total_time / len(daily_times), 1) if daily_times else 0
-    
     # Find ingredient reuse
     ingredient_counts = defaultdict(int)
     for day in meal_plan:
@@ -30,106 +73,24 @@ def optimize_schedule(meal_plan: List[Dict], cooking_time_max: int = 45) -> Dict
             for ing in meal.get("ingredients", []):
                 ingredient_counts[ing.get("name", "").lower()] += 1
     
-    reused_ingredients = {k: v for k, v in ingredient_counts.items() if v >= 2}
-    
-    # Generate suggestions
-    suggestions = []
-    if avg_time > cooking_time_max:
-        suggestions.append(f"Average time ({avg_time} min) exceeds target. Consider simpler recipes.")
-    
-    if reused_ingredients:
-        batch_items = list(reused_ingredients.keys())[:3]
-        suggestions.append(f"Batch cook: {', '.join(batch_items)}")
-    
-    # Calculate score
-    score = 100.0
-    if avg_time > cooking_time_max:
-        score -= ((avg_time - cooking_time_max) / cooking_time_max) * 30
-    
-    reuse_ratio = len(reused_ingredients) / len(ingredient_counts) if ingredient_counts else 0
-    score += reuse_ratio * 15
-    
-    return {
-        "cooking_stats": {
-            "total_minutes": total_time,
-            "average_per_day": avg_time,
-            "max_day": max(daily_times) if daily_times else 0,
-            "within_limit": avg_time <= cooking_time_max
-        },
-        "reused_ingredients": reused_ingredients,
-        "optimization_score": round(max(0, min(100, score)), 1),
-        "suggestions": suggestions
-    }
+    return schedule_summary(daily_times, dict(ingredient_counts), cooking_time_max)
 
 
 def generate_grocery_list(meal_plan: List[Dict], budget: float = 150.0, cost_db: Dict = None) -> Dict:
     """Generate grocery list using Python aggregation (no LLM).
     
+    For repeated edits to one plan, keep a PlanAggregates and update it
+    per meal instead.
+    
     Args:
         meal_plan: List of daily meal plans
         budget: Weekly budget
-        cost_db: Cost database for estimation
+        cost_db: Cost per 100g by ingredient (defaults to the ingredient catalog)
     
     Returns:
         Complete grocery list with costs
     """
-    if cost_db is None:
-        cost_db = {
-            "chicken breast": 1.20, "brown rice": 0.15, "broccoli": 0.40,
-            "salmon": 2.50, "quinoa": 0.80, "tofu": 0.90
-        }
-    
-    # Aggregate ingredients
-    aggregated = defaultdict(lambda: {"total_amount": 0, "unit": "grams", "meals": []})
-    
-    for day in meal_plan:
-        for meal in day.get("meals", []):
-            meal_name = meal.get("name", "")
-            for ing in meal.get("ingredients", []):
-                name = ing.get("name", "").lower()
-                aggregated[name]["total_amount"] += ing.get("amount", 0)
-                aggregated[name]["unit"] = ing.get("unit", "grams")
-                aggregated[name]["meals"].append(meal_name)
-    
-    # Calculate costs
-    shopping_list = []
-    total_cost = 0
-    
-    for name, data in aggregated.items():
-        cost_per_100g = cost_db.get(name, 0.50)
-        item_cost = (data["total_amount"] / 100.0) * cost_per_100g
-        
-        shopping_list.append({
-            "name": name.title(),
-            "amount": round(data["total_amount"], 1),
-            "unit": data["unit"],
-            "cost": round(item_cost, 2),
-            "used_in": len(data["meals"])
-        })
-        total_cost += item_cost
-    
-    # Sort by name
-    shopping_list.sort(key=lambda x: x["name"])
-    
-    # Generate tips
-    tips = []
-    if total_cost <= budget:
-        tips.append(f"✓ Within budget! ${round(budget - total_cost, 2)} remaining")
-    else:
-        tips.append(f"⚠️ Over budget by ${round(total_cost - budget, 2)}")
-    
-    frequent_items = [item["name"] for item in shopping_list if item["used_in"] >= 3]
-    if frequent_items:
-        tips.append(f"Buy in bulk: {', '.join(frequent_items[:3])}")
-    
-    return {
-        "shopping_list": shopping_list,
-        "total_items": len(shopping_list),
-        "total_cost": round(total_cost, 2),
-        "budget": budget,
-        "within_budget": total_cost <= budget,
-        "shopping_tips": tips
-    }
+    return PlanAggregates.from_plan(meal_plan, budget, cost_db).grocery_list()
 
 
 def calculate_optimization_score(cooking_stats: Dict, reuse_count: int, total_ingredients: int) -> float:
@@ -144,3 +105,302 @@ def calculate_optimization_score(cooking_stats: Dict, reuse_count: int, total_in
         score += reuse_ratio * 15
     
     return round(max(0, min(100, score)), 1)
+
+
+def parse_recipes(text: str) -> List[Dict]:
+    """Extract a flat recipe list from agent output (pure Python).
+    
+    Accepts a JSON array of recipes, an object with a "recipes" list, or a
+    list of days with "meals", either bare or inside ```json fences.
+    Truncated output yields the recipes that were complete.
+    
+    Args:
+        text: Agent response text
+    
+    Returns:
+        Recipes in output order (empty list if none could be parsed)
+    """
+    data, _ = extract_json(text)
+    return flatten_recipes(data)
+
+
+def flatten_recipes(data) -> List[Dict]:
+    """Flatten parsed recipe output into a recipe list (pure Python).
+    
+    Args:
+        data: Recipe array, {"recipes"|"days"|"meal_plan": ...} object, or
+            list of days with "meals"
+    
+    Returns:
+        Recipes in output order, each day's recipes tagged with its day
+    """
+    if isinstance(data, dict):
+        data = data.get("recipes") or data.get("days") or data.get("meal_plan") or []
+        if isinstance(data, dict):
+            return flatten_recipes(data)
+    if not isinstance(data, list):
+        return []
+    
+    recipes = []
+    for item in data:
+        if isinstance(item, dict) and isinstance(item.get("meals"), list):
+            for meal in item["meals"]:
+                if isinstance(meal, dict):
+                    recipes.append({"day": item.get("day"), **meal})
+        elif isinstance(item, dict):
+            recipes.append(item)
+    return recipes
+
+
+def main_ingredient(recipe: Dict) -> str:
+    """Get a recipe's main ingredient (largest amount, lowercased)."""
+    best_name, best_amount = "", -1.0
+    for ing in recipe.get("ingredients", []):
+        try:
+            amount = float(ing.get("amount", 0) or 0)
+        except (TypeError, ValueError):
+            amount = 0.0
+        if amount > best_amount:
+            best_name, best_amount = ing.get("name", "").lower().strip(), amount
+    return best_name
+
+
+def _slot_key(recipe: Dict) -> tuple:
+    """Sort key for (day, meal slot)."""
+    day = recipe.get("day")
+    meal_type = str(recipe.get("meal_type", "")).lower()
+    slot = MEAL_SLOTS.index(meal_type) if meal_type in MEAL_SLOTS else len(MEAL_SLOTS)
+    return (day if isinstance(day, int) else 10 ** 6, slot)
+
+
+def assign_slots(recipes: List[Dict], slots: List[tuple]) -> Dict:
+    """Fit generated recipes to the (day, meal_type) slots they were asked for (pure Python).
+    
+    Recipes labelled with a requested, still open slot keep it; the rest
+    fill the remaining open slots in order and are relabelled. Recipes
+    beyond the requested slots are dropped.
+    
+    Args:
+        recipes: Generated recipes
+        slots: Requested (day, meal_type) pairs
+    
+    Returns:
+        {"recipes": recipes stamped with their slot, in slot order,
+         "missing": slots no recipe was left for}
+    """
+    open_slots = {slot: None for slot in slots}
+    unplaced = []
+    for recipe in recipes:
+        day = recipe.get("day")
+        slot = (int(day) if isinstance(day, (int, float)) else day, str(recipe.get("meal_type", "")).lower())
+        if slot in open_slots and open_slots[slot] is None:
+            open_slots[slot] = recipe
+        else:
+            unplaced.append(recipe)
+    for slot, recipe in open_slots.items():
+        if recipe is None and unplaced:
+            open_slots[slot] = unplaced.pop(0)
+    return {
+        "recipes": [
+            {**recipe, "day": day, "meal_type": meal_type}
+            for (day, meal_type), recipe in open_slots.items() if recipe is not None
+        ],
+        "missing": [slot for slot, recipe in open_slots.items() if recipe is None]
+    }
+
+
+def allocate_main_ingredients(
+    pools: Dict[str, List[str]],
+    chunk_slots: List[List[tuple]],
+    max_main_reuse: int = 2
+) -> List[Dict[tuple, str]]:
+    """Assign main ingredients to plan slots before the chunks are generated (pure Python).
+    
+    Chunks take turns, one slot at a time, each drawing the next unused
+    ingredient of its slot's pool, so chunks generated at the same time
+    get different mains. No chunk gets an ingredient twice and no
+    ingredient is assigned more than max_main_reuse times; slots left
+    without one (the pool ran out) are up to the model.
+    
+    Args:
+        pools: Candidate main ingredients by meal type (already filtered
+            for the household)
+        chunk_slots: Each chunk's (day, meal_type) slots
+        max_main_reuse: Maximum recipes sharing one main ingredient
+    
+    Returns:
+        {slot: main ingredient} per chunk
+    """
+    allocations = [{} for _ in chunk_slots]
+    uses = defaultdict(int)
+    cursors = defaultdict(int)  # next candidate per pool (meal types may share one)
+    pools = {meal_type: tuple(names) for meal_type, names in pools.items()}
+    for turn in range(max((len(slots) for slots in chunk_slots), default=0)):
+        for chunk, slots in enumerate(chunk_slots):
+            if turn >= len(slots):
+                continue
+            slot = slots[turn]
+            pool = pools.get(slot[1], ())
+            taken = set(allocations[chunk].values())
+            for step in range(len(pool)):
+                name = pool[(cursors[pool] + step) % len(pool)]
+                if uses[name] < max_main_reuse and name not in taken:
+                    allocations[chunk][slot] = name
+                    uses[name] += 1
+                    cursors[pool] += step + 1
+                    break
+    return allocations
+
+
+def merge_recipe_chunks(
+    chunks: List[List[Dict]],
+    max_main_reuse: int = 2,
+    history: Optional[MinHashIndex] = None,
+    similarity: float = DEFAULT_SIMILARITY
+) -> Dict:
+    """Merge per-day recipe chunks, flagging repeats (pure Python).
+    
+    A recipe conflicts when its normalized name already appeared earlier in
+    the plan, when its main ingredient is already used max_main_reuse
+    times, or when its ingredient set is a near-duplicate (Jaccard
+    similarity >= similarity) of an earlier recipe in the plan or of a
+    recipe in history. Near-duplicates are found through MinHash indexes,
+    not by comparing every pair.
+    
+    Args:
+        chunks: Recipe lists in chunk order
+        max_main_reuse: Maximum recipes sharing one main ingredient
+        history: Index of recently planned recipes keyed by (plan ID,
+            recipe name), e.g. MemoryBank.variety_index()
+        similarity: Near-duplicate threshold
+    
+    Returns:
+        Merged recipes in (day, meal) order, indices of conflicting recipes,
+        main ingredient usage counts of the non-conflicting recipes, and
+        the name of the recipe each near-duplicate resembles ({index: name})
+    """
+    recipes = sorted((r for chunk in chunks for r in chunk), key=_slot_key)
+    
+    seen_names = set()
+    main_counts = defaultdict(int)
+    planned = MinHashIndex(threshold=similarity)
+    conflicts = []
+    near_duplicates = {}
+    for index, recipe in enumerate(recipes):
+        name = re.sub(r"[^a-z0-9]+", " ", str(recipe.get("name", "")).lower()).strip()
+        main = main_ingredient(recipe)
+        if (name and name in seen_names) or (main and main_counts[main] >= max_main_reuse):
+            conflicts.append(index)
+            continue
+        ingredients = recipe_shingles(recipe)
+        matches = planned.query(ingredients)
+        if matches:
+            near_duplicates[index] = str(recipes[matches[0][0]].get("name"))
+        elif history is not None:
+            matches = history.query(ingredients, similarity)
+            if matches:
+                near_duplicates[index] = str(matches[0][0][1])
+        if matches:
+            conflicts.append(index)
+            continue
+        seen_names.add(name)
+        planned.add(index, ingredients)
+        if main:
+            main_counts[main] += 1
+    
+    return {
+        "recipes": recipes,
+        "conflicts": conflicts,
+        "main_ingredients": dict(main_counts),
+        "near_duplicates": near_duplicates
+    }
+
+
+def constraint_fingerprint(constraints: Dict) -> str:
+    """Stable hash of what a plan depends on in household constraints (pure Python).
+    
+    Ignores the household ID, member names and list order, so households
+    with identical constraints share a fingerprint. Error results (e.g.
+    unknown household) are hashed as they are.
+    
+    Args:
+        constraints: Output of get_household_constraints
+    
+    Returns:
+        Hex digest
+    """
+    normalized = _normalized
+    if "error" in constraints:
+        canonical = constraints
+    else:
+        canonical = {
+            "dietary_restrictions": normalized(constraints.get("dietary_restrictions")),
+            "allergies": normalized(constraints.get("allergies")),
+            "health_conditions": normalized(constraints.get("health_conditions")),
+            "cooking_time_max": constraints.get("cooking_time_max"),
+            "budget_weekly": constraints.get("budget_weekly"),
+            "cuisine_preferences": normalized(constraints.get("cuisine_preferences")),
+            "members": sorted(
+                json.dumps({
+                    "age": m.get("age"),
+                    "dietary_restrictions": normalized(m.get("dietary_restrictions")),
+                    "allergies": normalized(m.get("allergies")),
+                    "health_conditions": normalized(m.get("health_conditions"))
+                }, sort_keys=True)
+                for m in constraints.get("members", [])
+            )
+        }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _normalized(values) -> List[str]:
+    """Lowercase, deduplicated, sorted constraint values."""
+    return sorted({str(v).strip().lower() for v in values or []} - {""})
+
+
+def encode_constraints(constraints: Dict) -> str:
+    """Compact, canonical text form of household constraints for prompts (pure Python).
+    
+    Values are deduplicated, sorted and short-coded (CONSTRAINT_CODES), and
+    empty fields are left out. Members are listed (by age, without names)
+    only when their constraints differ from the household's, so households
+    with the same constraint_fingerprint get the same encoding.
+    
+    Example: "diet=veg|allergy=nut,shf|health=dm|cook<=45min/day|budget=$150/wk|members=3|age8:diet=veg allergy=nut"
+    
+    Args:
+        constraints: Output of get_household_constraints
+    
+    Returns:
+        Encoded constraints
+    """
+    if "error" in constraints:
+        return f"error={constraints['error']}"
+    
+    def fields(source: Dict) -> List[str]:
+        encoded = []
+        for label, key in (("diet", "dietary_restrictions"), ("allergy", "allergies"), ("health", "health_conditions")):
+            values = [CONSTRAINT_CODES.get(v, v) for v in _normalized(source.get(key))]
+            if values:
+                encoded.append(f"{label}={','.join(values)}")
+        return encoded
+    
+    household = fields(constraints)
+    parts = list(household)
+    if constraints.get("cooking_time_max") is not None:
+        parts.append(f"cook<={constraints['cooking_time_max']}min/day")
+    if constraints.get("budget_weekly") is not None:
+        parts.append(f"budget=${constraints['budget_weekly']:g}/wk")
+    cuisines = _normalized(constraints.get("cuisine_preferences"))
+    if cuisines:
+        parts.append(f"cuisine={','.join(cuisines)}")
+    
+    members = constraints.get("members", [])
+    if members:
+        parts.append(f"members={len(members)}")
+        differing = sorted(
+            (m.get("age", 0) or 0, " ".join(fields(m)) or "none")
+            for m in members if fields(m) != household
+        )
+        parts.extend(f"age{age}:{encoded}" for age, encoded in differing)
+    return "|".join(parts)
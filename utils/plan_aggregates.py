@@ -0,0 +1,233 @@
+"""Delta-maintained aggregates over a meal plan (no LLM needed).
+
+PlanAggregates keeps the running totals behind the grocery list, the
+plan cost and the schedule stats (per-ingredient amounts, costs and
+used_in counts, reuse count, daily minutes and costs, total cost).
+Adding, removing or replacing a meal only touches that meal's
+ingredients, so edits cost O(ingredients of the meal) regardless of
+plan length. Reports are built from the totals on demand.
+"""
+from typing import Dict, List
+
+from .ingredient_catalog import get_catalog
+
+# Cost per 100g of ingredients missing from the cost database
+DEFAULT_COST_PER_100G = 0.50
+
+# Running costs are kept in integer micro-dollars, so the total is exact and
+# does not depend on the order of edits
+_MICROS = 1000000
+
+
+class PlanAggregates:
+    """Running totals over a meal plan, updated one meal at a time."""
+
+    def __init__(self, budget: float = 150.0, cost_db: Dict = None, cooking_time_max: int = 45):
+        """Initialize empty aggregates.
+
+        Args:
+            budget: Weekly budget
+            cost_db: Cost per 100g by lowercase ingredient name (defaults
+                to the ingredient catalog's prices)
+            cooking_time_max: Maximum cooking time per day
+        """
+        self.budget = budget
+        self.cost_db = get_catalog().prices() if cost_db is None else cost_db
+        self.cooking_time_max = cooking_time_max
+
+        self.items = {}  # name -> {"amount", "unit", "used_in", "cost" (micro-dollars)}
+        self._total_micros = 0
+        self.reuse_count = 0  # ingredients used in 2+ meals
+        self.daily_minutes: List[int] = []
+        self.daily_cents: List[int] = []  # sum of per-ingredient costs, each rounded to cents
+
+    @classmethod
+    def from_plan(
+        cls,
+        meal_plan: List[Dict],
+        budget: float = 150.0,
+        cost_db: Dict = None,
+        cooking_time_max: int = 45
+    ) -> "PlanAggregates":
+        """Build aggregates for a plan (list of {"day", "meals"})."""
+        aggregates = cls(budget, cost_db, cooking_time_max)
+        cost_db = aggregates.cost_db
+        items = aggregates.items
+        # Bulk path: aggregate first, then price each ingredient once
+        for day in meal_plan:
+            minutes = cents = 0
+            for meal in day.get("meals", []):
+                minutes += meal.get("cooking_time_minutes", 0)
+                for ing in meal.get("ingredients", []):
+                    name = ing.get("name", "").lower()
+                    amount = ing.get("amount", 0)
+                    item = items.get(name)
+                    if item is None:
+                        item = items[name] = {"amount": 0, "unit": "grams", "used_in": 0, "cost": 0}
+                    item["amount"] += amount
+                    item["used_in"] += 1
+                    item["unit"] = ing.get("unit", "grams")
+                    cents += round(amount * cost_db.get(name, DEFAULT_COST_PER_100G))
+            aggregates.daily_minutes.append(minutes)
+            aggregates.daily_cents.append(cents)
+        for name, item in items.items():
+            item["cost"] = aggregates._micros(name, item["amount"])
+            aggregates._total_micros += item["cost"]
+            if item["used_in"] >= 2:
+                aggregates.reuse_count += 1
+        return aggregates
+
+    @property
+    def total_cost(self) -> float:
+        """Grocery cost of the plan (unrounded)."""
+        return self._total_micros / _MICROS
+
+    @property
+    def within_budget(self) -> bool:
+        """Whether the plan's grocery cost fits the budget."""
+        return self.total_cost <= self.budget
+
+    def add_meal(self, day_index: int, meal: Dict):
+        """Add a meal to the day at day_index (days are created as needed)."""
+        self._apply(day_index, meal, 1)
+
+    def remove_meal(self, day_index: int, meal: Dict):
+        """Remove a meal previously added to the day at day_index."""
+        self._apply(day_index, meal, -1)
+
+    def replace_meal(self, day_index: int, old_meal: Dict, new_meal: Dict):
+        """Swap one meal of the day at day_index for another."""
+        self._apply(day_index, old_meal, -1)
+        self._apply(day_index, new_meal, 1)
+
+    def _ensure_day(self, day_index: int):
+        """Extend the per-day totals up to day_index."""
+        while len(self.daily_minutes) <= day_index:
+            self.daily_minutes.append(0)
+            self.daily_cents.append(0)
+
+    def _apply(self, day_index: int, meal: Dict, sign: int):
+        """Add (sign=1) or subtract (sign=-1) one meal's contribution."""
+        self._ensure_day(day_index)
+        self.daily_minutes[day_index] += sign * meal.get("cooking_time_minutes", 0)
+        for ing in meal.get("ingredients", []):
+            name = ing.get("name", "").lower()
+            amount = ing.get("amount", 0)
+            cost_per_100g = self.cost_db.get(name, DEFAULT_COST_PER_100G)
+
+            item = self.items.get(name)
+            if item is None:
+                item = self.items[name] = {"amount": 0, "unit": "grams", "used_in": 0, "cost": 0}
+            used_before = item["used_in"]
+            item["amount"] += sign * amount
+            item["used_in"] += sign
+            if sign > 0:
+                item["unit"] = ing.get("unit", "grams")
+            cost = self._micros(name, item["amount"])
+            self._total_micros += cost - item["cost"]
+            item["cost"] = cost
+
+            if used_before < 2 <= item["used_in"]:
+                self.reuse_count += 1
+            elif item["used_in"] < 2 <= used_before:
+                self.reuse_count -= 1
+            if item["used_in"] <= 0:
+                self._total_micros -= item["cost"]
+                del self.items[name]
+
+            self.daily_cents[day_index] += sign * round(amount * cost_per_100g)
+
+    def _micros(self, name: str, amount: float) -> int:
+        """Cost of an amount of an ingredient in micro-dollars."""
+        return round(amount * self.cost_db.get(name, DEFAULT_COST_PER_100G) * (_MICROS / 100))
+
+    # ============================================================================
+    # REPORTS
+    # ============================================================================
+
+    def grocery_list(self) -> Dict:
+        """Grocery list in generate_grocery_list format."""
+        shopping_list = sorted((
+            {
+                "name": name.title(),
+                "amount": round(item["amount"], 1),
+                "unit": item["unit"],
+                "cost": round((item["amount"] / 100.0) * self.cost_db.get(name, DEFAULT_COST_PER_100G), 2),
+                "used_in": item["used_in"]
+            }
+            for name, item in self.items.items()
+        ), key=lambda x: x["name"])
+        return grocery_summary(shopping_list, self.total_cost, self.budget)
+
+    def schedule(self) -> Dict:
+        """Schedule stats in optimize_schedule format."""
+        counts = {name: item["used_in"] for name, item in self.items.items()}
+        return schedule_summary(self.daily_minutes, counts, self.cooking_time_max)
+
+    def meal_plan_cost(self) -> Dict:
+        """Plan cost in calculate_meal_plan_cost format."""
+        total_cost = sum(self.daily_cents) / 100
+        return {
+            "total_cost": round(total_cost, 2),
+            "daily_costs": [cents / 100 for cents in self.daily_cents],
+            "average_per_day": round(total_cost / len(self.daily_cents), 2) if self.daily_cents else 0
+        }
+
+
+def schedule_summary(daily_times: List[int], ingredient_counts: Dict[str, int], cooking_time_max: int) -> Dict:
+    """Stats, score and suggestions from per-day times and ingredient counts."""
+    total_time = sum(daily_times)
+    avg_time = round(total_time / len(daily_times), 1) if daily_times else 0
+
+    reused_ingredients = {k: v for k, v in ingredient_counts.items() if v >= 2}
+
+    # Generate suggestions
+    suggestions = []
+    if avg_time > cooking_time_max:
+        suggestions.append(f"Average time ({avg_time} min) exceeds target. Consider simpler recipes.")
+
+    if reused_ingredients:
+        batch_items = list(reused_ingredients.keys())[:3]
+        suggestions.append(f"Batch cook: {', '.join(batch_items)}")
+
+    # Calculate score
+    score = 100.0
+    if avg_time > cooking_time_max:
+        score -= ((avg_time - cooking_time_max) / cooking_time_max) * 30
+
+    reuse_ratio = len(reused_ingredients) / len(ingredient_counts) if ingredient_counts else 0
+    score += reuse_ratio * 15
+
+    return {
+        "cooking_stats": {
+            "total_minutes": total_time,
+            "average_per_day": avg_time,
+            "max_day": max(daily_times) if daily_times else 0,
+            "within_limit": avg_time <= cooking_time_max
+        },
+        "reused_ingredients": reused_ingredients,
+        "optimization_score": round(max(0, min(100, score)), 1),
+        "suggestions": suggestions
+    }
+
+
+def grocery_summary(shopping_list: List[Dict], total_cost: float, budget: float) -> Dict:
+    """Totals, budget status and tips for a shopping list."""
+    tips = []
+    if total_cost <= budget:
+        tips.append(f"✓ Within budget! ${round(budget - total_cost, 2)} remaining")
+    else:
+        tips.append(f"⚠️ Over budget by ${round(total_cost - budget, 2)}")
+
+    frequent_items = [item["name"] for item in shopping_list if item["used_in"] >= 3]
+    if frequent_items:
+        tips.append(f"Buy in bulk: {', '.join(frequent_items[:3])}")
+
+    return {
+        "shopping_list": shopping_list,
+        "total_items": len(shopping_list),
+        "total_cost": round(total_cost, 2),
+        "budget": budget,
+        "within_budget": total_cost <= budget,
+        "shopping_tips": tips
+    }
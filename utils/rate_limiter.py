@@ -0,0 +1,278 @@
+"""Adaptive rate limiting for model calls (no LLM needed).
+
+One limiter per model is shared by every agent and orchestrator in the
+process. Each limiter combines:
+- token buckets for requests and tokens per minute (the model's budget)
+- an AIMD concurrency limit: +1 per window of successes, halved on 429
+- a learned request rate: on 429 it drops to the success rate actually
+  observed (at most halving), then grows ~10% per quota window, so it
+  also works without a budget
+- retries with full-jitter exponential backoff, so concurrent callers
+  do not retry in lockstep
+"""
+import asyncio
+import collections
+import os
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+
+# Requests/tokens per minute per API tier and model. Models missing from a
+# tier are unlimited (AIMD still applies). The tier comes from the
+# MEALMIND_RATE_TIER environment variable and defaults to "free", the
+# tightest budget, so an unconfigured key is never overrun.
+MODEL_BUDGETS = {
+    "free": {
+        "gemini-2.5-flash-lite": {"rpm": 15, "tpm": 250000},
+        "gemini-2.5-flash": {"rpm": 10, "tpm": 250000},
+        "gemini-2.5-pro": {"rpm": 5, "tpm": 250000},
+    },
+    "tier1": {
+        "gemini-2.5-flash-lite": {"rpm": 4000, "tpm": 4000000},
+        "gemini-2.5-flash": {"rpm": 1000, "tpm": 1000000},
+        "gemini-2.5-pro": {"rpm": 150, "tpm": 2000000},
+    },
+    "tier2": {
+        "gemini-2.5-flash-lite": {"rpm": 10000, "tpm": 10000000},
+        "gemini-2.5-flash": {"rpm": 2000, "tpm": 3000000},
+        "gemini-2.5-pro": {"rpm": 1000, "tpm": 5000000},
+    },
+}
+DEFAULT_TIER = "free"
+
+RETRYABLE_CODES = {429, 500, 503, 504}
+
+
+def error_code(error: Exception) -> Optional[int]:
+    """HTTP-style status code of a model error, if any."""
+    for attr in ("code", "status_code"):
+        code = getattr(error, attr, None)
+        if isinstance(code, int):
+            return code
+    text = str(error)
+    if "429" in text or "RESOURCE_EXHAUSTED" in text:
+        return 429
+    return None
+
+
+class AdaptiveRateLimiter:
+    """Token-bucket budget plus AIMD concurrency control for one model."""
+
+    def __init__(
+        self,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        max_attempts: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        cooldown: float = 1.0,
+        rate_window: float = 60.0,
+        seed: Optional[int] = None
+    ):
+        """Initialize limiter.
+
+        Args:
+            rpm: Requests per minute budget
+            tpm: Tokens per minute budget
+            max_concurrency: Upper bound (and starting value) of in-flight calls
+            min_concurrency: Lower bound of in-flight calls
+            max_attempts: Attempts per call including the first
+            base_delay: First retry backoff ceiling in seconds
+            max_delay: Maximum backoff ceiling in seconds
+            cooldown: Minimum seconds between two concurrency decreases, so
+                one burst of 429s halves the limit only once
+            rate_window: Seconds over which the provider counts quota
+            seed: Seed for retry jitter
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.cooldown = cooldown
+        self.rate_window = rate_window
+
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self.rate = float(rpm) if rpm else None  # current requests/minute, None = unlimited
+        self._requests = max(1.0, rpm * rate_window / 120.0) if rpm else 0.0
+        self._successes = collections.deque()  # success timestamps within rate_window
+        self._tokens = float(tpm) if tpm else 0.0
+        self._refilled_at = time.monotonic()
+        self.limit = float(max_concurrency)
+        self._decreased_at = float("-inf")
+        self.in_flight = 0
+        self.stats = {"calls": 0, "rate_limited": 0, "retries": 0, "failures": 0}
+
+    def _refill(self, now: float):
+        """Top up the buckets for elapsed time."""
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        if self.rate:
+            # Burst of half a window, so a sliding-window quota is not overrun
+            burst = max(1.0, self.rate * self.rate_window / 120.0)
+            self._requests = min(burst, self._requests + elapsed * self.rate / 60.0)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60.0)
+
+    def _try_acquire(self, tokens: int) -> float:
+        """Take a slot if possible; otherwise return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self.in_flight >= int(self.limit):
+                return 0.01
+            wait = 0.0
+            if self.rate and self._requests < 1:
+                wait = max(wait, (1 - self._requests) * 60.0 / self.rate)
+            tokens = min(tokens, self.tpm) if self.tpm else tokens
+            if self.tpm and self._tokens < tokens:
+                wait = max(wait, (tokens - self._tokens) * 60.0 / self.tpm)
+            if wait > 0:
+                return wait
+            if self.rate:
+                self._requests -= 1
+            if self.tpm:
+                self._tokens -= tokens
+            self.in_flight += 1
+            self.stats["calls"] += 1
+            return 0.0
+
+    async def acquire(self, tokens: int = 0):
+        """Wait for a concurrency slot and budget for one request."""
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, rate_limited: bool = False, extra_tokens: int = 0, failed: bool = False):
+        """Return a slot and adapt the concurrency limit.
+
+        Args:
+            rate_limited: The call was rejected with 429
+            extra_tokens: Tokens used beyond the acquired estimate
+            failed: The call failed otherwise (the limits stay as they are)
+        """
+        with self._lock:
+            self.in_flight -= 1
+            if self.tpm and extra_tokens:
+                self._tokens -= extra_tokens
+            now = time.monotonic()
+            while self._successes and now - self._successes[0] >= self.rate_window:
+                self._successes.popleft()
+            if rate_limited:
+                self.stats["rate_limited"] += 1
+                if now - self._decreased_at >= self.cooldown:
+                    self._decreased_at = now
+                    self.limit = max(self.min_concurrency, self.limit / 2)
+                    # Fall back to the rate the provider actually accepted,
+                    # but at most halve a rate that was already learned
+                    observed = len(self._successes) * 60.0 / self.rate_window
+                    if self.rate:
+                        observed = min(self.rate, max(self.rate / 2, observed))
+                    self.rate = max(1.0, observed)
+                # Stop new requests until the bucket refills a little
+                self._requests = min(self._requests, 0.0)
+            elif not failed:
+                self._successes.append(now)
+                self.limit = min(self.max_concurrency, self.limit + 1.0 / max(self.limit, 1.0))
+                if self.rate:
+                    per_window = max(1.0, self.rate * self.rate_window / 60.0)
+                    self.rate = min(self.rpm or float("inf"), self.rate * (1 + 0.1 / per_window))
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for a retry attempt (0-based)."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        with self._lock:
+            return self._rng.uniform(0, ceiling)
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable],
+        tokens: int = 0,
+        usage: Callable[[object], int] = None
+    ):
+        """Run fn under the limiter, retrying retryable errors with jitter.
+
+        Args:
+            fn: Zero-argument coroutine function making one model request
+            tokens: Estimated tokens for the request
+            usage: Returns the actual tokens used from fn's result
+
+        Returns:
+            fn's result
+        """
+        for attempt in range(self.max_attempts):
+            await self.acquire(tokens)
+            try:
+                result = await fn()
+            except BaseException as e:
+                # Cancellation must return the slot too, or it leaks for good
+                code = error_code(e) if isinstance(e, Exception) else None
+                self.release(rate_limited=code == 429, failed=True)
+                if code not in RETRYABLE_CODES or attempt == self.max_attempts - 1:
+                    with self._lock:
+                        self.stats["failures"] += 1
+                    raise
+                with self._lock:
+                    self.stats["retries"] += 1
+                await asyncio.sleep(self.backoff(attempt))
+                continue
+            actual = 0
+            try:
+                actual = usage(result) if usage else 0
+            finally:
+                self.release(extra_tokens=max(0, actual - tokens))
+            return result
+
+
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def model_budget(model: str, tier: Optional[str] = None) -> Dict:
+    """Built-in rpm/tpm budget of a model.
+
+    Args:
+        model: Model name
+        tier: Key of MODEL_BUDGETS; defaults to MEALMIND_RATE_TIER, then
+            DEFAULT_TIER
+
+    Returns:
+        AdaptiveRateLimiter arguments ({} if the model has no budget)
+    """
+    tier = tier or os.getenv("MEALMIND_RATE_TIER") or DEFAULT_TIER
+    if tier not in MODEL_BUDGETS:
+        raise ValueError(f"Unknown rate tier {tier!r}, expected one of {sorted(MODEL_BUDGETS)}")
+    return dict(MODEL_BUDGETS[tier].get(model, {}))
+
+
+def get_rate_limiter(model: str) -> AdaptiveRateLimiter:
+    """Get the process-wide limiter for a model, creating it on first use."""
+    with _limiters_lock:
+        if model not in _limiters:
+            _limiters[model] = AdaptiveRateLimiter(**model_budget(model))
+        return _limiters[model]
+
+
+def configure_rate_limiter(model: str, tier: Optional[str] = None, **settings) -> AdaptiveRateLimiter:
+    """Replace a model's limiter (e.g. with a paid-tier budget).
+
+    Args:
+        model: Model name
+        tier: Key of MODEL_BUDGETS whose budget to start from
+        settings: AdaptiveRateLimiter arguments overriding the budget
+
+    Returns:
+        The new limiter
+    """
+    with _limiters_lock:
+        _limiters[model] = AdaptiveRateLimiter(**{**model_budget(model, tier), **settings})
+        return _limiters[model]
@@ -0,0 +1,180 @@
+"""Output schemas for the agent stages (no LLM needed).
+
+Schemas use a small JSON Schema subset (type, properties, required,
+items, enum, minimum, minLength, minItems) so they can be shown to the
+model verbatim and checked here without extra dependencies. Extra
+properties are allowed. Each stage's parsed output is normalized first
+(recipes flattened, plans grouped by day), then validated; errors carry
+the path of the offending value for targeted repair.
+"""
+from typing import Any, Dict, List, Optional
+
+from .meal_planning_utils import MEAL_SLOTS, flatten_recipes, _slot_key
+
+INGREDIENT_SCHEMA = {
+    "type": "object",
+    "required": ["name", "amount", "unit"],
+    "properties": {
+        "name": {"type": "string", "minLength": 1},
+        "amount": {"type": "number", "minimum": 0},
+        "unit": {"type": "string", "minLength": 1}
+    }
+}
+
+RECIPE_SCHEMA = {
+    "type": "object",
+    "required": ["day", "meal_type", "name", "ingredients", "cooking_time_minutes", "servings"],
+    "properties": {
+        "day": {"type": "integer", "minimum": 1},
+        "meal_type": {"type": "string", "enum": MEAL_SLOTS},
+        "name": {"type": "string", "minLength": 1},
+        "ingredients": {"type": "array", "minItems": 1, "items": INGREDIENT_SCHEMA},
+        "cooking_time_minutes": {"type": "integer", "minimum": 0},
+        "servings": {"type": "integer", "minimum": 1}
+    }
+}
+
+RECIPE_LIST_SCHEMA = {"type": "array", "minItems": 1, "items": RECIPE_SCHEMA}
+
+VERDICT_SCHEMA = {
+    "type": "object",
+    "required": ["index", "approved"],
+    "properties": {
+        "index": {"type": "integer", "minimum": 0},
+        "approved": {"type": "boolean"},
+        "reasons": {"type": "array", "items": {"type": "string"}}
+    }
+}
+
+VERDICT_LIST_SCHEMA = {"type": "array", "items": VERDICT_SCHEMA}
+
+PLAN_SCHEMA = {
+    "type": "object",
+    "required": ["days"],
+    "properties": {
+        "days": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "required": ["day", "meals"],
+                "properties": {
+                    "day": {"type": "integer", "minimum": 1},
+                    "meals": {"type": "array", "minItems": 1, "items": RECIPE_SCHEMA}
+                }
+            }
+        }
+    }
+}
+
+# Errors reported per validation (keeps repair prompts small)
+MAX_ERRORS = 20
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool
+}
+
+
+def validate(data: Any, schema: Dict, path: str = "", max_errors: int = MAX_ERRORS) -> List[Dict]:
+    """Check data against a schema (pure Python).
+
+    Args:
+        data: Parsed JSON value
+        schema: Schema dict (subset described in the module docstring)
+        path: Dotted path of data within the stage output
+        max_errors: Stop after this many errors
+
+    Returns:
+        Errors as {"path", "error"} dicts (empty if valid)
+    """
+    errors = []
+    _validate(data, schema, path, errors, max_errors)
+    return errors
+
+
+def _validate(data: Any, schema: Dict, path: str, errors: List[Dict], max_errors: int):
+    """Append errors for data to errors."""
+    if len(errors) >= max_errors:
+        return
+    expected = schema.get("type")
+    # bool is an int subclass, but never a valid number here
+    if expected and (not isinstance(data, _TYPES[expected])
+                     or (isinstance(data, bool) and expected != "boolean")):
+        errors.append({"path": path, "error": f"expected {expected}, got {type(data).__name__}"})
+        return
+    if "enum" in schema and data not in schema["enum"]:
+        errors.append({"path": path, "error": f"must be one of {schema['enum']}"})
+    if "minimum" in schema and data < schema["minimum"]:
+        errors.append({"path": path, "error": f"must be >= {schema['minimum']}"})
+    if "minLength" in schema and len(data.strip()) < schema["minLength"]:
+        errors.append({"path": path, "error": "must not be empty"})
+
+    if expected == "object":
+        for key in schema.get("required", []):
+            if key not in data:
+                errors.append({"path": _join(path, key), "error": "required"})
+        for key, sub_schema in schema.get("properties", {}).items():
+            if key in data:
+                _validate(data[key], sub_schema, _join(path, key), errors, max_errors)
+    elif expected == "array":
+        if len(data) < schema.get("minItems", 0):
+            errors.append({"path": path, "error": f"needs at least {schema['minItems']} items"})
+        if "items" in schema:
+            for index, item in enumerate(data):
+                _validate(item, schema["items"], _join(path, index), errors, max_errors)
+    del errors[max_errors:]
+
+
+def _join(path: str, key) -> str:
+    """Extend a dotted path."""
+    return f"{path}.{key}" if path else str(key)
+
+
+def normalize_recipes(data: Any) -> Optional[List[Dict]]:
+    """Recipe generator output as a flat recipe list (None if unusable)."""
+    if data is None:
+        return None
+    return flatten_recipes(data)
+
+
+def normalize_verdicts(data: Any) -> Optional[List]:
+    """Validator output as a verdict list (None if unusable)."""
+    if isinstance(data, dict):
+        data = data.get("verdicts", data.get("results"))
+    return data if isinstance(data, list) else None
+
+
+def normalize_plan(data: Any) -> Optional[Dict]:
+    """Coordinator output as {"days": [{"day", "meals"}]} (None if unusable).
+
+    Accepts {"days": [...]}, {"meal_plan": {"days": [...]}},
+    {"meal_plan": [...]} or a bare list, where days are either day
+    objects with "meals" or flat recipes with a "day" field.
+    """
+    if isinstance(data, dict):
+        meal_plan = data.get("meal_plan")
+        if isinstance(meal_plan, dict):
+            data = meal_plan
+        elif isinstance(meal_plan, list):
+            data = {"days": meal_plan}
+        days = data.get("days")
+    else:
+        days = data
+    if not isinstance(days, list):
+        return None
+    if days and all(isinstance(d, dict) and "meals" in d for d in days):
+        return {**data, "days": days} if isinstance(data, dict) else {"days": days}
+    return {"days": group_by_day(flatten_recipes(days))}
+
+
+def group_by_day(recipes: List[Dict]) -> List[Dict]:
+    """Group recipes into day objects in (day, meal) order."""
+    days = {}
+    for recipe in sorted(recipes, key=_slot_key):
+        days.setdefault(recipe.get("day"), []).append(recipe)
+    return [{"day": day, "meals": meals} for day, meals in days.items()]
@@ -0,0 +1,152 @@
+"""Near-duplicate recipe detection with MinHash and LSH (no LLM needed).
+
+"Grilled Chicken with Quinoa" and "Quinoa Chicken Bowl" have different
+names but nearly the same ingredients. A recipe is reduced to its set of
+ingredient names; MinHash signatures of those sets are split into bands,
+and recipes sharing any band land in the same LSH bucket. A query only
+compares against the recipes in its buckets (verified with the exact
+Jaccard similarity), so finding near-duplicates does not scan the whole
+history.
+"""
+import array
+import functools
+import hashlib
+import re
+from typing import Dict, FrozenSet, Hashable, Iterable, Iterator, List, Tuple
+
+# Jaccard similarity of ingredient sets above which recipes are near-duplicates
+DEFAULT_SIMILARITY = 0.6
+
+
+def recipe_shingles(recipe: Dict) -> FrozenSet[str]:
+    """Normalized ingredient names of a recipe."""
+    return frozenset(
+        re.sub(r"[^a-z0-9]+", " ", str(ing.get("name", "")).lower()).strip()
+        for ing in recipe.get("ingredients", [])
+        if isinstance(ing, dict) and ing.get("name")
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def _signature(items: FrozenSet[str], num_perm: int, seed: int) -> Tuple[int, ...]:
+    """MinHash signature of a set.
+
+    One SHAKE-128 digest per item yields num_perm independent 32-bit
+    hashes of it; the signature is their column-wise minimum over items.
+    """
+    prefix = seed.to_bytes(8, "little")
+    rows = [array.array("I", hashlib.shake_128(prefix + item.encode()).digest(4 * num_perm)) for item in items]
+    return tuple(map(min, zip(*rows)))
+
+
+def jaccard(a: FrozenSet, b: FrozenSet) -> float:
+    """Jaccard similarity of two sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHashIndex:
+    """LSH index over ingredient sets for near-duplicate lookups.
+
+    With the defaults (96 permutations in 32 bands of 3 rows), a pair with
+    Jaccard similarity 0.6 shares a bucket with probability > 0.999, a
+    pair at 0.3 with ~0.6 and a pair at 0.1 with ~0.03. Candidates are
+    then checked exactly, so results never include pairs below the
+    threshold.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_SIMILARITY,
+        num_perm: int = 96,
+        bands: int = 32,
+        seed: int = 1
+    ):
+        """Initialize empty index.
+
+        Args:
+            threshold: Default similarity for query()
+            num_perm: MinHash signature length
+            bands: LSH bands (num_perm must be a multiple)
+            seed: Permutation seed
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.seed = seed
+        self._items = {}  # key -> ingredient set
+        self._buckets = [{} for _ in range(bands)]  # per band: band signature -> {key}
+
+    def __len__(self) -> int:
+        """Number of indexed recipes."""
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether a key is indexed."""
+        return key in self._items
+
+    def _band_keys(self, items: FrozenSet[str]) -> Iterator[Tuple[Dict, Tuple[int, ...]]]:
+        """(band buckets, bucket key) pairs of a set, one per band."""
+        signature = _signature(items, self.num_perm, self.seed)
+        rows = self.rows
+        return zip(self._buckets, [signature[i:i + rows] for i in range(0, self.num_perm, rows)])
+
+    def add(self, key: Hashable, items: Iterable[str]):
+        """Index a recipe's ingredient set under key (replacing any previous one)."""
+        items = frozenset(items)
+        if key in self._items:
+            self.remove(key)
+        if not items:
+            return
+        self._items[key] = items
+        for buckets, bucket in self._band_keys(items):
+            keys = buckets.get(bucket)
+            if keys is None:
+                buckets[bucket] = {key}
+            else:
+                keys.add(key)
+
+    def remove(self, key: Hashable):
+        """Drop a key from the index (no-op if absent)."""
+        items = self._items.pop(key, None)
+        if items is None:
+            return
+        for buckets, bucket in self._band_keys(items):
+            keys = buckets.get(bucket)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del buckets[bucket]
+
+    def query(self, items: Iterable[str], threshold: float = None) -> List[Tuple[Hashable, float]]:
+        """Indexed recipes similar to an ingredient set.
+
+        Args:
+            items: Ingredient names (see recipe_shingles)
+            threshold: Minimum Jaccard similarity (defaults to the index's)
+
+        Returns:
+            (key, similarity) pairs, most similar first
+        """
+        items = frozenset(items)
+        if not items:
+            return []
+        threshold = self.threshold if threshold is None else threshold
+        candidates = set()
+        for buckets, bucket in self._band_keys(items):
+            keys = buckets.get(bucket)
+            if keys:
+                candidates.update(keys)
+        matches = []
+        for key in candidates:
+            indexed = self._items.get(key)
+            if indexed is not None:
+                similarity = jaccard(items, indexed)
+                if similarity >= threshold:
+                    matches.append((key, similarity))
+        matches.sort(key=lambda match: -match[1])
+        return matches